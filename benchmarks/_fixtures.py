@@ -0,0 +1,62 @@
+import copy
+import json
+from pathlib import Path
+from typing import Dict, Mapping, Tuple
+
+SAMPLE_PROJECT_TARGET = Path(__file__).resolve().parent / "../tests/_fixtures/dbt_sample_project/target"
+
+
+def load_sample_artifacts() -> Tuple[Dict, Dict]:
+    """
+    Loads the manifest and the catalog from the sample dbt project used in the tests
+    """
+    with open(SAMPLE_PROJECT_TARGET / "manifest_original.json") as file:
+        manifest = json.load(file)
+
+    with open(SAMPLE_PROJECT_TARGET / "catalog.json") as file:
+        catalog = json.load(file)
+
+    return manifest, catalog
+
+
+def scale_sample_artifacts(copies: int) -> Tuple[Dict, Dict]:
+    """
+    Replicates the nodes and sources of the sample dbt project `copies` times. Every copy is an independent
+    project graph (its dependencies point to nodes of the same copy), so the amount of nodes, columns and lineage
+    edges grows linearly with the amount of copies.
+    """
+    manifest, catalog = load_sample_artifacts()
+
+    scaled_manifest: Dict = {**manifest, "nodes": {}, "sources": {}}
+    scaled_catalog: Dict = {**catalog, "nodes": {}, "sources": {}}
+
+    for copy_index in range(copies):
+        for key in ("nodes", "sources"):
+            scaled_manifest[key].update(_copy_nodes(manifest[key], copy_index))
+            scaled_catalog[key].update(_copy_nodes(catalog[key], copy_index))
+
+    return scaled_manifest, scaled_catalog
+
+
+def _copy_nodes(nodes: Mapping, copy_index: int) -> Dict:
+    output = {}
+
+    for node_id, node in nodes.items():
+        node = copy.deepcopy(node)
+        new_node_id = _copy_node_id(node_id, copy_index)
+
+        if "unique_id" in node:
+            node["unique_id"] = new_node_id
+
+        if node.get("depends_on", {}).get("nodes"):
+            node["depends_on"]["nodes"] = [
+                _copy_node_id(upstream, copy_index) for upstream in node["depends_on"]["nodes"]
+            ]
+
+        output[new_node_id] = node
+
+    return output
+
+
+def _copy_node_id(node_id: str, copy_index: int) -> str:
+    return f"{node_id}_{copy_index}"
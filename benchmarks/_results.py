@@ -0,0 +1,75 @@
+"""
+Machine-readable benchmark results, to track regressions over time.
+
+Every execution of a benchmark with `--output <file>` appends a JSON line to the file with the benchmark name, the
+parameters, the measurements and where they were taken (git commit, Python version, machine).
+"""
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional
+
+
+@contextmanager
+def measure(*, trace_memory: bool = False) -> Iterator[Dict[str, float]]:
+    """
+    Measures the elapsed time of the block of code (`seconds`) and, if `trace_memory`, the peak of memory allocated by
+    Python during it (`peak_memory_bytes`). Tracing memory allocations slows down the code a lot, so the elapsed time
+    is only meaningful without it.
+    """
+    measurement: Dict[str, float] = {}
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+
+    try:
+        yield measurement
+    finally:
+        measurement["seconds"] = time.perf_counter() - start
+
+        if trace_memory:
+            measurement["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def record_results(output_path: Optional[Path], benchmark: str, parameters: Mapping, results: Mapping) -> Dict:
+    """
+    Prints the results and, if `output_path` is provided, appends them to it as a JSON line
+    """
+    record = {
+        "benchmark": benchmark,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "parameters": dict(parameters),
+        "results": dict(results),
+    }
+
+    print(json.dumps(record["results"], indent=2))
+
+    if output_path:
+        with open(output_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    return record
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
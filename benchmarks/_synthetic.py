@@ -0,0 +1,133 @@
+"""
+Generator of synthetic dbt artifacts (manifest and catalog), to benchmark the automations at production scale.
+
+The project is a layered DAG: sources in the first layer, models in the following ones. Every model depends on
+`fan_in` nodes of the previous layer. The layers grow (or shrink) by a factor `fan_out / fan_in`, so that every node
+has about `fan_out` children.
+"""
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Tuple
+
+PROJECT_NAME = "synthetic"
+
+
+@dataclass(frozen=True)
+class ProjectShape:
+    nodes: int = 10_000  # Sources and models
+    columns_per_node: int = 20
+    depth: int = 10  # Layers of the DAG, including the sources
+    fan_in: int = 2  # Parents of every model
+    fan_out: int = 2  # Approximate children of every node (except in the last layer)
+    documentation_ratio: float = 0.3  # Share of the columns with a description
+    inherited_ratio: float = 0.6  # Share of the columns of a model with the name of a column of its parents
+    seed: int = 42
+
+    def layer_sizes(self) -> List[int]:
+        growth = self.fan_out / self.fan_in
+        weights = [growth**layer for layer in range(self.depth)]
+        sizes = [max(1, round(self.nodes * weight / sum(weights))) for weight in weights]
+
+        # Rounding errors go to the largest layer
+        sizes[sizes.index(max(sizes))] += self.nodes - sum(sizes)
+        return sizes
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def generate_artifacts(shape: ProjectShape) -> Tuple[Dict, Dict]:
+    """
+    :return: the manifest and the catalog of a synthetic project. As in real projects, the manifest only has the
+        documented columns, while the catalog has all of them.
+    """
+    rng = random.Random(shape.seed)
+    manifest: Dict = {"metadata": {"project_id": PROJECT_NAME}, "nodes": {}, "sources": {}}
+    catalog: Dict = {"metadata": {}, "nodes": {}, "sources": {}, "errors": None}
+
+    previous_layer: List[Tuple[str, List[str]]] = []  # Node ids and column names
+
+    for layer, size in enumerate(shape.layer_sizes()):
+        current_layer = []
+
+        for position in range(size):
+            if layer == 0:
+                node_id = f"source.{PROJECT_NAME}.raw.table_{position}"
+                parents: List[Tuple[str, List[str]]] = []
+            else:
+                node_id = f"model.{PROJECT_NAME}.model_{layer}_{position}"
+                parents = _parents(previous_layer, position, shape)
+
+            column_names = _column_names(rng, parents, shape, layer, position)
+            manifest_node, catalog_node = _node(rng, node_id, column_names, [parent for parent, _ in parents], shape)
+
+            key = "sources" if layer == 0 else "nodes"
+            manifest[key][node_id] = manifest_node
+            catalog[key][node_id] = catalog_node
+            current_layer.append((node_id, column_names))
+
+        previous_layer = current_layer
+
+    return manifest, catalog
+
+
+def _parents(previous_layer: List[Tuple[str, List[str]]], position: int, shape: ProjectShape) -> List:
+    # Consecutive nodes share parents, and every parent gets about `fan_out` children
+    first = int(position * shape.fan_in / shape.fan_out)
+    count = min(shape.fan_in, len(previous_layer))
+
+    return [previous_layer[(first + offset) % len(previous_layer)] for offset in range(count)]
+
+
+def _column_names(rng: random.Random, parents: List, shape: ProjectShape, layer: int, position: int) -> List[str]:
+    parent_columns = sorted({name for _, names in parents for name in names})
+    names: List[str] = []
+
+    for index in range(shape.columns_per_node):
+        if parent_columns and rng.random() < shape.inherited_ratio:
+            name = rng.choice(parent_columns)
+
+            if name not in names:
+                names.append(name)
+                continue
+
+        names.append(f"column_{layer}_{position}_{index}")
+
+    return names
+
+
+def _node(rng: random.Random, node_id: str, column_names: List[str], parent_ids: List[str], shape: ProjectShape):
+    name = node_id.rsplit(".", 1)[-1]
+    documented_columns = {
+        column_name: {
+            "name": column_name,
+            "description": f"Description of {column_name} in {name}.",
+            "meta": {},
+            "data_type": None,
+            "quote": None,
+            "tags": [],
+        }
+        for column_name in column_names
+        if rng.random() < shape.documentation_ratio
+    }
+
+    manifest_node = {
+        "unique_id": node_id,
+        "resource_type": "source" if node_id.startswith("source.") else "model",
+        "name": name,
+        "package_name": PROJECT_NAME,
+        "checksum": {"name": "sha256", "checksum": f"{rng.getrandbits(128):032x}"},
+        "depends_on": {"macros": [], "nodes": parent_ids},
+        "columns": documented_columns,
+    }
+    catalog_node = {
+        "metadata": {"type": "VIEW", "schema": "analytics", "name": name, "database": PROJECT_NAME},
+        "columns": {
+            column_name: {"type": "text", "index": index, "name": column_name, "comment": None}
+            for index, column_name in enumerate(column_names, 1)
+        },
+        "stats": {},
+        "unique_id": node_id,
+    }
+
+    return manifest_node, catalog_node
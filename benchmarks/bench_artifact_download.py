@@ -0,0 +1,163 @@
+"""
+Measures the download throughput of `dbt-cloud retrieve-artifacts-time-interval` against a local fake of the dbt Cloud
+API, which serves the manifest of a synthetic project (see `--nodes`) as the manifest of every run step.
+
+    $ python -m benchmarks.bench_artifact_download --runs 20 --concurrency 8 --latency 0.05 --output results.jsonl
+
+With `--memory`, files are written to memory instead of a temporary folder, to leave the disk out of the measurement.
+"""
+import argparse
+import json
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Mapping
+
+from benchmarks._results import measure, record_results
+from benchmarks._synthetic import ProjectShape, generate_artifacts
+from dbttoolkit.dbt_cloud.actions.retrieve_artifacts_time_interval import _process_runs
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DEFAULT_POOL_SIZE, DbtCloudClient
+from dbttoolkit.dbt_cloud.models.archive_format import ArchiveFormat
+from dbttoolkit.utils.storage import LocalBackend, MemoryBackend, StorageBackend
+from tests._fake_dbt_cloud_api import FakeDbtCloudApi
+
+ACCOUNT_ID = 1
+PROJECT_ID = 2
+ENVIRONMENT_ID = 3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=2, help="steps of every run")
+    parser.add_argument("--nodes", type=int, default=2000, help="nodes of the project, which drive the manifest size")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response of the API")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--page-concurrency", type=int, default=1, help="pages of runs requested at the same time")
+    parser.add_argument("--stream", action="store_true", help="stream the artifacts instead of parsing them")
+    parser.add_argument("--output-format", type=ArchiveFormat, choices=list(ArchiveFormat), default=ArchiveFormat.json)
+    parser.add_argument("--memory", action="store_true", help="write the files to memory instead of the disk")
+    parser.add_argument("--output", type=Path, help="a JSON lines file the results are appended to")
+    args = parser.parse_args()
+
+    logging.getLogger("dbt-toolkit").setLevel(logging.WARNING)
+
+    manifest, _ = generate_artifacts(ProjectShape(nodes=args.nodes))
+    artifacts = {
+        "manifest.json": json.dumps(manifest).encode("utf-8"),
+        "run_results.json": json.dumps({"metadata": {}, "results": [], "args": {"which": "run"}}).encode("utf-8"),
+        "sources.json": json.dumps({"metadata": {}, "results": []}).encode("utf-8"),
+    }
+    print(f"Manifest size: {len(artifacts['manifest.json']) / 1024 / 1024:.1f} MiB")
+
+    end_time = datetime.now(timezone.utc).replace(microsecond=0)
+
+    with FakeDbtCloudApi() as server, tempfile.TemporaryDirectory() as temporary_folder:
+        serve_runs(server, args.runs, args.steps, artifacts, finished_before=end_time, latency=args.latency)
+        client = DbtCloudClient(
+            account_id=ACCOUNT_ID,
+            project_id=PROJECT_ID,
+            environment_id=ENVIRONMENT_ID,
+            token="benchmark",
+            pool_size=max(args.concurrency, args.page_concurrency, DEFAULT_POOL_SIZE),
+            page_concurrency=args.page_concurrency,
+            base_url=server.url,
+        )
+        backend: StorageBackend = MemoryBackend() if args.memory else LocalBackend(Path(temporary_folder))
+
+        try:
+            with measure() as listing:
+                runs = client.retrieve_runs_finished_between(end_time - timedelta(days=365), end_time)
+
+            listing_bytes = server.bytes_sent
+
+            with measure() as download:
+                failed_runs = _process_runs(
+                    client,
+                    runs,
+                    "artifacts",
+                    backend,
+                    concurrency=args.concurrency,
+                    stream=args.stream,
+                    archive_format=args.output_format,
+                )
+        finally:
+            client.close()
+
+        downloaded_bytes = server.bytes_sent - listing_bytes
+
+    files = len(runs) * (1 + args.steps * len(artifacts))
+    results: Dict = {
+        "runs": len(runs),
+        "failed_runs": len(failed_runs),
+        "files": files,
+        "listing_seconds": listing["seconds"],
+        "download_seconds": download["seconds"],
+        "mib_per_second": downloaded_bytes / 1024 / 1024 / download["seconds"],
+        "files_per_second": files / download["seconds"],
+        "requests": client.metrics.requests,
+        "retries": client.metrics.retries,
+        "bytes_received": client.metrics.bytes_received,
+    }
+
+    parameters = {
+        "runs": args.runs,
+        "steps": args.steps,
+        "nodes": args.nodes,
+        "manifest_bytes": len(artifacts["manifest.json"]),
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "page_concurrency": args.page_concurrency,
+        "stream": args.stream,
+        "output_format": args.output_format.value,
+        "memory": args.memory,
+    }
+    record_results(args.output, "artifact_download", parameters, results)
+
+
+def serve_runs(
+    server: FakeDbtCloudApi,
+    runs: int,
+    steps: int,
+    artifacts: Mapping[str, bytes],
+    *,
+    finished_before: datetime,
+    latency: float,
+) -> None:
+    """
+    Serves `runs` completed runs, one per minute until `finished_before`, with `steps` steps each. Every step has the
+    same artifacts (file name, e.g. `manifest.json`, to content). Every response is delayed by `latency` seconds, to
+    simulate the round trip to the API.
+    """
+    all_runs = [_run(run_id, steps, finished_before - timedelta(minutes=run_id)) for run_id in range(1, runs + 1)]
+    server.add_pages(f"/accounts/{ACCOUNT_ID}/runs", lambda: all_runs, delay=latency)
+
+    for run in all_runs:
+        for name, content in artifacts.items():
+            server.add(f"/accounts/{ACCOUNT_ID}/runs/{run['id']}/artifacts/{name}", content=content, delay=latency)
+
+
+def _run(run_id: int, steps: int, finished_at: datetime) -> Dict:
+    created_at = finished_at - timedelta(minutes=5)
+
+    return {
+        "id": run_id,
+        "job_id": run_id % 10,
+        "account_id": ACCOUNT_ID,
+        "project_id": PROJECT_ID,
+        "environment_id": ENVIRONMENT_ID,
+        "status": 10,
+        "is_complete": True,
+        "is_success": True,
+        "is_cancelled": False,
+        "git_sha": "0" * 40,
+        "created_at": created_at.isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "finished_at_humanized": "1 minute",
+        "job": {"execute_steps": ["dbt run"] * steps},
+    }
+
+
+if __name__ == "__main__":
+    main()
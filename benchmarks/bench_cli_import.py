@@ -0,0 +1,52 @@
+"""
+Measures the import time of the `dbt-toolkit` command (`python -X importtime`), which every invocation pays before
+doing anything, even `--help`. Commands and their dependencies are imported lazily: the time is mostly typer and
+click.
+
+    $ python -m benchmarks.bench_cli_import --repeat 5
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks._results import record_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="dbttoolkit.cli", help="the module to import")
+    parser.add_argument("--repeat", type=int, default=5, help="imports measured, the best one is kept")
+    parser.add_argument("--output", type=Path, help="a JSON lines file the results are appended to")
+    args = parser.parse_args()
+
+    # The best of a few imports, to ignore the noise of a busy machine
+    import_times = [import_time(args.module) for _ in range(args.repeat)]
+
+    record_results(
+        args.output,
+        "cli_import",
+        {"module": args.module, "repeat": args.repeat},
+        {"best_seconds": min(import_times) / 1_000_000, "worst_seconds": max(import_times) / 1_000_000},
+    )
+
+
+def import_time(module: str) -> int:
+    """
+    :return: the cumulative import time of a module in a new interpreter, in microseconds
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    ).stderr
+
+    for line in output.splitlines():
+        _, cumulative, name = line.split("|")
+
+        if name.strip() == module:
+            return int(cumulative)
+
+    raise ValueError(f"{module} not found in the import times")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the time and memory needed to build the column graph of a (replicated) sample project with the slotted
+`Column` class against the pydantic model it replaced.
+
+    $ python -m benchmarks.bench_column_registry --copies 2000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List, Mapping, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from benchmarks._fixtures import scale_sample_artifacts
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+
+ColumnSpec = Tuple[str, Mapping, Mapping, Optional[str]]  # name, node, artifact column, description
+Edge = Tuple[int, int]  # Positions in the list of column specs: (upstream, downstream)
+
+
+class LegacyColumn(BaseModel):
+    name: str = Field(..., allow_mutation=False)
+    node: Mapping = Field(..., allow_mutation=False, repr=False)
+
+    artifact_column: Mapping
+    description: Optional[str]
+
+    upstream_matches: Set = set()
+    downstream_matches: Set = set()
+
+    class Config:
+        validate_assignment = True
+
+    def add_upstream_match(self, column: "LegacyColumn") -> None:
+        self.upstream_matches.add(column)
+
+        if self not in column.downstream_matches:
+            column.add_downstream_match(self)
+
+    def add_downstream_match(self, column: "LegacyColumn") -> None:
+        self.downstream_matches.add(column)
+
+        if self not in column.upstream_matches:
+            column.add_upstream_match(self)
+
+    def __hash__(self):
+        return hash((self.node["unique_id"], self.name))
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and hash(self) == hash(other)
+
+
+def _extract_graph(copies: int) -> Tuple[List[ColumnSpec], List[Edge]]:
+    manifest, catalog = scale_sample_artifacts(copies)
+    registry = ColumnRegistry()
+    traverse_artifacts(catalog, manifest, registry)
+
+    columns = list(registry.data.values())
+    positions = {column: position for position, column in enumerate(columns)}
+
+    specs = [(column.name, column.node, column.artifact_column, column.description) for column in columns]
+    edges = [(positions[upstream], positions[column]) for column in columns for upstream in column.upstream_matches]
+
+    return specs, edges
+
+
+def _build(column_class: Callable, specs: List[ColumnSpec], edges: List[Edge]) -> Tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    columns = [
+        column_class(name=name, node=node, artifact_column=artifact_column, description=description)
+        for name, node, artifact_column, description in specs
+    ]
+
+    for upstream, downstream in edges:
+        columns[downstream].add_upstream_match(columns[upstream])
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=2000, help="how many times the sample project is replicated")
+    args = parser.parse_args()
+
+    specs, edges = _extract_graph(args.copies)
+    print(f"Columns: {len(specs)}, edges: {len(edges)}")
+
+    for label, column_class in (("pydantic (legacy)", LegacyColumn), ("__slots__", Column)):
+        elapsed, peak = _build(column_class, specs, edges)
+        print(f"{label:<18} {elapsed:.3f}s, peak memory {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
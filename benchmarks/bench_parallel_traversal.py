@@ -0,0 +1,41 @@
+"""
+Measures how `traverse_artifacts` scales with the amount of worker processes, on a synthetic project (the sample
+project replicated until it has `--nodes` nodes).
+
+    $ python -m benchmarks.bench_parallel_traversal --nodes 10000 --workers 1 2 4 8
+"""
+import argparse
+import math
+import time
+
+from benchmarks._fixtures import load_sample_artifacts, scale_sample_artifacts
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import ColumnRegistry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=10_000, help="approximate amount of nodes in the project")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="the amounts of workers to try")
+    args = parser.parse_args()
+
+    sample_manifest, _ = load_sample_artifacts()
+    nodes_per_copy = len(sample_manifest["nodes"]) + len(sample_manifest["sources"])
+    manifest, catalog = scale_sample_artifacts(math.ceil(args.nodes / nodes_per_copy))
+
+    print(f"Nodes: {len(manifest['nodes']) + len(manifest['sources'])}")
+    baseline = None
+
+    for workers in args.workers:
+        registry = ColumnRegistry()
+
+        start = time.perf_counter()
+        traverse_artifacts(catalog, manifest, registry, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        print(f"{workers:>2} workers: {elapsed:.3f}s ({baseline / elapsed:.2f}x), {len(registry.data)} columns")
+
+
+if __name__ == "__main__":
+    main()
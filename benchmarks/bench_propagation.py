@@ -0,0 +1,107 @@
+"""
+Measures the phases of `docs propagate` on a synthetic project: the registry construction (`traverse_artifacts`),
+the propagation (`propagate_documentation_in_the_manifest`) and the statistics (`calculate_and_print`).
+
+Every phase is executed twice: once to measure its time, once with memory tracing to measure its peak memory.
+
+    $ python -m benchmarks.bench_propagation --nodes 10000 --columns-per-node 20 --depth 10 --output results.jsonl
+"""
+import argparse
+import copy
+import logging
+import os
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict
+
+from benchmarks._results import measure, record_results
+from benchmarks._synthetic import ProjectShape, generate_artifacts
+from dbttoolkit.documentation.actions.propagate import propagate_documentation_in_the_manifest, traverse_artifacts
+from dbttoolkit.documentation.models.column import ColumnRegistry
+from dbttoolkit.documentation.presentation.stats import DEFAULT_TOP, calculate_and_print
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_shape_arguments(parser)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes of the registry construction")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="columns listed by the statistics")
+    parser.add_argument("--approximate-ranking", action="store_true", help="rank the statistics by an estimate")
+    parser.add_argument("--output", type=Path, help="a JSON lines file the results are appended to")
+    args = parser.parse_args()
+
+    # Part of the statistics are logged
+    logging.getLogger("dbt-toolkit").setLevel(logging.WARNING)
+
+    shape = shape_from_arguments(args)
+    manifest, catalog = generate_artifacts(shape)
+    columns = sum(len(node["columns"]) for key in ("nodes", "sources") for node in catalog[key].values())
+    print(f"Nodes: {shape.nodes}, columns: {columns}")
+
+    results: Dict = {"columns": columns}
+
+    for trace_memory in (False, True):
+        # The propagation modifies the manifest: every pass starts from the original one
+        pass_manifest = copy.deepcopy(manifest)
+        registry = ColumnRegistry()
+
+        # The propagation and the statistics print their progress: the time to write it is measured, but not shown
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            with measure(trace_memory=trace_memory) as traversal:
+                traverse_artifacts(catalog, pass_manifest, registry, workers=args.workers)
+
+            with measure(trace_memory=trace_memory) as propagation:
+                patch = propagate_documentation_in_the_manifest(registry, pass_manifest)
+
+            with measure(trace_memory=trace_memory) as statistics:
+                calculate_and_print(registry, top=args.top, exact=not args.approximate_ranking)
+
+        for phase, measurement in (
+            ("traverse_artifacts", traversal),
+            ("propagate_documentation_in_the_manifest", propagation),
+            ("calculate_and_print", statistics),
+        ):
+            # The time of the traced pass is slowed down by the tracing
+            phase_results = results.setdefault(phase, {})
+            phase_results.update(
+                {"peak_memory_bytes": measurement["peak_memory_bytes"]} if trace_memory else measurement
+            )
+
+    results["propagated_columns"] = sum(len(node_patch) for node_patch in patch.values())
+
+    record_results(
+        args.output,
+        "propagation",
+        {**shape.as_dict(), "workers": args.workers, "top": args.top, "approximate_ranking": args.approximate_ranking},
+        results,
+    )
+
+
+def add_shape_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = ProjectShape()
+
+    parser.add_argument("--nodes", type=int, default=defaults.nodes, help="sources and models")
+    parser.add_argument("--columns-per-node", type=int, default=defaults.columns_per_node)
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="layers of the DAG, including sources")
+    parser.add_argument("--fan-in", type=int, default=defaults.fan_in, help="parents of every model")
+    parser.add_argument("--fan-out", type=int, default=defaults.fan_out, help="approximate children of every node")
+    parser.add_argument(
+        "--documentation-ratio", type=float, default=defaults.documentation_ratio, help="share of documented columns"
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def shape_from_arguments(args: argparse.Namespace) -> ProjectShape:
+    return ProjectShape(
+        nodes=args.nodes,
+        columns_per_node=args.columns_per_node,
+        depth=args.depth,
+        fan_in=args.fan_in,
+        fan_out=args.fan_out,
+        documentation_ratio=args.documentation_ratio,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
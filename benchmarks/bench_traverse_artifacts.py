@@ -0,0 +1,84 @@
+"""
+Compares `traverse_artifacts` against the previous implementation, which merged the manifest and catalog nodes
+for every single column.
+
+    $ python -m benchmarks.bench_traverse_artifacts --copies 200
+"""
+import argparse
+import time
+from typing import Callable, Mapping
+
+from benchmarks._fixtures import scale_sample_artifacts
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+
+
+def legacy_traverse_upstream(column: Column, manifest: Mapping, catalog: Mapping, registry: ColumnRegistry) -> None:
+    depends_on = column.node.get("depends_on", {}).get("nodes")
+
+    if not depends_on:
+        return None
+
+    manifest_nodes = {**manifest["nodes"], **manifest["sources"]}
+    catalog_nodes = {**catalog["nodes"], **catalog["sources"]}
+
+    column_alias = column.artifact_column.get("meta", {}).get("original_name")
+    column_name = column_alias or column.name
+
+    for upstream_node_key in depends_on:
+        manifest_node = manifest_nodes.get(upstream_node_key, {})
+        manifest_column_in_upstream_node = manifest_node.get("columns", {}).get(column_name.lower())
+
+        catalog_node = catalog_nodes.get(upstream_node_key, {})
+        catalog_column_in_upstream_node = catalog_node.get("columns", {}).get(column_name.upper())
+
+        if manifest_column_in_upstream_node or catalog_column_in_upstream_node:
+            upstream_column = registry.add_or_retrieve(
+                column_in_manifest=manifest_column_in_upstream_node,
+                column_in_catalog=catalog_column_in_upstream_node,
+                node=manifest_node,
+            )
+
+            column.add_upstream_match(upstream_column)
+
+
+def legacy_traverse_artifacts(catalog: Mapping, manifest: Mapping, registry: ColumnRegistry) -> None:
+    for node_key, node_in_catalog in catalog["nodes"].items():
+        node_in_manifest = manifest["nodes"][node_key]
+
+        for column_key, column_in_catalog in node_in_catalog["columns"].items():
+            column_in_manifest = node_in_manifest["columns"].get(column_key.lower())
+
+            column = registry.add_or_retrieve(
+                column_in_manifest=column_in_manifest, column_in_catalog=column_in_catalog, node=node_in_manifest
+            )
+
+            legacy_traverse_upstream(column, manifest, catalog, registry)
+
+
+def _time(function: Callable, catalog: Mapping, manifest: Mapping) -> float:
+    registry = ColumnRegistry()
+
+    start = time.perf_counter()
+    function(catalog, manifest, registry)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=200, help="how many times the sample project is replicated")
+    args = parser.parse_args()
+
+    manifest, catalog = scale_sample_artifacts(args.copies)
+    print(f"Nodes: {len(manifest['nodes']) + len(manifest['sources'])}")
+
+    legacy = _time(legacy_traverse_artifacts, catalog, manifest)
+    indexed = _time(traverse_artifacts, catalog, manifest)
+
+    print(f"Legacy (merge per column): {legacy:.3f}s")
+    print(f"Artifact index:            {indexed:.3f}s ({legacy / indexed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -41,4 +41,15 @@ setup(
         "pydantic ~= 1.9.1",
         "rich ~= 13.3.5",
     ],
+    extras_require={
+        # Faster JSON parsing and serialization of dbt artifacts
+        "fast": ["orjson >= 3.6"],
+        # Compressed and columnar formats for the artifacts archived by `retrieve-artifacts-time-interval`
+        "zstd": ["zstandard >= 0.18"],
+        "parquet": ["pyarrow >= 8.0"],
+        # Reading and writing artifacts in S3-compatible stores
+        "s3": ["boto3 >= 1.24"],
+        # Sampling profiler for `docs propagate --profiler pyinstrument`
+        "profiling": ["pyinstrument >= 4.0"],
+    },
 )
@@ -1,13 +1,103 @@
+"""
+The `dbt-toolkit` command.
+
+Commands are registered by the name of the module defining them, and only imported when they are invoked (or their
+help is shown), so the dependencies of one command (e.g. the GCS and HTTP clients of the dbt Cloud commands) do not
+slow down the startup of the others.
+"""
+import importlib
+from typing import List, Mapping, NamedTuple, Optional
+
+import click
 import typer
+import typer.main
+
+from dbttoolkit.utils.logger import init_logger
+
+
+class LazyCommand(NamedTuple):
+    module: str  # Defines a `typer_app` with a single command
+    help: str  # Shown in the list of commands of the group, without importing the module
+
+
+class LazyGroup(click.Group):
+    """
+    A group of commands that are only imported when they are used
+    """
+
+    def __init__(self, name: str, lazy_commands: Mapping[str, LazyCommand], **kwargs) -> None:
+        super().__init__(name=name, **kwargs)
+        self.lazy_commands = lazy_commands
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            typer_app = importlib.import_module(self.lazy_commands[cmd_name].module).typer_app  # type: ignore
+            self.add_command(typer.main.get_command_from_info(typer_app.registered_commands[0]), cmd_name)
+
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        rows = []
+
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                rows.append((name, self.commands[name].get_short_help_str(formatter.width)))
+            else:
+                rows.append((name, self.lazy_commands[name].help))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+lineage_group = LazyGroup(
+    "lineage",
+    {
+        "export": LazyCommand(
+            "dbttoolkit.documentation.actions.lineage_export",
+            "Writes the column lineage in a compact binary file",
+        ),
+        "query": LazyCommand(
+            "dbttoolkit.documentation.actions.lineage_query",
+            "Lists the columns downstream (or upstream) of the given columns",
+        ),
+    },
+    help="Column lineage utilities",
+)
 
-from dbttoolkit.dbt_cloud.actions import dbt_cloud_typer_app
-from dbttoolkit.documentation.actions import documentation_typer_app
+docs_group = LazyGroup(
+    "docs",
+    {
+        "propagate": LazyCommand(
+            "dbttoolkit.documentation.actions.propagate",
+            "Propagates the documentation of columns to their downstream models",
+        ),
+    },
+    help="Documentation utilities",
+    commands=[lineage_group],
+)
 
-app = typer.Typer()
+dbt_cloud_group = LazyGroup(
+    "dbt-cloud",
+    {
+        "retrieve-artifacts-time-interval": LazyCommand(
+            "dbttoolkit.dbt_cloud.actions.retrieve_artifacts_time_interval",
+            "Retrieves artifacts from all runs in a time interval",
+        ),
+        "retrieve-most-recent-artifact": LazyCommand(
+            "dbttoolkit.dbt_cloud.actions.retrieve_most_recent_artifact",
+            "Retrieves an artifact from the latest run of a job",
+        ),
+    },
+    help="dbt Cloud API utilities",
+)
 
-app.add_typer(documentation_typer_app, name="docs")
-app.add_typer(dbt_cloud_typer_app, name="dbt-cloud")
+app = click.Group(commands=[docs_group, dbt_cloud_group])
+app.params.extend(typer.main.get_install_completion_arguments())
 
 
 def main():
+    init_logger()
     app()
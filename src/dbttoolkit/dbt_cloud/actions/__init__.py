@@ -1,8 +1,21 @@
 import typer
 
-from dbttoolkit.dbt_cloud.actions.retrieve_artifacts_time_interval import typer_app as artifacts_time_interval_typer_app
-from dbttoolkit.dbt_cloud.actions.retrieve_most_recent_artifact import typer_app as most_recent_artifact_typer_app
 
-dbt_cloud_typer_app = typer.Typer()
-dbt_cloud_typer_app.registered_commands.append(*artifacts_time_interval_typer_app.registered_commands)
-dbt_cloud_typer_app.registered_commands.append(*most_recent_artifact_typer_app.registered_commands)
+def __getattr__(name: str):
+    # The app is built on first access, so importing a single command does not import the others (see `cli`). It is
+    # then kept in the module, so later accesses do not reach this function and get the same app
+    if name == "dbt_cloud_typer_app":
+        from dbttoolkit.dbt_cloud.actions.retrieve_artifacts_time_interval import (
+            typer_app as artifacts_time_interval_typer_app,
+        )
+        from dbttoolkit.dbt_cloud.actions.retrieve_most_recent_artifact import (
+            typer_app as most_recent_artifact_typer_app,
+        )
+
+        dbt_cloud_typer_app = typer.Typer()
+        dbt_cloud_typer_app.registered_commands.append(*artifacts_time_interval_typer_app.registered_commands)
+        dbt_cloud_typer_app.registered_commands.append(*most_recent_artifact_typer_app.registered_commands)
+        globals()["dbt_cloud_typer_app"] = dbt_cloud_typer_app
+        return dbt_cloud_typer_app
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,6 @@
 from dbttoolkit.dbt_cloud.actions import dbt_cloud_typer_app
+from dbttoolkit.utils.logger import init_logger
 
 if __name__ == "__main__":
+    init_logger()
     dbt_cloud_typer_app()
@@ -0,0 +1,108 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set
+
+from dbttoolkit.dbt_cloud.models.archive_format import ArchiveFormat
+from dbttoolkit.utils.logger import get_logger
+
+logger = get_logger()
+
+RUN_METADATA = "_run"  # The artifact name used for the run metadata file
+
+
+class CheckpointEntry(NamedTuple):
+    """
+    A piece of work of the time interval command: an artifact of a run step, or the run metadata file (no step)
+    """
+
+    run_id: int
+    step: Optional[int]
+    artifact: str
+
+
+class Checkpoint:
+    """
+    A record of the work already completed by previous executions of a backfill, so a rerun can resume where they
+    stopped.
+
+    Every completed entry is appended to a JSON lines file as soon as it is done (including artifacts that do not
+    exist), so the file is consistent even if the process crashes. It can be updated from multiple threads.
+
+    The first line of the file records where and in which format the artifacts are written: work completed for
+    another destination or format does not exist in this one, so such a checkpoint is rejected (`ValueError`).
+    """
+
+    def __init__(self, path: Path, *, destination: str, archive_format: ArchiveFormat) -> None:
+        self.path = Path(path)
+        self.header: Dict[str, str] = {"destination": destination, "archive_format": archive_format.value}
+        self._completed: Set[CheckpointEntry] = self._load()
+        self._lock = threading.Lock()
+
+        if self._completed:
+            logger.info(f"Resuming from checkpoint {self.path}: {len(self._completed)} entries already completed")
+
+    def __contains__(self, entry: object) -> bool:
+        return entry in self._completed
+
+    def add(self, entry: CheckpointEntry) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry._asdict()) + "\n")
+
+            self._completed.add(entry)
+
+    def _load(self) -> Set[CheckpointEntry]:
+        header_line = self._read_header_line()
+
+        if header_line is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(json.dumps(self.header) + "\n")
+
+            return set()
+
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            header = None
+
+        if header != self.header:
+            raise ValueError(
+                f"The checkpoint {self.path} was recorded for another output ({header_line.strip()}), not for "
+                f"{json.dumps(self.header)}: use another checkpoint file"
+            )
+
+        completed = set()
+        line = header_line
+
+        with open(self.path, encoding="utf-8") as file:
+            next(file)
+
+            for line in file:
+                try:
+                    completed.add(CheckpointEntry(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # A crash can leave a partial line: that entry is simply done again
+                    logger.debug(f"Ignoring invalid checkpoint line: {line!r}")
+
+        if not line.endswith("\n"):
+            # Terminates the partial line, so the next entry is not appended to it
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write("\n")
+
+        return completed
+
+    def _read_header_line(self) -> Optional[str]:
+        """
+        :return: the first line of the file, or None for a new file (a crash while writing the header leaves it
+          incomplete, nothing was recorded after it)
+        """
+        if not self.path.exists():
+            return None
+
+        with open(self.path, encoding="utf-8") as file:
+            line = file.readline()
+
+        return line if line.endswith("\n") else None
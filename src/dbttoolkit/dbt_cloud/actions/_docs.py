@@ -5,4 +5,13 @@ HELP = dict(
     project_id="dbt Cloud project id",
     job_id="dbt Cloud job id",
     token="dbt Cloud API token",
+    request_timeout="timeout of every request to the dbt Cloud API, in seconds",
+    max_requests_per_second="if provided, caps the rate of requests to the dbt Cloud API (retries included)",
+    run_cache_path="the SQLite file where the metadata of completed runs is cached",
+    no_cache="do not use the run cache: always list the runs from the dbt Cloud API",
+    artifact_cache_path="if provided, artifacts are cached in this folder, which can be shared by several processes",
+    artifact_cache_max_size="the maximum size of the artifact cache, in MiB (compressed)",
+    stream="copy the artifacts to their destination as they are downloaded, without parsing them. Memory usage does "
+    "not depend on the size of the artifacts, but they are written as served by the API (not indented)",
+    max_retries="how many times a request to the dbt Cloud API is retried after a transient error (429 or 5xx)",
 )
@@ -7,18 +7,40 @@ curl --request GET \
   --header 'Authorization: Token <your token>'
 """
 import json
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Mapping
+from typing import Callable, Iterable, List, Mapping, Optional, Set, Tuple, Union
 
 import requests
 import typer
 
+from dbttoolkit.dbt_cloud.actions._checkpoint import RUN_METADATA, Checkpoint, CheckpointEntry
 from dbttoolkit.dbt_cloud.actions._docs import HELP
-from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+from dbttoolkit.dbt_cloud.clients.artifact_cache import DEFAULT_MAX_BYTES, ArtifactCache
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    DbtCloudClient,
+)
+from dbttoolkit.dbt_cloud.clients.run_cache import DEFAULT_CACHE_PATH, RunCache
+from dbttoolkit.dbt_cloud.models.archive_format import ArchiveFormat, serialize_artifact
 from dbttoolkit.dbt_cloud.models.dbt_artifact import DbtArtifact
-from dbttoolkit.utils.io import persist
-from dbttoolkit.utils.logger import get_logger
+from dbttoolkit.utils.json_stream import JsonStreamReader
+from dbttoolkit.utils.logger import get_logger, init_logger
+from dbttoolkit.utils.storage import (
+    GcsBackend,
+    LocalBackend,
+    StorageBackend,
+    WriteQueue,
+    backend_from_uri,
+    is_remote,
+    temporary_folder_for,
+)
 
 typer_app = typer.Typer()
 logger = get_logger()
@@ -26,9 +48,100 @@ logger = get_logger()
 RELEVANT_ARTIFACTS = [DbtArtifact.sources, DbtArtifact.run_results, DbtArtifact.manifest]
 
 
-def _process_run(client: DbtCloudClient, run: Mapping, output_folder: Path, bucket_name: str = None) -> None:
+def _process_runs(
+    client: DbtCloudClient,
+    runs: Iterable[Mapping],
+    output_folder: Union[str, Path],
+    backend: StorageBackend = None,
+    *,
+    concurrency: int = 1,
+    checkpoint: Checkpoint = None,
+    skip_existing: bool = False,
+    stream: bool = False,
+    archive_format: ArchiveFormat = ArchiveFormat.json,
+) -> List[Mapping]:
     """
-    Processes an individual run, by writing a run metadata file and looping through the run steps
+    Processes the runs, downloading up to `concurrency` artifacts at the same time.
+
+    Runs are isolated from each other: if something fails while processing a run, the error is logged and the other
+    runs are still processed.
+
+    To resume an interrupted execution, the work recorded in the `checkpoint` is skipped, as well as (if
+    `skip_existing`) the files that exist already in the output folder.
+
+    If `stream`, artifacts are copied to their destination as they are downloaded, without parsing them. Otherwise,
+    they are written in the `archive_format`.
+
+    Files are written to the `backend` (by default, the local file system) in the background by a `WriteQueue`, so
+    downloads do not wait for writes. Downloads are held back when too many writes are pending.
+
+    :return: the runs that could not be processed
+    """
+    backend = backend or LocalBackend()
+
+    with WriteQueue(backend, max_workers=concurrency) as queue, ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="download"
+    ) as executor:
+        futures_by_run = [
+            (
+                run,
+                [
+                    executor.submit(task)
+                    for task in _run_tasks(
+                        client,
+                        run,
+                        output_folder,
+                        queue,
+                        checkpoint=checkpoint,
+                        skip_existing=skip_existing,
+                        stream=stream,
+                        archive_format=archive_format,
+                    )
+                ],
+            )
+            for run in runs
+        ]
+
+        failed_runs = []
+
+        for run, futures in futures_by_run:
+            errors = [error for error in (_exception(future) for future in futures) if error is not None]
+
+            if errors:
+                logger.error(f'Failed to process run {run["id"]}: {errors[0]!r}')
+                failed_runs.append(run)
+
+    return failed_runs
+
+
+def _exception(future: Future) -> Optional[BaseException]:
+    """
+    The error of a task, or of the write it submitted
+    """
+    error = future.exception()
+
+    if error is None and isinstance(future.result(), Future):
+        return future.result().exception()
+
+    return error
+
+
+def _run_tasks(
+    client: DbtCloudClient,
+    run: Mapping,
+    output_folder: Union[str, Path],
+    queue: WriteQueue,
+    *,
+    checkpoint: Checkpoint = None,
+    skip_existing: bool = False,
+    stream: bool = False,
+    archive_format: ArchiveFormat = ArchiveFormat.json,
+) -> List[Callable[[], Optional[Future]]]:
+    """
+    The tasks that process an individual run: writing a run metadata file and downloading the artifacts of every
+    run step. They are independent of each other. Work that is done already (see `_process_runs`) is left out.
+
+    Tasks return the future of the write they submit to the `queue`, if any.
     """
     logger.info(f'Processing run {run["id"]} from {run["finished_at_humanized"]} ago')
 
@@ -42,50 +155,213 @@ def _process_run(client: DbtCloudClient, run: Mapping, output_folder: Path, buck
         "run_id={}".format(run["id"]),
     )
 
-    persist(json.dumps(run, indent=2), folder_path, "_run.json", bucket_name=bucket_name)
+    tasks: List[Tuple[CheckpointEntry, Callable[[], Optional[Future]]]] = [
+        (
+            CheckpointEntry(run["id"], None, RUN_METADATA),
+            partial(queue.submit, Path(folder_path, "_run.json").as_posix(), json.dumps(run, indent=2)),
+        )
+    ]
 
     # Enumerate starting at 4 since dbt Cloud indexes steps starting at 1
     # and has 3 internal steps (clone, profile, dbt deps)
     for step_index, _ in enumerate(run["job"]["execute_steps"], 4):
-        _process_step(client, run, step_index, folder_path, bucket_name)
+        step_folder_path = Path(folder_path, f"step={step_index}")
 
+        for artifact_enum in RELEVANT_ARTIFACTS:
+            tasks.append(
+                (
+                    CheckpointEntry(run["id"], step_index, artifact_enum.value),
+                    partial(
+                        _process_artifact,
+                        client,
+                        run,
+                        step_index,
+                        artifact_enum,
+                        step_folder_path,
+                        queue,
+                        stream,
+                        archive_format,
+                    ),
+                )
+            )
 
-def _process_step(
-    client: DbtCloudClient, run: Mapping, step_index: int, folder_path: Path, bucket_name: str = None
-) -> None:
+    existing_files = set(queue.backend.list_files(folder_path.as_posix())) if skip_existing else set()
+    pending_tasks = [
+        (entry, task)
+        for entry, task in tasks
+        if not (checkpoint is not None and entry in checkpoint)
+        and not _is_persisted(entry, existing_files, archive_format)
+    ]
+
+    if len(pending_tasks) < len(tasks):
+        logger.info(
+            f'Skipping {len(tasks) - len(pending_tasks)} of {len(tasks)} files of run {run["id"]} (done already)'
+        )
+
+    if checkpoint is None:
+        return [task for _, task in pending_tasks]
+
+    return [partial(_run_and_checkpoint, task, checkpoint, entry) for entry, task in pending_tasks]
+
+
+def _is_persisted(entry: CheckpointEntry, existing_files: Set[str], archive_format: ArchiveFormat) -> bool:
+    """
+    Whether the file of the entry exists, given the files in the folder of its run
+    """
+    if entry.step is None:
+        return "_run.json" in existing_files
+
+    step_folder = f"step={entry.step}/"
+
+    # The command that generated the run results is part of their file name, see `_generate_step_filename`
+    artifact_enum = DbtArtifact(entry.artifact)
+    extension = archive_format.extension(artifact_enum)
+
+    if artifact_enum == DbtArtifact.run_results:
+        suffix = f"_{entry.artifact}{extension}"
+        return any(file.startswith(step_folder) and file.endswith(suffix) for file in existing_files)
+
+    return f"{step_folder}{entry.artifact}{extension}" in existing_files
+
+
+def _run_and_checkpoint(
+    task: Callable[[], Optional[Future]], checkpoint: Checkpoint, entry: CheckpointEntry
+) -> Optional[Future]:
+    upload = task()
+
+    if upload is None:
+        checkpoint.add(entry)
+    else:
+        # The entry is only complete once its file is written
+        upload.add_done_callback(lambda done: checkpoint.add(entry) if done.exception() is None else None)
+
+    return upload
+
+
+def _process_artifact(
+    client: DbtCloudClient,
+    run: Mapping,
+    step_index: int,
+    artifact_enum: DbtArtifact,
+    step_folder_path: Path,
+    queue: WriteQueue,
+    stream: bool = False,
+    archive_format: ArchiveFormat = ArchiveFormat.json,
+) -> Optional[Future]:
+    """
+    Downloads an artifact of a run step and writes it in the file system. Steps do not generate all artifacts, so
+    client errors (i.e. not found) are ignored. Server errors that persist after the retries of the client are raised.
     """
-    Processes an individual run step, by writing the artifacts in the file system
+    logger.info(f'Downloading {artifact_enum.name} (run {run["id"]}, step {step_index})')
+
+    try:
+        if stream:
+            return _stream_artifact(client, run, step_index, artifact_enum, step_folder_path, queue)
+
+        artifact = client.retrieve_artifact_from_run(run["id"], artifact_enum.value, step=step_index)
+    except requests.exceptions.HTTPError as error:
+        if error.response is not None and error.response.status_code >= 500:
+            raise
+
+        logger.debug(f"Artifact not found: {artifact_enum.name}")
+        return None
+
+    command_executed = artifact["args"]["which"] if artifact_enum == DbtArtifact.run_results else None
+    filename = _generate_step_filename(artifact_enum, command_executed, archive_format)
+    content = serialize_artifact(artifact, artifact_enum, archive_format)
+    return queue.submit(Path(step_folder_path, filename).as_posix(), content)
+
+
+def _stream_artifact(
+    client: DbtCloudClient,
+    run: Mapping,
+    step_index: int,
+    artifact_enum: DbtArtifact,
+    step_folder_path: Path,
+    queue: WriteQueue,
+) -> Optional[Future]:
+    """
+    Downloads an artifact to a temporary file and moves it to its destination as is, without parsing it. Only the
+    command of run results is read, for their file name.
+    """
+    temporary_folder = temporary_folder_for(queue.backend, step_folder_path.as_posix())
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=temporary_folder, suffix=".json.tmp")
+
+    try:
+        with os.fdopen(file_descriptor, "w+b") as file:
+            client.download_artifact_from_run(run["id"], artifact_enum.value, file, step=step_index)
+
+        command_executed = _read_command(Path(temporary_path)) if artifact_enum == DbtArtifact.run_results else None
+        filename = _generate_step_filename(artifact_enum, command_executed)
+
+        # The file is deleted by the queue once written
+        return queue.submit_file(Path(step_folder_path, filename).as_posix(), Path(temporary_path))
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+            # Do not leave empty folders behind for artifacts that do not exist
+            if temporary_folder is not None and not any(temporary_folder.iterdir()):
+                temporary_folder.rmdir()
+
+        raise
+
+
+def _read_command(path: Path) -> str:
     """
-    step_folder_path = Path(folder_path, f"step={step_index}")
+    Reads `args.which` from a run results file, skipping everything else without materializing it
+    """
+    with open(path, encoding="utf-8") as file:
+        reader = JsonStreamReader(file)
+
+        for key in reader.iter_members():
+            if key != "args":
+                reader.skip_value()
+                continue
+
+            for argument in reader.iter_members():
+                if argument == "which":
+                    return reader.read_value()
 
-    for artifact_enum in RELEVANT_ARTIFACTS:
-        logger.info(f"Downloading {artifact_enum.name}")
+                reader.skip_value()
 
-        try:
-            artifact = client.retrieve_artifact_from_run(run["id"], artifact_enum.value, step=step_index)
-            filename = _generate_step_filename(artifact, artifact_enum)
-            persist(json.dumps(artifact, indent=2), step_folder_path, filename, bucket_name=bucket_name)
-        except requests.exceptions.HTTPError:
-            logger.debug(f"Artifact not found: {artifact_enum.name}")
+    raise KeyError(f"No `args.which` in {path}")
 
 
-def _generate_step_filename(artifact: Mapping, artifact_name: str):
+def _generate_step_filename(
+    artifact_name: DbtArtifact, command_executed: str = None, archive_format: ArchiveFormat = ArchiveFormat.json
+) -> str:
     """
     If this is a run result, we append which command generated it to the filename.
     This makes it easier for consumers that are interested in only run results from tests
     or only run results from models to only open the files they need.
     """
+    extension = archive_format.extension(artifact_name)
+
     if artifact_name == DbtArtifact.run_results:
-        command_executed = artifact["args"]["which"]
-        return f"{command_executed}_{artifact_name}.json"
+        return f"{command_executed}_{artifact_name.value}{extension}"
+
+    # For all other artifacts, just use the original artifact_name
+    return f"{artifact_name.value}{extension}"
 
-        # For all other artifacts, just use the original artifact_name
-    return f"{artifact_name}.json"
+
+def _destination(output_folder: str, gcs_bucket_name: Optional[str]) -> str:
+    """
+    :return: where the artifacts are written, as recorded in the checkpoint: a URI, or an absolute local path
+    """
+    if gcs_bucket_name:
+        return f"gs://{gcs_bucket_name}/{output_folder}"
+
+    return output_folder if is_remote(output_folder) else str(Path(output_folder).resolve())
 
 
 @typer_app.command("retrieve-artifacts-time-interval")
 def run(
-    output_folder: Path = typer.Option(..., help=HELP["output_folder"]),
+    output_folder: str = typer.Option(
+        ...,
+        help="the folder where the retrieved artifacts will be written: a local path, or a gs://<bucket>/<path> or "
+        "s3://<bucket>/<path> URI",
+    ),
     gcs_bucket_name: str = typer.Option(
         None,
         help="if provided, it will write to a GCS bucket instead of in "
@@ -99,22 +375,116 @@ def run(
     account_id: int = typer.Option(..., envvar="DBT_CLOUD_ACCOUNT_ID", help=HELP["account_id"]),
     project_id: int = typer.Option(..., envvar="DBT_CLOUD_PROJECT_ID", help=HELP["project_id"]),
     token: str = typer.Option(..., envvar="DBT_CLOUD_TOKEN", help=HELP["token"]),
+    concurrency: int = typer.Option(1, min=1, help="how many artifacts are downloaded at the same time"),
+    page_concurrency: int = typer.Option(
+        1, min=1, help="how many pages of runs are requested at the same time when listing the runs of the interval"
+    ),
+    checkpoint_path: Path = typer.Option(
+        None,
+        help="if provided, the completed work is recorded in this file. When the command is executed again with the "
+        "same file (e.g. after a crash), the work recorded in it is skipped.",
+    ),
+    skip_existing: bool = typer.Option(
+        False, "--skip-existing", help="skip the files that exist already in the output folder (or bucket)"
+    ),
+    stream: bool = typer.Option(False, "--stream", help=HELP["stream"]),
+    output_format: ArchiveFormat = typer.Option(
+        ArchiveFormat.json.value,
+        help="how the artifacts are written: indented JSON, compressed JSON, newline-delimited JSON or Parquet. With "
+        "ndjson and parquet, run results and sources are flattened to a row per node.",
+    ),
+    max_requests_per_second: float = typer.Option(
+        None, envvar="DBT_CLOUD_MAX_REQUESTS_PER_SECOND", help=HELP["max_requests_per_second"]
+    ),
+    request_timeout: float = typer.Option(
+        DEFAULT_TIMEOUT, envvar="DBT_CLOUD_REQUEST_TIMEOUT", help=HELP["request_timeout"]
+    ),
+    max_retries: int = typer.Option(DEFAULT_MAX_RETRIES, envvar="DBT_CLOUD_MAX_RETRIES", help=HELP["max_retries"]),
+    run_cache_path: Path = typer.Option(
+        DEFAULT_CACHE_PATH, envvar="DBT_CLOUD_RUN_CACHE_PATH", help=HELP["run_cache_path"]
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help=HELP["no_cache"]),
+    artifact_cache_path: Path = typer.Option(
+        None, envvar="DBT_CLOUD_ARTIFACT_CACHE_PATH", help=HELP["artifact_cache_path"]
+    ),
+    artifact_cache_max_size: int = typer.Option(
+        DEFAULT_MAX_BYTES // 1024 // 1024, min=1, help=HELP["artifact_cache_max_size"]
+    ),
 ) -> None:
     """
     Retrieves artifacts from all runs between start_time (inclusive) and end_time (not inclusive).
     """
+    if stream and output_format != ArchiveFormat.json:
+        raise typer.BadParameter("Streamed artifacts are written as served, only the json output format is supported")
+
+    try:
+        output_format.check_dependencies()
+    except ImportError as error:
+        raise typer.BadParameter(str(error))
+
+    try:
+        backend, output_path = (
+            (GcsBackend(gcs_bucket_name), output_folder) if gcs_bucket_name else backend_from_uri(output_folder)
+        )
+    except ImportError as error:
+        raise typer.BadParameter(str(error))
+
+    try:
+        checkpoint = (
+            Checkpoint(
+                checkpoint_path, destination=_destination(output_folder, gcs_bucket_name), archive_format=output_format
+            )
+            if checkpoint_path
+            else None
+        )
+    except ValueError as error:
+        raise typer.BadParameter(str(error))
+
     start_time = start_time.replace(tzinfo=timezone.utc)
     end_time = end_time.replace(tzinfo=timezone.utc)
 
-    client = DbtCloudClient(account_id=account_id, project_id=project_id, environment_id=environment_id, token=token)
+    client = DbtCloudClient(
+        account_id=account_id,
+        project_id=project_id,
+        environment_id=environment_id,
+        token=token,
+        timeout=request_timeout,
+        max_retries=max_retries,
+        run_cache=None if no_cache else RunCache(run_cache_path),
+        artifact_cache=(
+            ArtifactCache(artifact_cache_path, max_bytes=artifact_cache_max_size * 1024 * 1024)
+            if artifact_cache_path
+            else None
+        ),
+        pool_size=max(concurrency, page_concurrency, DEFAULT_POOL_SIZE),
+        max_requests_per_second=max_requests_per_second,
+        page_concurrency=page_concurrency,
+    )
     logger.info(f"Initializing dbt Cloud client for account {account_id}, project {project_id}")
 
-    runs = client.retrieve_runs_finished_between(start_time, end_time)
+    try:
+        runs = client.retrieve_runs_finished_between(start_time, end_time)
+        failed_runs = _process_runs(
+            client,
+            runs,
+            output_path,
+            backend,
+            concurrency=concurrency,
+            checkpoint=checkpoint,
+            skip_existing=skip_existing,
+            stream=stream,
+            archive_format=output_format,
+        )
+    finally:
+        logger.info(f"dbt Cloud API usage: {client.metrics}")
+        client.close()
 
-    for run in runs:
-        _process_run(client, run, output_folder, gcs_bucket_name)
+    if failed_runs:
+        logger.error(f"{len(failed_runs)} of {len(runs)} runs failed: {[run['id'] for run in failed_runs]}")
+        raise typer.Exit(code=1)
 
 
 # Entry point for direct execution
 if __name__ == "__main__":
+    init_logger()
     typer_app()
@@ -7,15 +7,19 @@ curl --request GET \
   --header 'Authorization: Token <your token>'
 """
 import json
+import os
+import tempfile
 from pathlib import Path
 
 import typer
 
 from dbttoolkit.dbt_cloud.actions._docs import HELP
-from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+from dbttoolkit.dbt_cloud.clients.artifact_cache import DEFAULT_MAX_BYTES, ArtifactCache
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DEFAULT_MAX_RETRIES, DEFAULT_TIMEOUT, DbtCloudClient
+from dbttoolkit.dbt_cloud.clients.run_cache import DEFAULT_CACHE_PATH, RunCache
 from dbttoolkit.dbt_cloud.models.dbt_artifact import DbtArtifact
-from dbttoolkit.utils.io import write_to_file
-from dbttoolkit.utils.logger import get_logger
+from dbttoolkit.utils.io import persist_file, write_to_file
+from dbttoolkit.utils.logger import get_logger, init_logger
 
 typer_app = typer.Typer()
 logger = get_logger()
@@ -36,20 +40,76 @@ def run(
     project_id: int = typer.Option(..., envvar="DBT_CLOUD_PROJECT_ID", help=HELP["project_id"]),
     job_id: int = typer.Option(..., envvar="DBT_CLOUD_JOB_ID", help=HELP["job_id"]),
     token: str = typer.Option(..., envvar="DBT_CLOUD_TOKEN", help=HELP["token"]),
+    request_timeout: float = typer.Option(
+        DEFAULT_TIMEOUT, envvar="DBT_CLOUD_REQUEST_TIMEOUT", help=HELP["request_timeout"]
+    ),
+    max_retries: int = typer.Option(DEFAULT_MAX_RETRIES, envvar="DBT_CLOUD_MAX_RETRIES", help=HELP["max_retries"]),
+    run_cache_path: Path = typer.Option(
+        DEFAULT_CACHE_PATH, envvar="DBT_CLOUD_RUN_CACHE_PATH", help=HELP["run_cache_path"]
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help=HELP["no_cache"]),
+    artifact_cache_path: Path = typer.Option(
+        None, envvar="DBT_CLOUD_ARTIFACT_CACHE_PATH", help=HELP["artifact_cache_path"]
+    ),
+    artifact_cache_max_size: int = typer.Option(
+        DEFAULT_MAX_BYTES // 1024 // 1024, min=1, help=HELP["artifact_cache_max_size"]
+    ),
+    stream: bool = typer.Option(False, "--stream", help=HELP["stream"]),
 ) -> None:
     """
     Retrieves the `artifact_name` from the latest run from a job.
     """
-    client = DbtCloudClient(account_id=account_id, project_id=project_id, environment_id=environment_id, token=token)
+    client = DbtCloudClient(
+        account_id=account_id,
+        project_id=project_id,
+        environment_id=environment_id,
+        token=token,
+        timeout=request_timeout,
+        max_retries=max_retries,
+        # The cache is only used to search for the run of the preferred commit
+        run_cache=None if no_cache or not preferred_commit else RunCache(run_cache_path),
+        artifact_cache=(
+            ArtifactCache(artifact_cache_path, max_bytes=artifact_cache_max_size * 1024 * 1024)
+            if artifact_cache_path
+            else None
+        ),
+    )
     logger.info(f"Initializing dbt Cloud client for account {account_id}, project {project_id}, job {job_id}")
 
-    run = client.retrieve_most_recent_run_for_job(job_id, preferred_commit)
-    logger.info(f'Retrieved run {run["id"]} from {run["finished_at_humanized"]} ago (commit: {run["git_sha"]})')
+    try:
+        run = client.retrieve_most_recent_run_for_job(job_id, preferred_commit)
+        logger.info(f'Retrieved run {run["id"]} from {run["finished_at_humanized"]} ago (commit: {run["git_sha"]})')
+
+        if stream:
+            _stream_artifact(client, run["id"], artifact_name, output_folder)
+            return
+
+        manifest = client.retrieve_artifact_from_run(run["id"], artifact_name)
+    finally:
+        logger.info(f"dbt Cloud API usage: {client.metrics}")
+        client.close()
+
+    write_to_file(json.dumps(manifest, indent=2), output_folder, f"{artifact_name.value}.json")
+
+
+def _stream_artifact(client: DbtCloudClient, run_id: int, artifact_name: DbtArtifact, output_folder: Path) -> None:
+    """
+    Downloads the artifact to a temporary file in the output folder, which is renamed once complete
+    """
+    output_folder.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=output_folder, suffix=".json.tmp")
+
+    try:
+        with os.fdopen(file_descriptor, "w+b") as file:
+            client.download_artifact_from_run(run_id, artifact_name, file)
 
-    manifest = client.retrieve_artifact_from_run(run["id"], artifact_name)
-    write_to_file(json.dumps(manifest, indent=2), output_folder, f"{artifact_name}.json")
+        persist_file(Path(temporary_path), output_folder, f"{artifact_name.value}.json")
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
 
 
 # Entry point for direct execution
 if __name__ == "__main__":
+    init_logger()
     typer_app()
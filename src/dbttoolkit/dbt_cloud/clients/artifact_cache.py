@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from dbttoolkit.utils.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024 * 1024  # Of compressed artifacts
+CHUNK_SIZE = 1024 * 1024
+
+
+class ArtifactKey(NamedTuple):
+    """
+    Identifies an artifact of a finished run
+    """
+
+    account_id: int
+    run_id: int
+    step: Optional[int]
+    artifact_name: str
+
+    def digest(self) -> str:
+        return hashlib.sha256("/".join(str(part) for part in self).encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """
+    A local, content-addressed store of artifacts of finished runs, which never change.
+
+    Artifacts are stored once per content, compressed, as `blobs/<sha256 of the content>.json.gz`. A small file
+    per key (`keys/<sha256 of the key>`) points to the blob of the artifact. Blobs are evicted in least recently used
+    order when their total size exceeds `max_bytes`; keys pointing to evicted blobs are treated as misses.
+
+    All files are written atomically (to a temporary file, then renamed), so the directory can be shared by several
+    processes.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._blobs_path = self.path / "blobs"
+        self._keys_path = self.path / "keys"
+        self._blobs_path.mkdir(parents=True, exist_ok=True)
+        self._keys_path.mkdir(parents=True, exist_ok=True)
+
+    def retrieve(self, key: ArtifactKey) -> Optional[bytes]:
+        """
+        :return: the content of the artifact, or None if it is not in the cache
+        """
+        output = io.BytesIO()
+
+        if not self.retrieve_to(key, output):
+            return None
+
+        return output.getvalue()
+
+    def retrieve_to(self, key: ArtifactKey, output: BinaryIO) -> bool:
+        """
+        Writes the content of the artifact to a binary file, a chunk at a time
+
+        :return: False if the artifact is not in the cache
+        """
+        try:
+            content_hash = (self._keys_path / key.digest()).read_text()
+            blob_path = self._blob_path(content_hash)
+
+            with gzip.open(blob_path, "rb") as file:
+                shutil.copyfileobj(file, output, CHUNK_SIZE)
+
+            # The modification time of the blobs is their last use, for evictions
+            os.utime(blob_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def store(self, key: ArtifactKey, content: bytes) -> None:
+        self.store_from(key, io.BytesIO(content))
+
+    def store_from(self, key: ArtifactKey, source: BinaryIO) -> None:
+        """
+        Stores the content of a binary file (from its current position), a chunk at a time
+        """
+        content_hash = hashlib.sha256()
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._blobs_path, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file, gzip.GzipFile(fileobj=file, mode="wb") as compressed_file:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    content_hash.update(chunk)
+                    compressed_file.write(chunk)
+
+            blob_path = self._blob_path(content_hash.hexdigest())
+
+            if blob_path.exists():
+                os.remove(temporary_path)
+                os.utime(blob_path)
+            else:
+                os.replace(temporary_path, blob_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+        self._write_atomically(self._keys_path / key.digest(), content_hash.hexdigest().encode("ascii"))
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Deletes the least recently used blobs until their total size is under `max_bytes`
+        """
+        blobs = []
+
+        for entry in os.scandir(self._blobs_path):
+            if entry.name.endswith(".json.gz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # Evicted by another process
+                    continue
+
+                blobs.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in blobs)
+
+        for _, size, path in sorted(blobs):
+            if total_bytes <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total_bytes -= size
+            logger.debug(f"Evicted artifact from the cache: {path}")
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self._blobs_path / f"{content_hash}.json.gz"
+
+    @staticmethod
+    def _write_atomically(path: Path, content: bytes) -> None:
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(content)
+
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
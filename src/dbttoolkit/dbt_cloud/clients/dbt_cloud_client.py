@@ -1,20 +1,95 @@
-from dataclasses import dataclass
-from datetime import datetime
-from typing import ClassVar, Dict, Iterable, List, Mapping, Optional
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from typing import BinaryIO, ClassVar, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from dbttoolkit.dbt_cloud.clients.artifact_cache import ArtifactCache, ArtifactKey
+from dbttoolkit.dbt_cloud.clients.rate_limiter import RateLimiter
+from dbttoolkit.dbt_cloud.clients.run_cache import RUN_CACHE_ERRORS, RunCache, RunScope, Watermark
+from dbttoolkit.dbt_cloud.models.run_status import RunStatus
+from dbttoolkit.utils.io import json_loads
 from dbttoolkit.utils.logger import get_logger
 
 logger = get_logger()
 
+DBT_CLOUD_API_URL = "https://cloud.getdbt.com/api/v2"
 STANDARD_PAGE_SIZE = 100
 
+# The objects embedded in every run by default. The job is needed to know the steps of a run
+RELATED_OBJECTS = ("job", "environment", "trigger")
+
+DEFAULT_TIMEOUT = 60.0  # In seconds
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 1.0  # In seconds, doubled after every retry
+DEFAULT_POOL_SIZE = 10
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class ClientMetrics:
+    """
+    Counters of the HTTP requests made by a client, to keep track of the API usage of a run. Safe to update from
+    multiple threads through `record`.
+    """
+
+    requests: int = 0  # Including retries
+    retries: int = 0
+    bytes_received: int = 0
+    latency: float = 0.0  # Sum of the time spent in all requests, in seconds
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def record(self, *, latency: float, bytes_received: int = 0, retried: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += retried
+            self.bytes_received += bytes_received
+            self.latency += latency
+
+    def record_bytes(self, bytes_received: int) -> None:
+        """
+        For streamed responses, whose size is only known once they have been consumed
+        """
+        with self._lock:
+            self.bytes_received += bytes_received
+
+    def __str__(self) -> str:
+        average_latency = self.latency / self.requests if self.requests else 0.0
+        return (
+            f"{self.requests} requests ({self.retries} retries), {self.bytes_received / 1024 / 1024:.1f} MiB received, "
+            f"{average_latency:.2f}s average latency"
+        )
+
 
 @dataclass
 class DbtCloudClient:
     """
-    A wrapper around the dbt Cloud REST API
+    A wrapper around the dbt Cloud REST API.
+
+    All requests go through a single pooled session. Requests that fail with a connection error, a timeout or a
+    retryable status code (see `RETRYABLE_STATUS_CODES`) are retried with exponential backoff, honouring the
+    `Retry-After` header when the API sends one.
+
+    The client can be shared by multiple threads. If `max_requests_per_second` is set, the requests of all threads
+    (retries included) are throttled together.
+
+    If a `run_cache` is given, the metadata of completed runs is cached, and listing runs only requests the ones
+    that are not in the cache yet. Likewise, if an `artifact_cache` is given, artifacts are only downloaded once.
+
+    When listing the runs of a period (`retrieve_completed_runs`), up to `page_concurrency` pages are requested at
+    the same time.
     """
 
     account_id: int
@@ -22,7 +97,31 @@ class DbtCloudClient:
     environment_id: int
     token: str
 
-    BASE_URL: ClassVar[str] = "https://cloud.getdbt.com/api/v2"
+    timeout: float = DEFAULT_TIMEOUT
+    max_retries: int = DEFAULT_MAX_RETRIES
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR
+    pool_size: int = DEFAULT_POOL_SIZE
+    max_requests_per_second: Optional[float] = None
+    page_concurrency: int = 1
+    run_cache: Optional[RunCache] = field(default=None, repr=False)
+    artifact_cache: Optional[ArtifactCache] = field(default=None, repr=False)
+    base_url: str = field(default=DBT_CLOUD_API_URL, repr=False)
+
+    metrics: ClientMetrics = field(default_factory=ClientMetrics, init=False)
+    session: requests.Session = field(init=False, repr=False)
+    rate_limiter: Optional[RateLimiter] = field(init=False, repr=False)
+
+    BASE_URL: ClassVar[str] = DBT_CLOUD_API_URL
+
+    def __post_init__(self) -> None:
+        self.session = requests.Session()
+        self.session.headers.update(self._default_headers())
+
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.rate_limiter = RateLimiter(self.max_requests_per_second) if self.max_requests_per_second else None
 
     def retrieve_runs_finished_between(self, start_time: datetime, end_time: datetime) -> List[Dict]:
         """
@@ -57,9 +156,29 @@ class DbtCloudClient:
         """
         logger.info(f"Retrieving most recent run for job {job_id} (preferred commit: {preferred_commit})")
 
-        completed_runs = self.retrieve_completed_runs()
-        successful_runs = self.filter_successful_runs(completed_runs)
-        successful_runs = [run for run in successful_runs if run["job_id"] == job_id]
+        # Without a preferred commit, the first successful run is enough: usually, a single request for a single run
+        runs_to_search = STANDARD_PAGE_SIZE if preferred_commit else 1
+        successful_runs: List[Dict] = []
+
+        if self.run_cache is not None and preferred_commit:
+            # Searching for a commit needs the recent history of the job, which is kept in the cache. The most recent
+            # run alone is requested directly: syncing the cache costs at least a full page of runs
+            try:
+                self._sync_run_cache()
+                successful_runs = self.run_cache.successful_runs(self._run_scope(), job_id=job_id, limit=runs_to_search)
+            except RUN_CACHE_ERRORS as error:
+                self._disable_run_cache(error)
+
+        if not successful_runs:
+            runs = self.iter_runs(job_id=job_id, status=RunStatus.success, page_size=runs_to_search)
+
+            # The filters are applied by the API already, this is only a safeguard
+            successful_runs = list(
+                islice(
+                    (run for run in self._filter_completed_runs(runs) if run["is_success"] and run["job_id"] == job_id),
+                    runs_to_search,
+                )
+            )
 
         if preferred_commit:
             runs_from_preferred_commit = [run for run in successful_runs if run["git_sha"] == preferred_commit]
@@ -78,75 +197,300 @@ class DbtCloudClient:
         """
         Returns the artifact from a given run
 
+        Artifacts of finished runs never change: if the client has an `artifact_cache`, they are only downloaded once.
+
         :param run_id: the id the the run
         :param artifact_name: the name of the artifact
         :param step: step index, starting at 1
         :return: the parsed (dict) artifact
         """
+        # Also accepts a `DbtArtifact`, whose string representation is not its value in all Python versions
+        artifact_name = getattr(artifact_name, "value", artifact_name)
+        key = ArtifactKey(self.account_id, run_id, step or None, artifact_name)
+
+        if self.artifact_cache is not None:
+            content = self.artifact_cache.retrieve(key)
+
+            if content is not None:
+                logger.debug(f"Artifact retrieved from the cache: {key}")
+                return json_loads(content)
 
         params: Optional[Mapping] = None
 
         if step:
             params = {"step": step}
 
-        response = requests.get(
-            self.BASE_URL + f"/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_name}.json",
-            params=params,
-            headers=self._default_headers(),
-        )
-        response.raise_for_status()
-        return response.json()
+        response = self._get(f"/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_name}.json", params=params)
+
+        if self.artifact_cache is not None:
+            self.artifact_cache.store(key, response.content)
+
+        return json_loads(response.content)
+
+    def download_artifact_from_run(self, run_id: int, artifact_name: str, file: BinaryIO, *, step: int = None) -> None:
+        """
+        Writes the artifact from a given run to a binary file as it is downloaded, a chunk at a time, without
+        parsing it. Memory usage does not depend on the size of the artifact.
+
+        If the connection breaks while downloading, the download is retried from the start: the file is truncated
+        from its initial position.
+
+        :param run_id: the id the the run
+        :param artifact_name: the name of the artifact
+        :param file: the binary file, which must be seekable
+        :param step: step index, starting at 1
+        """
+        artifact_name = getattr(artifact_name, "value", artifact_name)
+        key = ArtifactKey(self.account_id, run_id, step or None, artifact_name)
+        start_position = file.tell()
+
+        if self.artifact_cache is not None and self.artifact_cache.retrieve_to(key, file):
+            logger.debug(f"Artifact retrieved from the cache: {key}")
+            return
+
+        params = {"step": step} if step else None
+        attempt = 0
+
+        while True:
+            response = self._get(
+                f"/accounts/{self.account_id}/runs/{run_id}/artifacts/{artifact_name}.json", params=params, stream=True
+            )
+            file.seek(start_position)
+            file.truncate()
+
+            try:
+                with response:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+                        self.metrics.record_bytes(len(chunk))
+                break
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as error:
+                if attempt >= self.max_retries:
+                    raise
+
+                logger.warning(f"Download of {key} interrupted ({error}), retrying")
+                attempt += 1
+
+        if self.artifact_cache is not None:
+            file.seek(start_position)
+            self.artifact_cache.store_from(key, file)
 
     def retrieve_completed_runs(
         self, *, page_size: int = STANDARD_PAGE_SIZE, created_after: datetime = None
     ) -> List[Dict]:
         """
-        Retrieves an arbitrary amount of recent completed runs
+        Retrieves an arbitrary amount of recent completed runs, with their related objects (see `RELATED_OBJECTS`)
 
+        :param page_size: how many runs are requested at a time
+        :param created_after: if provided, pages are requested until one ends with a run created before this time
         :return: a list of runs
         """
-        runs = []
-        page = 0
+        if self.run_cache is not None and created_after:
+            try:
+                self._sync_run_cache(created_after)
+                return self.run_cache.completed_runs(self._run_scope(), since=created_after)
+            except RUN_CACHE_ERRORS as error:
+                self._disable_run_cache(error)
 
-        fetch_next_page = True
-
-        while fetch_next_page:
-            # A bit weird, but they do expect a string with an array inside
-            params = {
-                "order_by": "-id",
-                "limit": str(page_size),
-                "offset": str(page * page_size),
-                "include_related": '["job", "environment", "trigger"]',
-            }
-
-            response = requests.get(
-                self.BASE_URL + f"/accounts/{self.account_id}/runs", params=params, headers=self._default_headers()
-            )
-            response.raise_for_status()
+        runs = []
 
-            data = response.json()["data"]
+        for page, data in enumerate(
+            self.iter_run_pages(include_related=RELATED_OBJECTS, page_size=page_size, concurrency=self.page_concurrency)
+        ):
             runs += data
 
             # Pagination: if the last record on this page was created after the time given, check the next page
             last_created_at = datetime.fromisoformat(data[-1]["created_at"])
 
-            if created_after and last_created_at >= created_after:
-                logger.info(f"Last result on page {page} ({last_created_at}) >= created after filter ({created_after})")
-                page += 1
-                fetch_next_page = True
-            else:
-                fetch_next_page = False
+            if not created_after or last_created_at < created_after:
+                break
 
-        completed_runs = [
-            run
-            for run in runs
-            if run["is_complete"]
-            and not run["is_cancelled"]
-            and run["project_id"] == self.project_id
-            and run["environment_id"] == self.environment_id
-        ]
+            logger.info(f"Last result on page {page} ({last_created_at}) >= created after filter ({created_after})")
+
+        return list(self._filter_completed_runs(runs))
+
+    def iter_runs(
+        self,
+        *,
+        job_id: int = None,
+        status: RunStatus = None,
+        include_related: Sequence[str] = (),
+        page_size: int = STANDARD_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Lazily iterates over the runs of the project and environment of the client, from the most recent one.
+        Pages are only requested when the previous one has been consumed, so callers that stop iterating early save
+        the remaining requests.
+
+        See `iter_run_pages` for the parameters.
+        """
+        for data in self.iter_run_pages(
+            job_id=job_id, status=status, include_related=include_related, page_size=page_size
+        ):
+            yield from data
+
+    def iter_run_pages(
+        self,
+        *,
+        job_id: int = None,
+        status: RunStatus = None,
+        include_related: Sequence[str] = (),
+        page_size: int = STANDARD_PAGE_SIZE,
+        concurrency: int = 1,
+    ) -> Iterator[List[Dict]]:
+        """
+        Lazily iterates over pages of runs of the project and environment of the client, from the most recent one.
+        The filters are applied by the API.
+
+        Runs created while iterating shift the older ones to the following pages, so a run can be returned by two
+        pages: it is only yielded once.
+
+        :param job_id: if provided, only the runs of this job
+        :param status: if provided, only the runs with this status
+        :param include_related: the related objects embedded in every run (see `RELATED_OBJECTS`). Leaving them out
+          makes the responses much smaller
+        :param page_size: how many runs are requested at a time
+        :param concurrency: if greater than 1, the following pages are requested ahead of the iteration, up to
+          `concurrency` at the same time (see `_request_run_pages`). Callers that stop iterating early waste up to
+          `concurrency` requests
+        """
+        params: Dict[str, str] = {
+            "order_by": "-id",
+            "limit": str(page_size),
+            "project_id": str(self.project_id),
+            "environment_id": str(self.environment_id),
+        }
+
+        if job_id is not None:
+            params["job_definition_id"] = str(job_id)
+        if status is not None:
+            params["status"] = str(int(status))
+        if include_related:
+            # A bit weird, but they do expect a string with an array inside
+            params["include_related"] = json.dumps(list(include_related))
+
+        seen_run_ids: Set[int] = set()
+
+        for data in self._request_run_pages(params, page_size, concurrency):
+            new_runs = [run for run in data if run["id"] not in seen_run_ids]
+            seen_run_ids.update(run["id"] for run in new_runs)
+
+            if new_runs:
+                yield new_runs
+
+    def _request_run_pages(self, params: Mapping[str, str], page_size: int, concurrency: int) -> Iterator[List[Dict]]:
+        """
+        Requests the pages of runs in order, until one is not full.
+
+        With a `concurrency` greater than 1, the first page tells how many runs there are (`total_count`), and the
+        following pages are requested up to `concurrency` at the same time: listing takes about a round trip per
+        `concurrency` pages instead of one per page. Without a total count, pages are requested until one is not
+        full.
+        """
+        if concurrency <= 1:
+            offset = 0
+
+            while True:
+                data = self._request_run_page(params, offset)["data"]
+                yield data
+
+                if len(data) < page_size:
+                    return
+
+                offset += page_size
+
+        body = self._request_run_page(params, 0)
+        offset = page_size
+        pending: Deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="run-pages") as executor:
+            try:
+                while True:
+                    data = body["data"]
+                    yield data
+
+                    if len(data) < page_size:
+                        return
+
+                    # Every page has the current total count, which grows with the runs created while listing
+                    total_count = (body.get("extra") or {}).get("pagination", {}).get("total_count")
+                    known_runs = float("inf") if total_count is None else total_count
+
+                    while len(pending) < concurrency and offset < known_runs:
+                        pending.append(executor.submit(self._request_run_page, params, offset))
+                        offset += page_size
+
+                    if not pending:
+                        return
+
+                    body = pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _request_run_page(self, params: Mapping[str, str], offset: int) -> Dict:
+        return self._get(f"/accounts/{self.account_id}/runs", params={**params, "offset": str(offset)}).json()
+
+    def _sync_run_cache(self, created_after: datetime = None) -> None:
+        """
+        Requests the runs that are not in the cache yet: the ones above the high-water mark and, if `created_after`
+        is before the period covered by the cache, the older ones too.
+        """
+        assert self.run_cache is not None
+
+        scope = self._run_scope()
+        self.run_cache.evict(scope)
+        watermark = self.run_cache.watermark(scope)
+        needs_older_runs = created_after is not None and (watermark is None or created_after < watermark.covered_since)
+
+        run_ids: List[int] = []
+        incomplete_run_ids: List[int] = []
+        oldest_created_at: Optional[datetime] = None
+
+        for data in self.iter_run_pages(include_related=RELATED_OBJECTS, concurrency=self.page_concurrency):
+            self.run_cache.store(scope, data)
+
+            run_ids += [run["id"] for run in data]
+            incomplete_run_ids += [run["id"] for run in data if not run["is_complete"]]
+
+            last_run = data[-1]
+            oldest_created_at = datetime.fromisoformat(last_run["created_at"])
+
+            if needs_older_runs:
+                if created_after and oldest_created_at < created_after:
+                    break
+            elif watermark is None or last_run["id"] <= watermark.high_run_id:
+                break
+
+        if not run_ids or oldest_created_at is None:
+            return
 
-        return completed_runs
+        # Runs above an incomplete one must be requested again, since they might complete later
+        high_run_id = min(incomplete_run_ids) - 1 if incomplete_run_ids else max(run_ids)
+        covered_since = min(oldest_created_at, watermark.covered_since) if watermark else oldest_created_at
+
+        self.run_cache.update_watermark(scope, Watermark(high_run_id, covered_since))
+        logger.info(f"Run cache synced up to run {high_run_id}, covering runs since {covered_since}")
+
+    def _disable_run_cache(self, error: Exception) -> None:
+        logger.warning(f"The run cache cannot be used, listing the runs from the API instead: {error}")
+        self.run_cache = None
+
+    def _run_scope(self) -> RunScope:
+        return RunScope(self.account_id, self.project_id, self.environment_id)
+
+    def _filter_completed_runs(self, runs: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        The runs from the project and environment of the client that completed without being cancelled.
+        """
+        for run in runs:
+            if (
+                run["is_complete"]
+                and not run["is_cancelled"]
+                and run["project_id"] == self.project_id
+                and run["environment_id"] == self.environment_id
+            ):
+                yield run
 
     @staticmethod
     def filter_successful_runs(runs: Iterable[Dict]) -> List[Dict]:
@@ -159,6 +503,84 @@ class DbtCloudClient:
 
         return successful_runs
 
+    def close(self) -> None:
+        self.session.close()
+
+    def _get(self, path: str, *, params: Optional[Mapping] = None, stream: bool = False) -> requests.Response:
+        """
+        Sends a GET request to the API, retrying it if it fails with a transient error
+
+        :param path: the path of the endpoint, relative to the base URL
+        :param params: the query parameters
+        :param stream: if True, the body of the successful response is not read: the caller must consume it (or
+          close the response)
+        :return: the successful response
+        """
+        url = self.base_url + path
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            start = time.perf_counter()
+
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                self.metrics.record(latency=time.perf_counter() - start, retried=attempt > 0)
+
+                if attempt >= self.max_retries:
+                    raise
+
+                wait = self._backoff(attempt)
+                logger.warning(f"Request to {path} failed ({error}), retrying in {wait:.1f}s")
+            else:
+                self.metrics.record(
+                    latency=time.perf_counter() - start,
+                    bytes_received=0 if stream else len(response.content),
+                    retried=attempt > 0,
+                )
+
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    if not response.ok:
+                        response.close()
+
+                    response.raise_for_status()
+                    return response
+
+                response.close()
+                wait = self._retry_after(response) or self._backoff(attempt)
+                logger.warning(f"Request to {path} failed ({response.status_code}), retrying in {wait:.1f}s")
+
+            attempt += 1
+            time.sleep(wait)
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_factor * 2**attempt
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """
+        Parses the `Retry-After` header, which can either be an amount of seconds or a date
+        """
+        value = response.headers.get("Retry-After")
+
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
     def _default_headers(self) -> Dict:
         """
         The default headers for HTTP requests against the dbt Cloud API
@@ -0,0 +1,37 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A token bucket that caps the rate of requests made by all the threads sharing it.
+
+    Tokens are refilled continuously at `rate` per second, up to `burst`. Callers that find the bucket empty reserve
+    the next token anyway and sleep until it is available, so waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, *, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("The rate must be positive")
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request can be made
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+from dbttoolkit.utils.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_CACHE_PATH = Path(
+    os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache", "dbt-toolkit", "dbt_cloud_runs.sqlite"
+)
+DEFAULT_TTL = timedelta(days=30)  # Runs created longer ago are evicted
+DEFAULT_MAX_RUNS = 10_000  # Per scope, the oldest runs are evicted first
+
+# Bump whenever the schema changes, so old caches are discarded
+SCHEMA_VERSION = 1
+
+# The errors of a cache that cannot be used (e.g. in a read-only home folder): callers can do without it
+RUN_CACHE_ERRORS = (OSError, sqlite3.Error)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    account_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    environment_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    job_id INTEGER,
+    git_sha TEXT,
+    is_success INTEGER NOT NULL,
+    is_cancelled INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (account_id, project_id, environment_id, run_id)
+);
+
+CREATE TABLE IF NOT EXISTS watermarks (
+    account_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    environment_id INTEGER NOT NULL,
+    high_run_id INTEGER NOT NULL,
+    covered_since REAL NOT NULL,
+    PRIMARY KEY (account_id, project_id, environment_id)
+);
+"""
+
+
+class RunScope(NamedTuple):
+    """
+    The runs listed by a client: its account, project and environment
+    """
+
+    account_id: int
+    project_id: int
+    environment_id: int
+
+
+class Watermark(NamedTuple):
+    """
+    What the cache knows about a scope: every run with an id up to `high_run_id` that was created since
+    `covered_since` is complete and in the cache.
+    """
+
+    high_run_id: int
+    covered_since: datetime
+
+
+class RunCache:
+    """
+    An on-disk (SQLite) cache of the metadata of completed dbt Cloud runs, which never change once completed.
+
+    Runs are listed from the most recent one, so the cache keeps a high-water mark per scope: the highest run id up to
+    which all runs are known to be complete. It is kept below any run that was still incomplete when listed, so such
+    runs are listed again until they complete. Only the runs above the mark need to be requested again.
+
+    Runs older than `ttl` are evicted, as well as the oldest ones when there are more than `max_runs` in a scope.
+    The file can be shared by concurrent processes. It is only created when the cache is first used, and its
+    operations raise one of `RUN_CACHE_ERRORS` if it cannot be.
+    """
+
+    def __init__(
+        self, path: Path = DEFAULT_CACHE_PATH, *, ttl: timedelta = DEFAULT_TTL, max_runs: int = DEFAULT_MAX_RUNS
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_runs = max_runs
+
+        self._initialized = False
+        self._initialization_lock = threading.Lock()
+
+    def watermark(self, scope: RunScope) -> Optional[Watermark]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT high_run_id, covered_since FROM watermarks "
+                "WHERE account_id = ? AND project_id = ? AND environment_id = ?",
+                scope,
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return Watermark(row[0], datetime.fromtimestamp(row[1], timezone.utc))
+
+    def update_watermark(self, scope: RunScope, watermark: Watermark) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+                (*scope, watermark.high_run_id, watermark.covered_since.timestamp()),
+            )
+
+    def store(self, scope: RunScope, runs: Iterable[Mapping]) -> None:
+        """
+        Stores the completed runs. Incomplete runs are ignored.
+        """
+        rows = [
+            (
+                *scope,
+                run["id"],
+                run.get("job_id"),
+                run.get("git_sha"),
+                bool(run.get("is_success")),
+                bool(run.get("is_cancelled")),
+                _timestamp(run["created_at"]),
+                _timestamp(run.get("finished_at")),
+                json.dumps(run),
+            )
+            for run in runs
+            if run["is_complete"]
+        ]
+
+        with self._connect() as connection:
+            connection.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def completed_runs(self, scope: RunScope, *, since: datetime) -> List[Dict]:
+        """
+        :return: the runs that were created or finished since the given time and were not cancelled, from the most
+          recent one
+        """
+        return self._query(
+            scope, "NOT is_cancelled AND (created_at >= ? OR finished_at >= ?)", (since.timestamp(), since.timestamp())
+        )
+
+    def successful_runs(self, scope: RunScope, *, job_id: int, limit: int) -> List[Dict]:
+        """
+        :return: the most recent successful runs of the job
+        """
+        return self._query(scope, "is_success AND NOT is_cancelled AND job_id = ?", (job_id,), limit=limit)
+
+    def evict(self, scope: RunScope) -> None:
+        """
+        Evicts the oldest runs of the scope, either expired or over the size limit. The covered period of the
+        watermark shrinks accordingly.
+        """
+        with self._connect() as connection:
+            expired = connection.execute(
+                "DELETE FROM runs WHERE account_id = ? AND project_id = ? AND environment_id = ? AND created_at < ?",
+                (*scope, time.time() - self.ttl.total_seconds()),
+            ).rowcount
+            over_limit = connection.execute(
+                "DELETE FROM runs WHERE account_id = ? AND project_id = ? AND environment_id = ? AND run_id IN ("
+                "  SELECT run_id FROM runs WHERE account_id = ? AND project_id = ? AND environment_id = ? "
+                "  ORDER BY run_id DESC LIMIT -1 OFFSET ?"
+                ")",
+                (*scope, *scope, self.max_runs),
+            ).rowcount
+
+            if not expired and not over_limit:
+                return
+
+            logger.info(f"Evicted {expired + over_limit} runs from the run cache")
+            oldest_created_at = connection.execute(
+                "SELECT MIN(created_at) FROM runs WHERE account_id = ? AND project_id = ? AND environment_id = ?",
+                scope,
+            ).fetchone()[0]
+
+            if oldest_created_at is None:
+                connection.execute(
+                    "DELETE FROM watermarks WHERE account_id = ? AND project_id = ? AND environment_id = ?", scope
+                )
+            else:
+                connection.execute(
+                    "UPDATE watermarks SET covered_since = MAX(covered_since, ?) "
+                    "WHERE account_id = ? AND project_id = ? AND environment_id = ?",
+                    (oldest_created_at, *scope),
+                )
+
+    def _query(self, scope: RunScope, condition: str, parameters: tuple, *, limit: int = -1) -> List[Dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT payload FROM runs WHERE account_id = ? AND project_id = ? AND environment_id = ? "
+                f"AND {condition} ORDER BY run_id DESC LIMIT ?",
+                (*scope, *parameters, limit),
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def _initialize(self) -> None:
+        """
+        Creates the file and its schema, the first time the cache is used
+        """
+        with self._initialization_lock:
+            if self._initialized:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            with self._open() as connection:
+                if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    logger.info(f"Creating the run cache: {self.path}")
+                    connection.executescript("DROP TABLE IF EXISTS runs; DROP TABLE IF EXISTS watermarks;")
+                    connection.executescript(SCHEMA)
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            self._initialized = True
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        A connection per operation, so the cache can be used from any thread. Changes are committed on exit.
+        """
+        self._initialize()
+
+        with self._open() as connection:
+            yield connection
+
+    @contextmanager
+    def _open(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            # Readers do not block the writer of another process
+            connection.execute("PRAGMA journal_mode = WAL")
+
+            with connection:
+                yield connection
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    return datetime.fromisoformat(value).timestamp()
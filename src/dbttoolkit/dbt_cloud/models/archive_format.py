@@ -0,0 +1,204 @@
+"""
+Serialization of the artifacts archived by `retrieve-artifacts-time-interval`.
+
+Besides indented JSON, artifacts can be archived compressed, as newline-delimited JSON or, for the artifacts that are
+mostly queried for analytics (run results and sources freshness), as flat Parquet tables with one row per node.
+"""
+import gzip
+import importlib.util
+import io
+import json
+from enum import Enum
+from typing import Dict, Iterable, List, Mapping
+
+from dbttoolkit.dbt_cloud.models.dbt_artifact import DbtArtifact
+from dbttoolkit.utils.io import json_dumps
+
+try:
+    # Optional, installed with the `zstd` extra
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+# Artifacts that can be flattened to one row per node
+TABULAR_ARTIFACTS = (DbtArtifact.run_results, DbtArtifact.sources)
+
+RUN_RESULTS_COLUMNS = {
+    "invocation_id": "string",
+    "generated_at": "string",
+    "dbt_version": "string",
+    "command": "string",
+    "elapsed_time": "float64",
+    "unique_id": "string",
+    "status": "string",
+    "thread_id": "string",
+    "execution_time": "float64",
+    "failures": "int64",
+    "message": "string",
+    "rows_affected": "int64",
+    "compile_started_at": "string",
+    "compile_completed_at": "string",
+    "execute_started_at": "string",
+    "execute_completed_at": "string",
+}
+
+SOURCES_COLUMNS = {
+    "invocation_id": "string",
+    "generated_at": "string",
+    "dbt_version": "string",
+    "unique_id": "string",
+    "status": "string",
+    "max_loaded_at": "string",
+    "snapshotted_at": "string",
+    "max_loaded_at_time_ago_in_s": "float64",
+    "execution_time": "float64",
+    "warn_after_count": "int64",
+    "warn_after_period": "string",
+    "error_after_count": "int64",
+    "error_after_period": "string",
+    "error": "string",
+}
+
+
+class ArchiveFormat(str, Enum):
+    """
+    How the artifacts are written in the archive
+    """
+
+    json = "json"  # Indented JSON
+    json_gz = "json-gz"  # Compact JSON, gzip-compressed
+    json_zst = "json-zst"  # Compact JSON, zstd-compressed (requires the `zstd` extra)
+    ndjson = "ndjson"  # A JSON document per line: a row per node for run results and sources, else the whole artifact
+    parquet = "parquet"  # A row per node for run results and sources (requires the `parquet` extra), else gzip JSON
+
+    def check_dependencies(self) -> None:
+        """
+        Fails early if the optional dependency needed by the format is not installed
+        """
+        if self == ArchiveFormat.json_zst and zstandard is None:
+            raise ImportError("The json-zst format requires the `zstandard` package: pip install dbt-toolkit[zstd]")
+        # pyarrow is slow to import, it is only imported when writing Parquet files
+        if self == ArchiveFormat.parquet and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("The parquet format requires the `pyarrow` package: pip install dbt-toolkit[parquet]")
+
+    def extension(self, artifact_name: DbtArtifact) -> str:
+        if self == ArchiveFormat.parquet:
+            return ".parquet" if artifact_name in TABULAR_ARTIFACTS else ".json.gz"
+
+        return {
+            ArchiveFormat.json: ".json",
+            ArchiveFormat.json_gz: ".json.gz",
+            ArchiveFormat.json_zst: ".json.zst",
+            ArchiveFormat.ndjson: ".ndjson",
+        }[self]
+
+
+def serialize_artifact(artifact: Mapping, artifact_name: DbtArtifact, archive_format: ArchiveFormat) -> bytes:
+    """
+    :return: the content of the artifact in the archive, to be written in a file with `archive_format.extension`
+    """
+    if archive_format == ArchiveFormat.json:
+        return json.dumps(artifact, indent=2).encode("utf-8")
+    if archive_format == ArchiveFormat.json_zst:
+        return zstandard.ZstdCompressor().compress(json_dumps(artifact).encode("utf-8"))
+    if archive_format == ArchiveFormat.ndjson:
+        rows: Iterable[Mapping] = [artifact]
+
+        if artifact_name in TABULAR_ARTIFACTS:
+            rows = flatten_artifact(artifact, artifact_name)
+
+        return "".join(json_dumps(row) + "\n" for row in rows).encode("utf-8")
+    if archive_format == ArchiveFormat.parquet and artifact_name in TABULAR_ARTIFACTS:
+        return _to_parquet(flatten_artifact(artifact, artifact_name), _columns(artifact_name))
+
+    return gzip.compress(json_dumps(artifact).encode("utf-8"))
+
+
+def flatten_artifact(artifact: Mapping, artifact_name: DbtArtifact) -> List[Dict]:
+    """
+    :return: a row per node of run results (with their timings) or sources (with their freshness)
+    """
+    if artifact_name == DbtArtifact.run_results:
+        return list(_flatten_run_results(artifact))
+    if artifact_name == DbtArtifact.sources:
+        return list(_flatten_sources(artifact))
+
+    raise ValueError(f"Artifact can not be flattened: {artifact_name}")
+
+
+def _flatten_run_results(artifact: Mapping) -> Iterable[Dict]:
+    metadata = _metadata_columns(artifact)
+
+    for result in artifact.get("results", []):
+        timings = {timing["name"]: timing for timing in result.get("timing", [])}
+
+        yield {
+            **metadata,
+            "command": artifact.get("args", {}).get("which"),
+            "elapsed_time": artifact.get("elapsed_time"),
+            "unique_id": result.get("unique_id"),
+            "status": result.get("status"),
+            "thread_id": result.get("thread_id"),
+            "execution_time": result.get("execution_time"),
+            "failures": result.get("failures"),
+            "message": result.get("message"),
+            "rows_affected": (result.get("adapter_response") or {}).get("rows_affected"),
+            "compile_started_at": timings.get("compile", {}).get("started_at"),
+            "compile_completed_at": timings.get("compile", {}).get("completed_at"),
+            "execute_started_at": timings.get("execute", {}).get("started_at"),
+            "execute_completed_at": timings.get("execute", {}).get("completed_at"),
+        }
+
+
+def _flatten_sources(artifact: Mapping) -> Iterable[Dict]:
+    metadata = _metadata_columns(artifact)
+
+    for result in artifact.get("results", []):
+        criteria = result.get("criteria") or {}
+        warn_after = criteria.get("warn_after") or {}
+        error_after = criteria.get("error_after") or {}
+
+        yield {
+            **metadata,
+            "unique_id": result.get("unique_id"),
+            "status": result.get("status"),
+            "max_loaded_at": result.get("max_loaded_at"),
+            "snapshotted_at": result.get("snapshotted_at"),
+            "max_loaded_at_time_ago_in_s": result.get("max_loaded_at_time_ago_in_s"),
+            "execution_time": result.get("execution_time"),
+            "warn_after_count": warn_after.get("count"),
+            "warn_after_period": warn_after.get("period"),
+            "error_after_count": error_after.get("count"),
+            "error_after_period": error_after.get("period"),
+            "error": result.get("error"),
+        }
+
+
+def _metadata_columns(artifact: Mapping) -> Dict:
+    metadata = artifact.get("metadata", {})
+
+    return {
+        "invocation_id": metadata.get("invocation_id"),
+        "generated_at": metadata.get("generated_at"),
+        "dbt_version": metadata.get("dbt_version"),
+    }
+
+
+def _columns(artifact_name: DbtArtifact) -> Mapping[str, str]:
+    return RUN_RESULTS_COLUMNS if artifact_name == DbtArtifact.run_results else SOURCES_COLUMNS
+
+
+def _to_parquet(rows: List[Dict], columns: Mapping[str, str]) -> bytes:
+    # Optional, installed with the `parquet` extra
+    import pyarrow
+    import pyarrow.parquet
+
+    # An explicit schema, so files with only null values in a column (or without rows) have the same types
+    schema = pyarrow.schema([(name, pyarrow.type_for_alias(type_name)) for name, type_name in columns.items()])
+    table = pyarrow.Table.from_pydict({name: [row[name] for row in rows] for name in columns}, schema=schema)
+
+    output = io.BytesIO()
+    pyarrow.parquet.write_table(table, output, compression="zstd")
+
+    return output.getvalue()
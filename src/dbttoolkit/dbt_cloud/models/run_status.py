@@ -0,0 +1,14 @@
+from enum import IntEnum
+
+
+class RunStatus(IntEnum):
+    """
+    The status codes of dbt Cloud runs
+    """
+
+    queued = 1
+    starting = 2
+    running = 3
+    success = 10
+    error = 20
+    cancelled = 30
@@ -1,6 +1,23 @@
 import typer
 
-from dbttoolkit.documentation.actions.propagate import typer_app as propagate_typer_app
 
-documentation_typer_app = typer.Typer()
-documentation_typer_app.registered_commands.append(*propagate_typer_app.registered_commands)
+def __getattr__(name: str):
+    # The app is built on first access, so importing a single command does not import the others (see `cli`). It is
+    # then kept in the module, so later accesses do not reach this function and get the same app
+    if name == "documentation_typer_app":
+        from dbttoolkit.documentation.actions.lineage_export import typer_app as lineage_export_typer_app
+        from dbttoolkit.documentation.actions.lineage_query import typer_app as lineage_query_typer_app
+        from dbttoolkit.documentation.actions.propagate import typer_app as propagate_typer_app
+
+        lineage_typer_app = typer.Typer(help="Column lineage utilities")
+        lineage_typer_app.registered_commands.extend(
+            [*lineage_export_typer_app.registered_commands, *lineage_query_typer_app.registered_commands]
+        )
+
+        documentation_typer_app = typer.Typer()
+        documentation_typer_app.registered_commands.append(*propagate_typer_app.registered_commands)
+        documentation_typer_app.add_typer(lineage_typer_app, name="lineage")
+        globals()["documentation_typer_app"] = documentation_typer_app
+        return documentation_typer_app
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
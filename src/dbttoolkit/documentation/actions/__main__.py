@@ -1,4 +1,6 @@
 from dbttoolkit.documentation.actions import documentation_typer_app
+from dbttoolkit.utils.logger import init_logger
 
 if __name__ == "__main__":
+    init_logger()
     documentation_typer_app()
@@ -0,0 +1,57 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from dbttoolkit.documentation.actions.propagate import build_registry
+from dbttoolkit.documentation.models.lineage_graph import write_lineage_graph
+from dbttoolkit.utils.logger import get_logger, init_logger
+
+DEFAULT_LINEAGE_FILENAME = "column_lineage.bin"
+
+typer_app = typer.Typer()
+logger = get_logger()
+
+
+@typer_app.command("export")
+def run(
+    artifacts_folder: Path = typer.Option(..., help="The path to the artifacts folder to be used as input"),
+    input_manifest_filename: str = typer.Option("manifest.json", help="The name of the manifest file"),
+    output_path: Optional[Path] = typer.Option(
+        None,
+        help=f"Where the column lineage is written. Defaults to `{DEFAULT_LINEAGE_FILENAME}` in the artifacts folder",
+    ),
+    streaming: bool = typer.Option(
+        False,
+        help="Stream the artifacts instead of loading them entirely in memory. Only the parts needed for the "
+        "lineage are kept.",
+    ),
+    cache_path: Optional[Path] = typer.Option(
+        None, help="If provided, the column matches are cached in this file (the same as in `docs propagate`)."
+    ),
+    workers: int = typer.Option(1, min=1, help="The amount of processes used to look for matching columns"),
+):
+    """
+    Writes the column lineage of the project in a compact binary file, which can be memory-mapped by other tools
+    (see `dbttoolkit.documentation.models.lineage_graph`) without parsing the artifacts.
+    """
+    output_path = output_path or artifacts_folder / DEFAULT_LINEAGE_FILENAME
+
+    _, registry = build_registry(
+        artifacts_folder / input_manifest_filename,
+        artifacts_folder / "catalog.json",
+        streaming=streaming,
+        cache_path=cache_path,
+        workers=workers,
+    )
+    write_lineage_graph(registry.data.values(), output_path)
+
+    logger.info(
+        f"Column lineage of {len(registry.data)} columns written to {output_path} ({output_path.stat().st_size} bytes)"
+    )
+
+
+# Entry point for direct execution
+if __name__ == "__main__":
+    init_logger()
+    typer_app()
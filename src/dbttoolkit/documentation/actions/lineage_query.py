@@ -0,0 +1,99 @@
+import json
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from dbttoolkit.documentation.models.lineage_graph import LineageGraph
+from dbttoolkit.documentation.models.lineage_query import Direction, LineageMatch, LineageQuery, parse_column
+from dbttoolkit.utils.logger import init_logger
+
+typer_app = typer.Typer()
+
+
+class QueryOutputFormat(str, Enum):
+    text = "text"
+    json = "json"
+
+
+@typer_app.command("query")
+def run(
+    lineage_path: Path = typer.Option(..., help="The column lineage file written by `docs lineage export`"),
+    columns: List[str] = typer.Option(
+        [],
+        "--column",
+        help="A column to query, as <node id>.<column name> (e.g. model.my_project.stg_users.email). Can be repeated",
+    ),
+    columns_file: Optional[Path] = typer.Option(
+        None, help="A file with a column to query per line (e.g. the columns changed in a pull request)"
+    ),
+    direction: Direction = typer.Option(
+        Direction.downstream.value,
+        help="downstream: the columns affected by a change in the queried ones. upstream: the columns they derive from",
+    ),
+    max_depth: Optional[int] = typer.Option(
+        None, min=1, help="If provided, only the columns up to this many matches away"
+    ),
+    output_format: QueryOutputFormat = typer.Option(QueryOutputFormat.text.value),
+    paths: bool = typer.Option(False, "--paths", help="Also show the path from the closest queried column"),
+):
+    """
+    Lists the columns downstream (or upstream) of the given columns, with their depth and the queried columns they are
+    reached from. All columns are queried together.
+    """
+    if columns_file:
+        columns = [*columns, *(line.strip() for line in columns_file.read_text().splitlines() if line.strip())]
+
+    if not columns:
+        raise typer.BadParameter("At least a column is needed (--column or --columns-file)")
+
+    try:
+        fqns = [parse_column(column) for column in columns]
+    except ValueError as error:
+        raise typer.BadParameter(str(error))
+
+    with LineageGraph.open(lineage_path) as graph:
+        try:
+            query = LineageQuery.from_fqns(graph, fqns, direction, max_depth=max_depth)
+        except KeyError as error:
+            raise typer.BadParameter(error.args[0])
+
+        matches = query.matches()
+
+    if output_format == QueryOutputFormat.json:
+        typer.echo(json.dumps([_match_to_json(match, paths) for match in matches], indent=2))
+        return
+
+    for match in matches:
+        sources = ", ".join(_format(source) for source in match.sources)
+        typer.echo(f"{match.depth}\t{_format(match.fqn)}\t(from {sources})")
+
+        if paths:
+            typer.echo("\t" + " → ".join(_format(step) for step in match.path))
+
+    typer.echo(f"{len(matches)} {direction.value} columns", err=True)
+
+
+def _match_to_json(match: LineageMatch, paths: bool) -> dict:
+    output = {
+        "node_id": match.fqn.node_id,
+        "name": match.fqn.name,
+        "depth": match.depth,
+        "sources": [_format(source) for source in match.sources],
+    }
+
+    if paths:
+        output["path"] = [_format(step) for step in match.path]
+
+    return output
+
+
+def _format(fqn) -> str:
+    return f"{fqn.node_id}.{fqn.name}"
+
+
+# Entry point for direct execution
+if __name__ == "__main__":
+    init_logger()
+    typer_app()
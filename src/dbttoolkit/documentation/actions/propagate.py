@@ -1,22 +1,40 @@
+import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 import typer
-from rich import print
 
+from dbttoolkit.documentation.models.artifact_index import ArtifactIndex
+from dbttoolkit.documentation.models.artifacts import (
+    ManifestOutputFormat,
+    ManifestPatch,
+    apply_patch_to_node,
+    load_lean_catalog,
+    load_lean_manifest,
+    write_manifest_overlay,
+    write_patched_manifest,
+)
 from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+from dbttoolkit.documentation.models.traversal_cache import NodeMatches, TraversalCache
 from dbttoolkit.documentation.presentation.formatters import format_upstream_descriptions_to_human_readable
-from dbttoolkit.documentation.presentation.stats import calculate_and_print
+from dbttoolkit.documentation.presentation.stats import DEFAULT_TOP, calculate_and_print
 from dbttoolkit.utils.io import load_json_file, write_json_file
-from dbttoolkit.utils.logger import init_logger
+from dbttoolkit.utils.logger import get_logger, init_logger
+from dbttoolkit.utils.metrics import Profiler, RunMetrics, profile
+from dbttoolkit.utils.storage import backend_from_uri, is_remote
 
 IGNORED_COLUMNS = ["id", "created_at", "updated_at", "_row_updated_at", "deleted_at"]
 
+# More chunks than workers, so a worker that gets a slow chunk does not hold back the others
+PARALLEL_CHUNKS_PER_WORKER = 4
+
 typer_app = typer.Typer()
-logger = init_logger()
+logger = get_logger()
 
 
-def traverse_upstream(column: Column, manifest: Mapping, catalog: Mapping, registry: ColumnRegistry) -> None:
+def traverse_upstream(column: Column, index: ArtifactIndex, registry: ColumnRegistry) -> None:
     """
     Given our main column (expected to already have been added to the registry), traverse the project upstream
     looking for columns with the same name. If a match is found, make sure the upstream column is already
@@ -24,73 +42,190 @@ def traverse_upstream(column: Column, manifest: Mapping, catalog: Mapping, regis
 
     :return: None. The results are stored in the column and registry objects.
     """
+    register_upstream_matches(column, find_upstream_matches(column, index), index, registry)
+
+
+def find_upstream_matches(column: Column, index: ArtifactIndex) -> List[str]:
+    """
+    Looks for columns with the same name (or with the name given by our "column renaming"/alias feature) in the
+    direct upstream nodes of the column's node.
+
+    :return: the ids of the upstream nodes that have a matching column
+    """
     depends_on = column.node.get("depends_on", {}).get("nodes")
 
     if not depends_on:
         # No upstream dependencies, nothing to do
-        return None
+        return []
+
+    column_name = _name_in_upstream_nodes(column)
+
+    # For every upstream node, look for the column in the manifest and in the catalog. The index normalizes the
+    # column names on both sides, so the lookup works regardless of how the data warehouse cases them
+    return [
+        upstream_node_key
+        for upstream_node_key in depends_on
+        if index.manifest_column(upstream_node_key, column_name) or index.catalog_column(upstream_node_key, column_name)
+    ]
+
+
+def register_upstream_matches(
+    column: Column, upstream_node_keys: List[str], index: ArtifactIndex, registry: ColumnRegistry
+) -> None:
+    """
+    Adds (or retrieves) the matching column of every upstream node to the registry and registers it in the column
+    as an upstream dependency
+    """
+    column_name = _name_in_upstream_nodes(column)
+
+    for upstream_node_key in upstream_node_keys:
+        upstream_column = registry.add_or_retrieve(
+            column_in_manifest=index.manifest_column(upstream_node_key, column_name),
+            column_in_catalog=index.catalog_column(upstream_node_key, column_name),
+            node=index.manifest_node(upstream_node_key),
+        )
+
+        column.add_upstream_match(upstream_column)
 
-    # Sources are stored in a different place, but we want to process them together
-    manifest_nodes = {**manifest["nodes"], **manifest["sources"]}
-    catalog_nodes = {**catalog["nodes"], **catalog["sources"]}
 
+def _name_in_upstream_nodes(column: Column) -> str:
     # Support for our "column renaming"/alias feature
     column_alias = column.artifact_column.get("meta", {}).get("original_name")
-    column_name = column_alias or column.name
-
-    for upstream_node_key in depends_on:
-        # For every upstream node, look for it in the manifest and in the catalog
-        manifest_node = manifest_nodes.get(upstream_node_key, {})
-        manifest_column_in_upstream_node = manifest_node.get("columns", {}).get(column_name.lower())
-
-        # Might not in the catalog (eg: ephemeral models), so the get logic needs fallbacks
-        # TODO: Assuming everything is uppercase in the catalog is probably Snowflake specific. Better to normalize it
-        # from both sides (ours and from the artifact)
-        catalog_node = catalog_nodes.get(upstream_node_key, {})
-        catalog_column_in_upstream_node = catalog_node.get("columns", {}).get(column_name.upper())
-
-        # If it's available in any of the two, add (or retrieve) it to the catalog and
-        # register it in the column as an upstream dependency
-        if manifest_column_in_upstream_node or catalog_column_in_upstream_node:
-            upstream_column = registry.add_or_retrieve(
-                column_in_manifest=manifest_column_in_upstream_node,
-                column_in_catalog=catalog_column_in_upstream_node,
-                node=manifest_node,
-            )
+    return column_alias or column.name
+
+
+def find_node_matches(node_key: str, index: ArtifactIndex) -> NodeMatches:
+    """
+    Looks for the upstream matches of all columns of a node in the catalog. It does not depend on a registry, so
+    nodes can be processed independently of each other.
+
+    :return: the ids of the upstream nodes with a matching column, for every column of the node that has any
+    """
+    node_in_manifest = index.manifest_node(node_key)
+    node_matches: NodeMatches = {}
+
+    for column_key, column_in_catalog in index.catalog_nodes[node_key]["columns"].items():
+        column_in_manifest = index.manifest_column(node_key, column_key)
 
-            column.add_upstream_match(upstream_column)
+        if column_in_manifest:
+            column = Column.build_from_dbt_manifest_column(column_in_manifest, node_in_manifest)
+        else:
+            column = Column.build_from_dbt_catalog_column(column_in_catalog, node_in_manifest)
+
+        upstream_node_keys = find_upstream_matches(column, index)
+
+        if upstream_node_keys:
+            node_matches[column.name] = upstream_node_keys
+
+    return node_matches
 
 
-def traverse_artifacts(catalog: Mapping, manifest: Mapping, registry: ColumnRegistry) -> None:
+def traverse_artifacts(
+    catalog: Mapping,
+    manifest: Mapping,
+    registry: ColumnRegistry,
+    *,
+    cache: Optional[TraversalCache] = None,
+    workers: int = 1,
+) -> None:
     """
     Traverse the catalog while using the manifest to look for information to populate the registry.
 
+    * Build an index over both artifacts, so every lookup below is a constant-time dict access
+    * For every node in the catalog, look if any upstream node has columns with the same names. This is not
+      recursive, but since all nodes are covered, so is the entire project. Nodes are independent of each other at
+      this point, so they can be taken from the cache (if provided) or processed by several worker processes
     * For every node in the catalog:
         * See if the node is available in the manifest
         * For every column in the catalog:
             * Check if the column is also represented in the manifest
             * Add both the catalog and manifest representation of that column on the registry
-            * Look if any upstream model has the same column. That method is not recursive, but
-              `traverse_artifacts` will navigate through all nodes, covering the entire project
+            * Add the matching columns of the upstream nodes to the registry and register them as dependencies
+
+    The resulting registry (including the order of its columns) does not depend on the cache or on the amount of
+    workers.
 
     :return: None. The results are stored in the registry
     """
+    index = ArtifactIndex(manifest, catalog)
+    matches: Dict[str, NodeMatches] = {}
+
+    node_keys_to_traverse = []
+
+    for node_key in catalog["nodes"]:
+        cached_matches = cache.retrieve(node_key, index) if cache else None
+
+        if cached_matches is None:
+            node_keys_to_traverse.append(node_key)
+        else:
+            matches[node_key] = cached_matches
+
+    if workers > 1:
+        traversed_matches = _find_matches_in_parallel(node_keys_to_traverse, index, workers)
+    else:
+        traversed_matches = [find_node_matches(node_key, index) for node_key in node_keys_to_traverse]
+
+    for node_key, node_matches in zip(node_keys_to_traverse, traversed_matches):
+        matches[node_key] = node_matches
+
+        if cache:
+            cache.store(node_key, index, node_matches)
+
     for node_key, node_in_catalog in catalog["nodes"].items():
         node_in_manifest = manifest["nodes"][node_key]
         columns_in_catalog = node_in_catalog["columns"]
 
         for column_key, column_in_catalog in columns_in_catalog.items():
-            column_key = column_key.lower()
-            column_in_manifest = node_in_manifest["columns"].get(column_key)
+            column_in_manifest = index.manifest_column(node_key, column_key)
 
             column = registry.add_or_retrieve(
                 column_in_manifest=column_in_manifest, column_in_catalog=column_in_catalog, node=node_in_manifest
             )
 
-            traverse_upstream(column, manifest, catalog, registry)
+            register_upstream_matches(column, matches[node_key].get(column.name, []), index, registry)
+
+
+def _find_matches_in_parallel(node_keys: List[str], index: ArtifactIndex, workers: int) -> List[NodeMatches]:
+    """
+    Shards the nodes in contiguous chunks across a pool of processes. The index is handed over once per worker
+    (on platforms that fork, it is not even copied) and the results come back in the original order.
+    """
+    chunk_size = max(1, math.ceil(len(node_keys) / (workers * PARALLEL_CHUNKS_PER_WORKER)))
+    chunks = [node_keys[start:end] for start, end in _chunk_bounds(len(node_keys), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(index,)) as executor:
+        return [node_matches for chunk in executor.map(_find_matches_in_worker, chunks) for node_matches in chunk]
+
+
+def _chunk_bounds(length: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
 
 
-def propagate_documentation_in_the_manifest(registry: ColumnRegistry, manifest: Mapping) -> None:
+# The index of the artifacts, in the worker processes
+_worker_index: Optional[ArtifactIndex] = None
+
+
+def _initialize_worker(index: ArtifactIndex) -> None:
+    global _worker_index
+    _worker_index = index
+
+
+def _find_matches_in_worker(node_keys: List[str]) -> List[NodeMatches]:
+    assert _worker_index is not None
+    return [find_node_matches(node_key, _worker_index) for node_key in node_keys]
+
+
+def propagate_documentation_in_the_manifest(registry: ColumnRegistry, manifest: Mapping) -> ManifestPatch:
+    """
+    Writes the documentation that can be propagated into the columns of the manifest nodes.
+
+    :return: the patch that was applied to the manifest, i.e. the propagated properties of every modified column
+    """
+    # Only imported when propagating: it is slow to import, and not needed for `--help`
+    from rich import print
+
+    patch: ManifestPatch = {}
+
     for column in registry.data.values():
         if column.description or not column.descriptions_from_upstream:
             # If the column is already documented or it is not, but there's no upstream documentation
@@ -111,52 +246,313 @@ def propagate_documentation_in_the_manifest(registry: ColumnRegistry, manifest:
 
         formatted_description = format_upstream_descriptions_to_human_readable(column.descriptions_from_upstream)
 
+        column_patch: Dict[str, Any]
+
         if column.name in node_in_manifest["columns"]:
-            node_in_manifest["columns"][column.name]["description"] = formatted_description
+            column_patch = dict(description=formatted_description)
         else:
-            node_in_manifest["columns"][column.name] = dict(
-                name=column.name, description=formatted_description, tags=["inherited-documentation"]
-            )
+            column_patch = dict(name=column.name, description=formatted_description, tags=["inherited-documentation"])
+
+        node_patch = patch.setdefault(column.node_id, {})
+        node_patch[column.name] = column_patch
+        apply_patch_to_node(node_in_manifest, {column.name: column_patch})
+
+    return patch
 
 
 @typer_app.command("propagate")
-def run(
-    artifacts_folder: Path = typer.Option(..., help="The path to the artifacts folder to be used as input"),
+def run_command(
+    artifacts_folder: str = typer.Option(
+        ...,
+        help="The path to the artifacts folder to be used as input: a local path, or a gs://<bucket>/<path> or "
+        "s3://<bucket>/<path> URI. Remote artifacts are downloaded to a temporary folder, and the modified manifest is "
+        "uploaded next to them (unless an output manifest path is provided).",
+    ),
     input_manifest_filename: Optional[str] = typer.Option("manifest.json", help="The name of the manifest file"),
     output_manifest_path: Optional[Path] = typer.Option(
         None, help="The full path and filename to the modified manifest file."
     ),
+    streaming: bool = typer.Option(
+        False,
+        help="Stream the artifacts instead of loading them entirely in memory. Only the parts needed for the "
+        "propagation are kept.",
+    ),
+    output_format: Optional[ManifestOutputFormat] = typer.Option(
+        None,
+        help="full: serialize the whole manifest again. splice: copy the original manifest, only replacing the "
+        "modified columns. overlay: only write the modified columns, as a JSON merge patch of the manifest. "
+        "Defaults to full, or to splice when streaming.",
+    ),
+    cache_path: Optional[Path] = typer.Option(
+        None,
+        help="If provided, the column matches found are cached in this file and reused by the next runs for the "
+        "nodes that did not change (based on the node checksums and catalog columns).",
+    ),
+    workers: int = typer.Option(1, min=1, help="The amount of processes used to look for matching columns"),
+    top: int = typer.Option(
+        DEFAULT_TOP, min=1, help="How many of the columns that would benefit the most from being documented are listed"
+    ),
+    exact_ranking: bool = typer.Option(
+        True,
+        "--exact-ranking/--approximate-ranking",
+        help="Rank the columns that would benefit the most from being documented by the exact amount of undocumented "
+        "downstream columns, or by an estimate of it, which takes the same time regardless of the size of the project.",
+    ),
+    metrics_path: Optional[Path] = typer.Option(
+        None,
+        help="If provided, the metrics of the run are written to this file as JSON: the time and peak memory of every "
+        "phase, the size of the lineage, the cache hit rate and the statistics.",
+    ),
+    profile_path: Optional[Path] = typer.Option(
+        None, help="If provided, the run is profiled and the profile is written to this file."
+    ),
+    profiler: Profiler = typer.Option(
+        Profiler.cprofile.value,
+        help="cprofile: a pstats file, from the standard library. pyinstrument: an HTML report, with a lower overhead "
+        "(requires `pip install dbt-toolkit[profiling]`).",
+    ),
 ):
     """
     If the output manifest path is not provided, the path to the input manifest is chosen as output and thus it is
-    overwritten.
+    overwritten. For the overlay output format, it defaults to a `.patch.json` file next to the input manifest instead.
     """
-    # Read artifacts
-    manifest_path = artifacts_folder / input_manifest_filename  # type: ignore
-    manifest = load_json_file(manifest_path)
-    catalog = load_json_file(artifacts_folder / "catalog.json")
+    try:
+        if profile_path:
+            profiler.check_dependencies()
+    except ImportError as error:
+        raise typer.BadParameter(str(error))
+
+    run_propagation(
+        artifacts_folder,
+        input_manifest_filename,
+        output_manifest_path,
+        streaming=streaming,
+        output_format=output_format,
+        cache_path=cache_path,
+        workers=workers,
+        top=top,
+        exact_ranking=exact_ranking,
+        metrics_path=metrics_path,
+        profile_path=profile_path,
+        profiler=profiler,
+    )
+
+
+def run(
+    artifacts_folder: Union[str, Path],
+    input_manifest_filename: Optional[str] = "manifest.json",
+    output_manifest_path: Optional[Path] = None,
+    **options: Any,
+) -> RunMetrics:
+    """
+    Propagates the documentation from Python code, with the positional arguments of the `propagate` command: the
+    artifacts folder, the name of the manifest and the output manifest path. The other options of the command are
+    keyword arguments (see `run_propagation`).
+    """
+    return run_propagation(artifacts_folder, input_manifest_filename, output_manifest_path, **options)
+
+
+def run_propagation(
+    artifacts_folder: Union[str, Path],
+    input_manifest_filename: Optional[str] = "manifest.json",
+    output_manifest_path: Optional[Path] = None,
+    *,
+    streaming: bool = False,
+    output_format: Optional[ManifestOutputFormat] = None,
+    cache_path: Optional[Path] = None,
+    workers: int = 1,
+    top: int = DEFAULT_TOP,
+    exact_ranking: bool = True,
+    metrics_path: Optional[Path] = None,
+    profile_path: Optional[Path] = None,
+    profiler: Profiler = Profiler.cprofile,
+) -> RunMetrics:
+    """
+    Propagates the documentation in the artifacts of `artifacts_folder`. See the `propagate` command.
+
+    :return: the metrics of the run (also written to `metrics_path`, if provided)
+    """
+    metrics = RunMetrics("docs propagate")
+    metrics.record(streaming=streaming, workers=workers)
+    options: Dict[str, Any] = dict(
+        streaming=streaming,
+        output_format=output_format,
+        cache_path=cache_path,
+        workers=workers,
+        top=top,
+        exact_ranking=exact_ranking,
+        metrics=metrics,
+    )
+
+    with profile(profile_path, profiler):
+        if is_remote(artifacts_folder):
+            _propagate_remote(str(artifacts_folder), input_manifest_filename, output_manifest_path, **options)
+        else:
+            _propagate(Path(artifacts_folder), input_manifest_filename, output_manifest_path, **options)
+
+    if profile_path:
+        logger.info(f"Profile written to {profile_path}")
+
+    if metrics_path:
+        metrics.write(metrics_path)
+        logger.info(f"Metrics written to {metrics_path}")
+
+    return metrics
+
+
+def _propagate_remote(
+    artifacts_folder: str,
+    input_manifest_filename: Optional[str],
+    output_manifest_path: Optional[Path],
+    *,
+    metrics: RunMetrics,
+    **options,
+) -> None:
+    """
+    Propagates the documentation in artifacts stored in a bucket, through a temporary local folder
+    """
+    backend, folder = backend_from_uri(artifacts_folder)
+
+    with tempfile.TemporaryDirectory() as local_folder:
+        with metrics.phase("download_artifacts"):
+            for filename in (input_manifest_filename, "catalog.json"):
+                logger.info(f"Downloading {filename} from {artifacts_folder}")
+                backend.download(f"{folder}/{filename}", Path(local_folder, filename))  # type: ignore
+
+        output_path = _propagate(
+            Path(local_folder), input_manifest_filename, output_manifest_path, metrics=metrics, **options
+        )
+
+        if output_manifest_path is None:
+            with metrics.phase("upload_manifest"):
+                backend.write_file(f"{folder}/{output_path.name}", output_path)
+
+
+def build_registry(
+    manifest_path: Path,
+    catalog_path: Path,
+    *,
+    streaming: bool = False,
+    cache_path: Optional[Path] = None,
+    workers: int = 1,
+    metrics: Optional[RunMetrics] = None,
+) -> Tuple[Dict, ColumnRegistry]:
+    """
+    Reads the artifacts (see the options of the `propagate` command) and builds the registry of their columns
+
+    :param metrics: if provided, where the time of every phase, the size of the lineage and the cache hit rate are
+      recorded
+    :return: the manifest (lean, if `streaming`) and the registry
+    """
+    metrics = metrics or RunMetrics("build_registry")
+
+    with metrics.phase("load_artifacts"):
+        if streaming:
+            manifest = load_lean_manifest(manifest_path)
+            catalog = load_lean_catalog(catalog_path)
+        else:
+            manifest = load_json_file(manifest_path)
+            catalog = load_json_file(catalog_path)
 
     # Create a data structure to hold all columns
     registry = ColumnRegistry()
 
     # Traverse the catalog and manifest and populate the registry
-    traverse_artifacts(catalog, manifest, registry)
+    cache = TraversalCache(cache_path) if cache_path else None
+
+    with metrics.phase("traverse_artifacts"):
+        traverse_artifacts(catalog, manifest, registry, cache=cache, workers=workers)
+
+    metrics.record(
+        nodes=len(catalog["nodes"]),
+        columns=len(registry.data),
+        edges=sum(len(column.upstream_matches) for column in registry.data.values()),
+    )
+
+    if cache:
+        with metrics.phase("save_cache"):
+            cache.save()
+
+        lookups = cache.hits + cache.misses
+        metrics.record(
+            cache_hits=cache.hits, cache_misses=cache.misses, cache_hit_rate=cache.hits / lookups if lookups else None
+        )
+
+    return manifest, registry
+
+
+def _propagate(
+    artifacts_folder: Path,
+    input_manifest_filename: Optional[str] = "manifest.json",
+    output_manifest_path: Optional[Path] = None,
+    *,
+    streaming: bool = False,
+    output_format: Optional[ManifestOutputFormat] = None,
+    cache_path: Optional[Path] = None,
+    workers: int = 1,
+    top: int = DEFAULT_TOP,
+    exact_ranking: bool = True,
+    metrics: Optional[RunMetrics] = None,
+) -> Path:
+    """
+    Propagates the documentation in local artifacts
+
+    :return: the path of the modified manifest
+    """
+    metrics = metrics or RunMetrics("docs propagate")
+
+    if output_format is None:
+        output_format = ManifestOutputFormat.splice if streaming else ManifestOutputFormat.full
+
+    if streaming and output_format == ManifestOutputFormat.full:
+        raise typer.BadParameter("The full output format needs the whole manifest, which is not kept when streaming")
+
+    manifest_path = artifacts_folder / input_manifest_filename  # type: ignore
+    manifest, registry = build_registry(
+        manifest_path,
+        artifacts_folder / "catalog.json",
+        streaming=streaming,
+        cache_path=cache_path,
+        workers=workers,
+        metrics=metrics,
+    )
 
     # Use the registry to find which documentation can be propagated and write it back to the manifest
-    propagate_documentation_in_the_manifest(registry, manifest)
+    with metrics.phase("propagate"):
+        patch = propagate_documentation_in_the_manifest(registry, manifest)
+
+    metrics.record(
+        propagated_columns=sum(len(node_patch) for node_patch in patch.values()),
+        propagated_nodes=len(patch),
+        output_format=output_format.value,
+    )
 
     # Persist the modified manifest
     if output_manifest_path:
         output_path = output_manifest_path
+    elif output_format == ManifestOutputFormat.overlay:
+        output_path = manifest_path.with_suffix(".patch.json")
     else:
         output_path = manifest_path
 
-    write_json_file(manifest, output_path)
+    with metrics.phase("write_manifest"):
+        if output_format == ManifestOutputFormat.overlay:
+            write_manifest_overlay(patch, output_path)
+        elif output_format == ManifestOutputFormat.splice:
+            write_patched_manifest(manifest_path, output_path, patch)
+        else:
+            write_json_file(manifest, output_path)
 
     # Calculate and print stats
-    calculate_and_print(registry)
+    with metrics.phase("statistics"):
+        statistics = calculate_and_print(registry, top=top, exact=exact_ranking)
+
+    metrics.record(statistics=statistics)
+
+    return output_path
 
 
 # Entry point for direct execution
 if __name__ == "__main__":
+    init_logger()
     typer_app()
@@ -0,0 +1,48 @@
+from typing import Dict, Mapping, Optional
+
+NodeColumns = Dict[str, Mapping]  # { 'lowercase column name': column }
+
+
+class ArtifactIndex:
+    """
+    Lookup structure over the dbt manifest and catalog, built once per run.
+
+    Models and sources are stored in different places in both artifacts, but we want to process them together. The
+    index merges them into a single node lookup per artifact and keeps, for every node, a map of its columns keyed
+    by the lowercase column name. This way the column lookups do not depend on how the data warehouse (or the
+    project's YAML files) cases the column names.
+    """
+
+    def __init__(self, manifest: Mapping, catalog: Mapping) -> None:
+        self.manifest_nodes: Dict[str, Mapping] = {**manifest["nodes"], **manifest["sources"]}
+        self.catalog_nodes: Dict[str, Mapping] = {**catalog["nodes"], **catalog["sources"]}
+
+        self.manifest_columns: Dict[str, NodeColumns] = {
+            node_id: _normalize_columns(node) for node_id, node in self.manifest_nodes.items()
+        }
+        self.catalog_columns: Dict[str, NodeColumns] = {
+            node_id: _normalize_columns(node) for node_id, node in self.catalog_nodes.items()
+        }
+
+    def manifest_node(self, node_id: str) -> Mapping:
+        """
+        Returns the node from the manifest, or an empty mapping if the node is unknown
+        """
+        return self.manifest_nodes.get(node_id, {})
+
+    def manifest_column(self, node_id: str, column_name: str) -> Optional[Mapping]:
+        """
+        Returns the column representation in the manifest, if the node and the column exist
+        """
+        return self.manifest_columns.get(node_id, {}).get(column_name.lower())
+
+    def catalog_column(self, node_id: str, column_name: str) -> Optional[Mapping]:
+        """
+        Returns the column representation in the catalog, if the node and the column exist.
+        Nodes might not be in the catalog at all (eg: ephemeral models).
+        """
+        return self.catalog_columns.get(node_id, {}).get(column_name.lower())
+
+
+def _normalize_columns(node: Mapping) -> NodeColumns:
+    return {column_key.lower(): column for column_key, column in node.get("columns", {}).items()}
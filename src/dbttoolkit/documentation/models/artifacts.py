@@ -0,0 +1,169 @@
+"""
+Streaming access to the dbt artifacts used by the documentation propagation.
+
+The manifest of a large project can be hundreds of megabytes, most of it (SQL code, macros, the parent and child
+maps) irrelevant for propagation. The functions below stream the artifacts and only keep, for every node, what the
+propagation needs. The propagated documentation can be written either by splicing it in a copy of the original
+manifest, or as an overlay file with only the changes.
+"""
+import os
+import shutil
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Mapping, TextIO
+
+from dbttoolkit.utils.io import json_dumps, write_json_file
+from dbttoolkit.utils.json_stream import JsonStreamReader
+
+NODE_KEYS = ("nodes", "sources")
+
+ManifestPatch = Dict[str, Dict[str, Dict]]  # { 'node_id': { 'column name': { 'description': '...', ... } } }
+
+
+class ManifestOutputFormat(str, Enum):
+    """
+    How the propagated documentation is written
+    """
+
+    full = "full"  # The whole manifest is serialized again
+    splice = "splice"  # The original manifest is copied, only the `columns` of the modified nodes are replaced
+    overlay = "overlay"  # Only the modified columns are written, as a JSON merge patch (RFC 7386) of the manifest
+
+
+def load_lean_manifest(path: Path) -> Dict:
+    """
+    Streams the manifest keeping only, for every node and source: `unique_id`, `checksum`, `depends_on.nodes` and
+    the `name`, `description` and `meta.original_name` of its columns
+    """
+    return _load_nodes(path, _lean_manifest_node)
+
+
+def load_lean_catalog(path: Path) -> Dict:
+    """
+    Streams the catalog keeping only the column names of every node and source
+    """
+    return _load_nodes(path, _lean_catalog_node)
+
+
+def write_patched_manifest(input_path: Path, output_path: Path, patch: ManifestPatch) -> None:
+    """
+    Writes a copy of the manifest in `input_path` with the patch applied. The original text is copied as is, except
+    for the `columns` of the patched nodes, which are serialized again. The input and output paths can be the same
+    file.
+    """
+    output_folder = Path(output_path).resolve().parent
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=output_folder, suffix=".json.tmp")
+
+    try:
+        with open(input_path, encoding="utf-8") as input_file, os.fdopen(
+            file_descriptor, "w", encoding="utf-8"
+        ) as output_file:
+            reader = JsonStreamReader(input_file)
+            reader.echo_to(output_file)
+
+            for key in reader.iter_members():
+                if key not in NODE_KEYS:
+                    reader.skip_value()
+                    continue
+
+                for node_id in reader.iter_members():
+                    if node_id in patch:
+                        _splice_node_columns(reader, output_file, patch[node_id])
+                    else:
+                        reader.skip_value()
+
+            reader.read_to_end()
+
+        shutil.copymode(input_path, temporary_path)
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def write_manifest_overlay(patch: ManifestPatch, output_path: Path) -> None:
+    """
+    Writes the patch as a JSON merge patch (RFC 7386) of the manifest: merging it in the original manifest results
+    in the propagated manifest.
+    """
+    overlay: Dict = {key: {} for key in NODE_KEYS}
+
+    for node_id, node_patch in sorted(patch.items()):
+        key = "sources" if node_id.startswith("source.") else "nodes"
+        overlay[key][node_id] = {"columns": node_patch}
+
+    write_json_file(overlay, output_path)
+
+
+def apply_patch_to_node(node: Dict, node_patch: Mapping[str, Mapping]) -> None:
+    """
+    Merges the patched columns in the node. Existing columns keep the properties that are not in the patch.
+    """
+    columns = node.setdefault("columns", {})
+
+    for column_name, column_patch in node_patch.items():
+        columns.setdefault(column_name, {}).update(column_patch)
+
+
+def _splice_node_columns(reader: JsonStreamReader, output_file: TextIO, node_patch: Mapping[str, Mapping]) -> None:
+    """
+    Copies the node at the current position of the reader, replacing its columns with the patched ones
+    """
+    for node_key in reader.iter_members():
+        if node_key != "columns":
+            reader.skip_value()
+            continue
+
+        # Stop copying the original text while the patched columns are written instead
+        reader.peek()
+        reader.echo_to(None)
+        node = {"columns": reader.read_value()}
+        apply_patch_to_node(node, node_patch)
+        output_file.write(json_dumps(node["columns"]))
+        reader.echo_to(output_file)
+
+
+def _load_nodes(path: Path, prune) -> Dict:
+    artifact: Dict = {key: {} for key in NODE_KEYS}
+
+    with open(path, encoding="utf-8") as file:
+        reader = JsonStreamReader(file)
+
+        for key in reader.iter_members():
+            if key not in NODE_KEYS:
+                reader.skip_value()
+                continue
+
+            for node_id in reader.iter_members():
+                artifact[key][node_id] = prune(reader.read_value())
+
+    return artifact
+
+
+def _lean_manifest_node(node: Mapping) -> Dict:
+    lean_node = {
+        "unique_id": node["unique_id"],
+        "depends_on": {"nodes": node.get("depends_on", {}).get("nodes", [])},
+        "columns": {key: _lean_manifest_column(column) for key, column in node.get("columns", {}).items()},
+    }
+
+    # Used by the traversal cache
+    if node.get("checksum"):
+        lean_node["checksum"] = node["checksum"]
+
+    return lean_node
+
+
+def _lean_manifest_column(column: Mapping) -> Dict:
+    lean_column = {"name": column["name"], "description": column.get("description", "")}
+    original_name = column.get("meta", {}).get("original_name")
+
+    if original_name:
+        lean_column["meta"] = {"original_name": original_name}
+
+    return lean_column
+
+
+def _lean_catalog_node(node: Mapping) -> Dict:
+    return {"columns": {key: {"name": column["name"]} for key, column in node.get("columns", {}).items()}}
@@ -1,89 +1,126 @@
 from collections import namedtuple
-from typing import Any, Dict, Mapping, Optional, Set
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Mapping, Optional, Set
 
-from pydantic import BaseModel, Field
+from dbttoolkit.documentation.models.lineage import ColumnLineage
+
+if TYPE_CHECKING:
+    from dbttoolkit.documentation.models.column_model import ColumnModel
 
 ColumnFqn = namedtuple("ColumnFqn", ["node_id", "name"])
 
 ColumnDescriptionWithSource = Dict[str, str]  # { 'node_id': 'description' }
 
 
-class Column(BaseModel):
+class Column:
     """
     A column that exists in a dbt model. An common representation for both dbt catalog and dbt manifest columns.
 
     It has pointers to the node object from the artifact and also the original column object.
     Also has pointers to upstream and downstream dependencies and methods to recurse through them.
+
+    A project can have hundreds of thousands of columns, so this is a plain class with `__slots__` instead of a
+    pydantic model. Use `ColumnModel` (see `column_model`) when a validated representation is needed.
     """
 
-    name: str = Field(..., allow_mutation=False)
-    node: Mapping = Field(..., allow_mutation=False, repr=False)
+    __slots__ = (
+        "_name",
+        "_node",
+        "_fqn",
+        "_hash",
+        "_description",
+        "artifact_column",
+        "upstream_matches",
+        "downstream_matches",
+        "_registry",
+    )
+
+    def __init__(
+        self, *, name: str, node: Mapping, artifact_column: Mapping, description: Optional[str] = None
+    ) -> None:
+        self._name = name
+        self._node = node
+        self._fqn = ColumnFqn(node["unique_id"], name)
+        self._hash = hash(self._fqn)
+        self._description = description or None
+
+        self.artifact_column = artifact_column  # Can be either the column representation in the manifest or catalog
+        self.upstream_matches: Set["Column"] = set()
+        self.downstream_matches: Set["Column"] = set()
+
+        # The registry this column belongs to, if any. Set by the registry itself
+        self._registry: Optional["ColumnRegistry"] = None
+
+    @property
+    def name(self) -> str:
+        return self._name
 
-    artifact_column: Mapping  # Can be either the column representation in the manifest or in the catalog
-    description: Optional[str]
+    @property
+    def node(self) -> Mapping:
+        return self._node
 
-    upstream_matches: Set = set()
-    downstream_matches: Set = set()
+    @property
+    def description(self) -> Optional[str]:
+        return self._description
 
-    class Config:
-        validate_assignment = True
+    @description.setter
+    def description(self, description: Optional[str]) -> None:
+        self._description = description or None
 
-    def __post__init__(self) -> None:
-        if self.description == "":
-            self.description = None
+        if self._registry is not None:
+            self._registry.invalidate_descriptions()
 
     def add_upstream_match(self, column: "Column") -> None:
         self.upstream_matches.add(column)
-
-        if self not in column.downstream_matches:
-            column.add_downstream_match(self)
+        column.downstream_matches.add(self)
+        self._invalidate_lineage()
 
     def add_downstream_match(self, column: "Column") -> None:
-        self.downstream_matches.add(column)
+        column.add_upstream_match(self)
 
-        if self not in column.upstream_matches:
-            column.add_upstream_match(self)
+    @property
+    def downstream_matches_recursive(self) -> FrozenSet["Column"]:
+        """
+        :return: all columns downstream of this one, no matter how many levels deep
+        """
+        return self.lineage.downstream_matches_recursive(self)
 
     @property
-    def downstream_matches_recursive(self) -> set:
-        output = set()
+    def lineage(self) -> ColumnLineage:
+        """
+        The lineage of the registry this column belongs to, which is shared by all its columns. Columns that are
+        not in a registry get a lineage covering only the columns connected to them.
+        """
+        if self._registry is not None:
+            return self._registry.lineage
 
-        for column in self.downstream_matches:
-            output.add(column)
-            output.update(column.downstream_matches_recursive)
+        return ColumnLineage([self])
 
-        return output
+    def _invalidate_lineage(self) -> None:
+        if self._registry is not None:
+            self._registry.invalidate_lineage()
 
     @property
     def descriptions_from_upstream(self) -> ColumnDescriptionWithSource:
         """
+        Resolved for all columns of the registry at once and cached until a description or the graph changes.
+
         :return: dict with node_id as key and original description as value
         """
-        descriptions = {}
-
-        for column in self.upstream_matches:
-            if column.description:
-                descriptions[column.node_id] = column.description
-            else:
-                # Only search up if it was not found already
-                for node_id, description in column.descriptions_from_upstream.items():
-                    descriptions[node_id] = description
-
-        return descriptions
+        return self.lineage.descriptions_from_upstream(self)
 
     @property
     def node_id(self) -> str:
-        return self.node["unique_id"]
+        return self._fqn.node_id
 
     @property
     def fqn(self) -> ColumnFqn:
-        return ColumnFqn(self.node_id, self.name)
+        return self._fqn
 
     def __hash__(self):
-        return hash(self.fqn)
+        return self._hash
 
     def __eq__(self, other: Any):
-        return isinstance(other, self.__class__) and self.fqn == other.fqn
+        return isinstance(other, self.__class__) and self._fqn == other._fqn
 
     def __repr__(self):
         model_type = self.fqn.node_id.split(".")[0]
@@ -102,7 +139,7 @@ class Column(BaseModel):
         return cls(name=column["name"].lower(), node=node, artifact_column=column)
 
 
-class ColumnRegistry(BaseModel):
+class ColumnRegistry:
     """
     A data structure to make it easy to work with dbt column representations.
 
@@ -110,14 +147,54 @@ class ColumnRegistry(BaseModel):
     provides a convenience method to add or retrieve column definitions both from the manifest and the catalog.
     """
 
-    data: Dict[ColumnFqn, Column] = {}
+    __slots__ = ("data", "_lineage")
+
+    def __init__(self) -> None:
+        self.data: Dict[ColumnFqn, Column] = {}
+        self._lineage: Optional[ColumnLineage] = None
+
+    def add_or_retrieve(
+        self, *, column_in_manifest: Mapping = None, column_in_catalog: Mapping = None, node: Mapping
+    ) -> Column:
+        artifact_column = column_in_manifest or column_in_catalog
+
+        if not artifact_column:
+            raise ValueError("Invalid column details")
+
+        existing_column = self.data.get(ColumnFqn(node["unique_id"], artifact_column["name"].lower()))
+
+        if existing_column is not None:
+            return existing_column
 
-    def add_or_retrieve(self, *, column_in_manifest: dict = None, column_in_catalog: dict = None, node) -> Column:
         if column_in_manifest:
             column = Column.build_from_dbt_manifest_column(column_in_manifest, node)
-        elif column_in_catalog:
-            column = Column.build_from_dbt_catalog_column(column_in_catalog, node)
         else:
-            raise ValueError("Invalid column details")
+            column = Column.build_from_dbt_catalog_column(artifact_column, node)
+
+        column._registry = self
+        self.data[column.fqn] = column
+        self.invalidate_lineage()
+
+        return column
+
+    def to_models(self) -> List["ColumnModel"]:
+        from dbttoolkit.documentation.models.column_model import ColumnModel
+
+        return [ColumnModel.from_column(column) for column in self.data.values()]
+
+    @property
+    def lineage(self) -> ColumnLineage:
+        """
+        The lineage of all columns in the registry. It is computed once and reused until the registry changes.
+        """
+        if self._lineage is None:
+            self._lineage = ColumnLineage(self.data.values())
+
+        return self._lineage
+
+    def invalidate_lineage(self) -> None:
+        self._lineage = None
 
-        return self.data.setdefault(column.fqn, column)
+    def invalidate_descriptions(self) -> None:
+        if self._lineage is not None:
+            self._lineage.clear_descriptions()
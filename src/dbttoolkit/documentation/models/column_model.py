@@ -0,0 +1,29 @@
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from dbttoolkit.documentation.models.column import Column
+
+
+class ColumnModel(BaseModel):
+    """
+    A validated, serializable snapshot of a column and its direct matches, for consumers of this package that
+    expect pydantic models. It is not used while traversing the artifacts, so pydantic is only imported by them.
+    """
+
+    node_id: str
+    name: str
+    description: Optional[str]
+
+    upstream_matches: List[Tuple[str, str]] = []  # Fully qualified names: (node_id, name)
+    downstream_matches: List[Tuple[str, str]] = []
+
+    @classmethod
+    def from_column(cls, column: Column) -> "ColumnModel":
+        return cls(
+            node_id=column.node_id,
+            name=column.name,
+            description=column.description,
+            upstream_matches=sorted(match.fqn for match in column.upstream_matches),
+            downstream_matches=sorted(match.fqn for match in column.downstream_matches),
+        )
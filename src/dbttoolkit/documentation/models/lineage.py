@@ -0,0 +1,304 @@
+from collections import deque
+from heapq import nsmallest
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from dbttoolkit.documentation.models.column import Column, ColumnDescriptionWithSource
+
+# Size of the sketches of `estimate_undocumented_descendants`: the relative error is about 1 / sqrt(SKETCH_SIZE - 2)
+SKETCH_SIZE = 64
+_HASH_RANGE = 2**64
+
+
+class ColumnLineage:
+    """
+    Graph-level computations over the upstream/downstream matches of a set of columns.
+
+    Instead of recursing through the matches of every column individually, the columns are sorted topologically
+    once and the results of a column are derived from the (already computed) results of its neighbours. Nothing
+    here recurses, so deep lineage chains do not hit Python's recursion limit, and diamond-shaped lineage is only
+    walked once.
+
+    The results are a snapshot: the owner of this object is expected to discard it when the graph changes.
+    """
+
+    def __init__(self, columns: Iterable["Column"]) -> None:
+        self.columns: List["Column"] = _connected_columns(columns)
+        self.topological_order, self.cyclic_columns = _sort_topologically(self.columns)
+
+        self._downstream_closures: Optional[Dict["Column", FrozenSet["Column"]]] = None
+        self._upstream_descriptions: Optional[Dict["Column", "ColumnDescriptionWithSource"]] = None
+
+    def downstream_matches_recursive(self, column: "Column") -> FrozenSet["Column"]:
+        """
+        :return: every column that is (directly or indirectly) downstream of the given column
+        """
+        if self._downstream_closures is None:
+            self._downstream_closures = self._compute_downstream_closures()
+
+        return self._downstream_closures[column]
+
+    def descriptions_from_upstream(self, column: "Column") -> "ColumnDescriptionWithSource":
+        """
+        The descriptions a column inherits: for every upstream path, the description of the closest documented
+        column. The returned dict can be shared between columns and must not be modified.
+
+        :return: dict with node_id as key and original description as value
+        """
+        if self._upstream_descriptions is None:
+            self._upstream_descriptions = self._compute_upstream_descriptions()
+
+        return self._upstream_descriptions[column]
+
+    def clear_descriptions(self) -> None:
+        """
+        Discards the resolved descriptions (eg: because a column description changed). The graph is kept.
+        """
+        self._upstream_descriptions = None
+
+    def undocumented_descendants(self, column: "Column") -> List["Column"]:
+        """
+        The undocumented columns downstream of a column, no matter how many levels deep. Unlike
+        `downstream_matches_recursive`, nothing is cached: only the columns of one search are kept in memory.
+        """
+        return [descendant for descendant in _reachable(column, "downstream_matches") if not descendant.description]
+
+    def undocumented_descendants_bounds(self) -> Dict["Column", int]:
+        """
+        An upper bound of the amount of undocumented columns downstream of every column, in a single pass over the
+        graph: the sum of the bounds of its children (plus the children themselves, if undocumented).
+
+        A column downstream of several children is counted once per child, so the bound is exact when the lineage
+        below a column is a tree, and too high when it has shared descendants (e.g. a diamond). It is also capped by
+        the amount of undocumented columns. It is zero only if there is no undocumented column downstream.
+        """
+        undocumented_count = sum(1 for column in self.columns if not column.description)
+        bounds: Dict["Column", int] = {
+            column: len(self.undocumented_descendants(column)) for column in self.cyclic_columns
+        }
+
+        for column in reversed(self.topological_order):
+            if column not in bounds:
+                bound = sum(bounds[child] + (not child.description) for child in column.downstream_matches)
+                bounds[column] = min(bound, undocumented_count)
+
+        return bounds
+
+    def estimate_undocumented_descendants(self, columns: Iterable["Column"]) -> Dict["Column", float]:
+        """
+        Estimates the amount of undocumented columns downstream of the given columns, counting shared descendants
+        once, without keeping the descendants of every column in memory.
+
+        Every column gets a K-minimum values sketch of its undocumented descendants (the `SKETCH_SIZE` lowest hashes
+        of their ids), merged from the sketches of its children. A sketch is discarded once all the parents of its
+        column have used it. The estimate is exact below `SKETCH_SIZE` descendants.
+        """
+        requested = set(columns)
+        cyclic_columns = set(self.cyclic_columns)
+        hashes = {column: _hash(position) for position, column in enumerate(self.columns)}
+        pending_parents = {column: len(column.upstream_matches) for column in self.columns}
+        sketches: Dict["Column", Tuple[int, ...]] = {}
+        estimates: Dict["Column", float] = {}
+
+        for column in self.cyclic_columns:
+            sketches[column] = tuple(
+                nsmallest(SKETCH_SIZE, (hashes[child] for child in self.undocumented_descendants(column)))
+            )
+
+        for column in reversed(self.topological_order):
+            if column not in sketches:
+                candidates: Set[int] = set()
+
+                for child in column.downstream_matches:
+                    candidates.update(sketches[child])
+
+                    if not child.description:
+                        candidates.add(hashes[child])
+
+                    pending_parents[child] -= 1
+
+                    if pending_parents[child] == 0 and child not in cyclic_columns:
+                        del sketches[child]
+
+                sketches[column] = tuple(nsmallest(SKETCH_SIZE, candidates))
+
+            if column in requested:
+                estimates[column] = _estimate(sketches[column])
+
+            if not column.upstream_matches:
+                del sketches[column]
+
+        return estimates
+
+    def _compute_upstream_descriptions(self) -> Dict["Column", "ColumnDescriptionWithSource"]:
+        resolved: Dict["Column", "ColumnDescriptionWithSource"] = {}
+
+        # Columns in (or downstream of) a cycle are resolved with a search of their own
+        for column in self.cyclic_columns:
+            resolved[column] = _closest_upstream_descriptions(column)
+
+        # Upstream columns come first in the topological order, so the results of all parents are available
+        # when a column is processed
+        for column in self.topological_order:
+            if column in resolved:
+                continue
+
+            parents = column.upstream_matches
+
+            if len(parents) == 1:
+                (parent,) = parents
+
+                if not parent.description:
+                    # Nothing to add on top of the parent: reuse its result instead of copying it
+                    resolved[column] = resolved[parent]
+                    continue
+
+            descriptions: "ColumnDescriptionWithSource" = {}
+
+            for parent in parents:
+                if parent.description:
+                    descriptions[parent.node_id] = parent.description
+                else:
+                    descriptions.update(resolved[parent])
+
+            resolved[column] = descriptions
+
+        return resolved
+
+    def _compute_downstream_closures(self) -> Dict["Column", FrozenSet["Column"]]:
+        # Columns in (or downstream of) a cycle can not be ordered, so they are walked individually
+        closures: Dict["Column", FrozenSet["Column"]] = {
+            column: _reachable(column, "downstream_matches") for column in self.cyclic_columns
+        }
+
+        # Downstream columns come later in the topological order, so walking it backwards guarantees that
+        # the closures of all children are available when a column is processed
+        for column in reversed(self.topological_order):
+            if column in closures:
+                continue
+
+            children = column.downstream_matches
+
+            if not children:
+                closures[column] = frozenset()
+            elif len(children) == 1:
+                (child,) = children
+                closures[column] = closures[child].union((child,))
+            else:
+                closure: Set["Column"] = set(children)
+
+                for child in children:
+                    closure.update(closures[child])
+
+                closures[column] = frozenset(closure)
+
+        return closures
+
+
+def _hash(position: int) -> int:
+    """
+    Spreads consecutive integers uniformly over [0, 2^64) (SplitMix64 finalizer)
+    """
+    value = (position + 0x9E3779B97F4A7C15) % _HASH_RANGE
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) % _HASH_RANGE
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) % _HASH_RANGE
+    return value ^ (value >> 31)
+
+
+def _estimate(sketch: Tuple[int, ...]) -> float:
+    """
+    The amount of distinct values in a K-minimum values sketch: if the K lowest hashes of a set are known, the K-th
+    one tells how dense the hashes (and so, the values) are
+    """
+    if len(sketch) < SKETCH_SIZE:
+        return float(len(sketch))
+
+    return (SKETCH_SIZE - 1) * _HASH_RANGE / (sketch[-1] + 1)
+
+
+def _connected_columns(columns: Iterable["Column"]) -> List["Column"]:
+    """
+    Expands the given columns with every column reachable from them (both upstream and downstream), so the lineage
+    is complete even when it is built from a subset of the graph. The original order is preserved.
+    """
+    seen: Dict["Column", None] = dict.fromkeys(columns)
+    queue = deque(seen)
+
+    while queue:
+        column = queue.popleft()
+
+        for neighbour in (*column.upstream_matches, *column.downstream_matches):
+            if neighbour not in seen:
+                seen[neighbour] = None
+                queue.append(neighbour)
+
+    return list(seen)
+
+
+def _reachable(column: "Column", direction: str) -> FrozenSet["Column"]:
+    """
+    Breadth-first search following either the `upstream_matches` or the `downstream_matches` of the columns
+    """
+    seen: Set["Column"] = set()
+    queue = deque(getattr(column, direction))
+
+    while queue:
+        neighbour = queue.popleft()
+
+        if neighbour not in seen:
+            seen.add(neighbour)
+            queue.extend(getattr(neighbour, direction))
+
+    return frozenset(seen)
+
+
+def _closest_upstream_descriptions(column: "Column") -> "ColumnDescriptionWithSource":
+    """
+    Breadth-first search upstream that stops at documented columns
+    """
+    descriptions: "ColumnDescriptionWithSource" = {}
+    seen: Set["Column"] = set()
+    queue = deque(column.upstream_matches)
+
+    while queue:
+        parent = queue.popleft()
+
+        if parent in seen:
+            continue
+
+        seen.add(parent)
+
+        if parent.description:
+            descriptions[parent.node_id] = parent.description
+        else:
+            queue.extend(parent.upstream_matches)
+
+    return descriptions
+
+
+def _sort_topologically(columns: List["Column"]) -> Tuple[List["Column"], List["Column"]]:
+    """
+    Kahn's algorithm: upstream columns always come before their downstream matches.
+
+    The lineage of a dbt project is acyclic, but if a cycle ever shows up (eg: a model selecting from itself), the
+    columns that are part of it (or downstream of it) can not be sorted. They are appended at the end of the order
+    instead of being dropped, and also returned separately.
+    """
+    pending_parents = {column: len(column.upstream_matches) for column in columns}
+    queue = deque(column for column, count in pending_parents.items() if count == 0)
+    order: List["Column"] = []
+
+    while queue:
+        column = queue.popleft()
+        order.append(column)
+
+        for child in column.downstream_matches:
+            pending_parents[child] -= 1
+
+            if pending_parents[child] == 0:
+                queue.append(child)
+
+    cyclic_columns = [column for column, count in pending_parents.items() if count > 0]
+    order.extend(cyclic_columns)
+
+    return order, cyclic_columns
@@ -0,0 +1,315 @@
+"""
+A compact, memory-mappable binary format for the column lineage built by `traverse_artifacts`, so other tools can
+use the graph without parsing the artifacts again.
+
+The file is a header followed by sections of little-endian unsigned 32-bit integers (and one of UTF-8 text), every
+one aligned to 8 bytes:
+
+* A string table: every node id, column name and description is stored once, and referenced by its index
+* The nodes, sorted by id, with the range of their columns (CSR offsets)
+* The columns, sorted by node id and name: their name, node and description (`NO_STRING` if undocumented)
+* The upstream and downstream matches of every column, as CSR adjacency arrays: the matches of column `i` are
+  `targets[offsets[i]:offsets[i + 1]]`
+
+Since both nodes and columns are sorted, a column is found with a binary search over the file, and opening it does
+not read anything but the header.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from dbttoolkit.documentation.models.column import Column, ColumnFqn
+
+MAGIC = b"DBTCOLLG"
+VERSION = 1
+
+NO_STRING = 0xFFFFFFFF  # A column without description
+
+# The sections of the file, in order
+SECTIONS = (
+    "string_offsets",
+    "strings",
+    "node_names",
+    "node_columns",
+    "column_names",
+    "column_nodes",
+    "column_descriptions",
+    "upstream_offsets",
+    "upstream",
+    "downstream_offsets",
+    "downstream",
+)
+
+_HEADER = struct.Struct(f"<8sII{len(SECTIONS) * 2}Q")  # Magic, version, section count, (offset, size) per section
+_ALIGNMENT = 8
+
+
+def write_lineage_graph(columns: Iterable[Column], output_path: Path) -> None:
+    """
+    Writes the columns and their matches (e.g. all columns of a `ColumnRegistry`) to `output_path`. The file is
+    replaced atomically, so readers never see it half-written.
+    """
+    content = serialize_lineage_graph(columns)
+    output_path = Path(output_path)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=output_path.resolve().parent, suffix=".tmp")
+
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(content)
+
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def serialize_lineage_graph(columns: Iterable[Column]) -> bytes:
+    """
+    :return: the content of a column lineage file with the columns and their matches
+    """
+    sorted_columns = sorted(columns, key=lambda column: column.fqn)
+    column_ids = {column: column_id for column_id, column in enumerate(sorted_columns)}
+    strings: Dict[str, int] = {}
+
+    def intern(string: str) -> int:
+        return strings.setdefault(string, len(strings))
+
+    node_names = array("I")
+    node_columns = array("I", [0])
+    column_nodes = array("I")
+
+    for node_id, node_columns_group in groupby(sorted_columns, key=lambda column: column.node_id):
+        column_count = sum(1 for _ in node_columns_group)
+        column_nodes.extend([len(node_names)] * column_count)
+        node_names.append(intern(node_id))
+        node_columns.append(node_columns[-1] + column_count)
+
+    column_names = array("I", (intern(column.name) for column in sorted_columns))
+    column_descriptions = array(
+        "I", (intern(column.description) if column.description else NO_STRING for column in sorted_columns)
+    )
+    upstream_offsets, upstream = _adjacency(sorted_columns, column_ids, lambda column: column.upstream_matches)
+    downstream_offsets, downstream = _adjacency(sorted_columns, column_ids, lambda column: column.downstream_matches)
+
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    string_offsets = array("I", [0])
+
+    for encoded_string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded_string))
+
+    sections = {
+        "string_offsets": _to_bytes(string_offsets),
+        "strings": b"".join(encoded_strings),
+        "node_names": _to_bytes(node_names),
+        "node_columns": _to_bytes(node_columns),
+        "column_names": _to_bytes(column_names),
+        "column_nodes": _to_bytes(column_nodes),
+        "column_descriptions": _to_bytes(column_descriptions),
+        "upstream_offsets": _to_bytes(upstream_offsets),
+        "upstream": _to_bytes(upstream),
+        "downstream_offsets": _to_bytes(downstream_offsets),
+        "downstream": _to_bytes(downstream),
+    }
+
+    content = bytearray(_HEADER.size)
+    table: List[int] = []
+
+    for name in SECTIONS:
+        content += b"\0" * (-len(content) % _ALIGNMENT)
+        table += [len(content), len(sections[name])]
+        content += sections[name]
+
+    _HEADER.pack_into(content, 0, MAGIC, VERSION, len(SECTIONS), *table)
+    return bytes(content)
+
+
+class LineageGraph:
+    """
+    A column lineage file written by `write_lineage_graph`. `open` maps the file in memory: nothing is parsed or
+    copied, and the operating system only reads the pages that are used.
+
+    Columns are identified by their index in the file (`column_id`).
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Not a column lineage file: too short")
+
+        magic, version, section_count, *table = _HEADER.unpack_from(buffer)
+
+        if magic != MAGIC:
+            raise ValueError("Not a column lineage file")
+        if version != VERSION or section_count != len(SECTIONS):
+            raise ValueError(f"Unsupported column lineage file version: {version}")
+
+        self._sections: Dict[str, Sequence[int]] = {}
+
+        for position, name in enumerate(SECTIONS):
+            start, size = table[2 * position], table[2 * position + 1]
+            end = start + size
+
+            if name == "strings":
+                self._strings = self._view[start:end]
+            else:
+                self._sections[name] = _to_integers(self._view[start:end])
+
+        self._string_offsets = self._sections["string_offsets"]
+        self._node_names = self._sections["node_names"]
+        self._node_columns = self._sections["node_columns"]
+        self._column_names = self._sections["column_names"]
+        self._column_nodes = self._sections["column_nodes"]
+        self._column_descriptions = self._sections["column_descriptions"]
+        self._upstream_offsets = self._sections["upstream_offsets"]
+        self._upstream = self._sections["upstream"]
+        self._downstream_offsets = self._sections["downstream_offsets"]
+        self._downstream = self._sections["downstream"]
+
+    @classmethod
+    def open(cls, path: Path) -> "LineageGraph":
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_columns(cls, columns: Iterable[Column]) -> "LineageGraph":
+        """
+        Builds the graph in memory, e.g. from the columns of a `ColumnRegistry`, without writing a file
+        """
+        return cls(serialize_lineage_graph(columns))
+
+    def close(self) -> None:
+        """
+        Releases the memory mapping
+        """
+        for section in self._sections.values():
+            if isinstance(section, memoryview):
+                section.release()
+
+        self._strings.release()
+        self._view.release()
+
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> "LineageGraph":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def node_count(self) -> int:
+        return len(self._node_names)
+
+    @property
+    def column_count(self) -> int:
+        return len(self._column_names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._upstream)
+
+    def column_id(self, node_id: str, name: str) -> Optional[int]:
+        """
+        :return: the id of the column, or None if it is not in the graph. Column names are lowercase
+        """
+        columns = self.node_column_ids(node_id)
+        position = _bisect(
+            columns.start, columns.stop, lambda column_id: self.string(self._column_names[column_id]), name
+        )
+
+        if position < columns.stop and self.string(self._column_names[position]) == name:
+            return position
+
+        return None
+
+    def node_column_ids(self, node_id: str) -> range:
+        """
+        :return: the ids of the columns of the node (empty if the node is not in the graph)
+        """
+        position = _bisect(0, self.node_count, lambda index: self.string(self._node_names[index]), node_id)
+
+        if position < self.node_count and self.string(self._node_names[position]) == node_id:
+            return range(self._node_columns[position], self._node_columns[position + 1])
+
+        return range(0)
+
+    def fqn(self, column_id: int) -> ColumnFqn:
+        node_name = self._node_names[self._column_nodes[column_id]]
+        return ColumnFqn(self.string(node_name), self.string(self._column_names[column_id]))
+
+    def description(self, column_id: int) -> Optional[str]:
+        description = self._column_descriptions[column_id]
+        return None if description == NO_STRING else self.string(description)
+
+    def upstream(self, column_id: int) -> List[int]:
+        """
+        :return: the ids of the direct upstream matches of the column
+        """
+        start, end = self._upstream_offsets[column_id], self._upstream_offsets[column_id + 1]
+        return list(self._upstream[start:end])
+
+    def downstream(self, column_id: int) -> List[int]:
+        """
+        :return: the ids of the direct downstream matches of the column
+        """
+        start, end = self._downstream_offsets[column_id], self._downstream_offsets[column_id + 1]
+        return list(self._downstream[start:end])
+
+    def string(self, index: int) -> str:
+        start, end = self._string_offsets[index], self._string_offsets[index + 1]
+        return str(self._strings[start:end], "utf-8")
+
+
+def _adjacency(
+    columns: List[Column], column_ids: Dict[Column, int], neighbours: Callable[[Column], Iterable[Column]]
+) -> Tuple[array, array]:
+    offsets = array("I", [0])
+    targets = array("I")
+
+    for column in columns:
+        targets.extend(sorted(column_ids[neighbour] for neighbour in neighbours(column)))
+        offsets.append(len(targets))
+
+    return offsets, targets
+
+
+def _to_bytes(integers: array) -> bytes:
+    if sys.byteorder == "big":
+        integers = array(integers.typecode, integers)
+        integers.byteswap()
+
+    return integers.tobytes()
+
+
+def _to_integers(view: memoryview) -> Sequence[int]:
+    # Zero-copy on little-endian platforms. Elsewhere, the section is copied to swap its bytes
+    if sys.byteorder == "little":
+        return view.cast("I")
+
+    integers = array("I", view.tobytes())
+    integers.byteswap()
+    return integers
+
+
+def _bisect(low: int, high: int, key: Callable[[int], str], value: str) -> int:
+    """
+    The first position in [low, high) whose key is not lower than `value`, for keys sorted in ascending order
+    """
+    while low < high:
+        middle = (low + high) // 2
+
+        if key(middle) < value:
+            low = middle + 1
+        else:
+            high = middle
+
+    return low
@@ -0,0 +1,183 @@
+"""
+Impact analysis over a column lineage file (see `lineage_graph`): which columns are downstream (or upstream) of a set
+of columns, how far, through which path and because of which of the queried columns.
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dbttoolkit.documentation.models.column import ColumnFqn
+from dbttoolkit.documentation.models.lineage_graph import LineageGraph
+
+
+class Direction(str, Enum):
+    downstream = "downstream"  # The columns affected by a change in the queried ones
+    upstream = "upstream"  # The columns the queried ones derive from
+
+
+@dataclass(frozen=True)
+class LineageMatch:
+    """
+    A column reached by a query
+    """
+
+    fqn: ColumnFqn
+    depth: int  # Matches between the closest queried column and this one
+    sources: Tuple[ColumnFqn, ...]  # The queried columns it is reached from
+    path: Tuple[ColumnFqn, ...]  # From the closest queried column to this one, both included
+
+
+class LineageQuery:
+    """
+    The closure of a set of columns in one direction of the lineage.
+
+    All the queried columns are traversed together, with a single breadth-first search: a batch of columns (e.g. the
+    ones changed in a pull request) costs about as much as its largest closure, not the sum of all of them. On the
+    way, every column records its depth (the distance to the closest queried column), the column it was first
+    reached from (to rebuild its path) and the queried columns it is reached from (as a bit mask).
+
+    The search goes one depth at a time, and a column only passes on the queried columns that reached it at the
+    current depth: every queried column spreads at its own distance, so with `max_depth` a column is only reached
+    from the queried columns that are at most `max_depth` matches away.
+    """
+
+    def __init__(
+        self, graph: LineageGraph, column_ids: Iterable[int], direction: Direction, *, max_depth: Optional[int] = None
+    ) -> None:
+        self.graph = graph
+        self.sources = list(dict.fromkeys(column_ids))
+        self.direction = direction
+
+        neighbours = graph.downstream if direction == Direction.downstream else graph.upstream
+
+        self._depths: Dict[int, int] = {}
+        self._parents: Dict[int, int] = {}
+        self._masks: Dict[int, int] = {}
+
+        # The columns reached at the current depth, with the queried columns that reached them at this depth
+        frontier: Dict[int, int] = {}
+
+        for position, column_id in enumerate(self.sources):
+            self._depths[column_id] = 0
+            self._masks[column_id] = 1 << position
+            frontier[column_id] = 1 << position
+
+        depth = 0
+
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier: Dict[int, int] = {}
+
+            for column_id, mask in frontier.items():
+                for neighbour in neighbours(column_id):
+                    new_sources = mask & ~self._masks.get(neighbour, 0)
+
+                    if not new_sources:
+                        continue
+
+                    if neighbour not in self._depths:
+                        # First time reached: with a breadth-first search, through the shortest path
+                        self._depths[neighbour] = depth
+                        self._parents[neighbour] = column_id
+
+                    self._masks[neighbour] = self._masks.get(neighbour, 0) | new_sources
+                    next_frontier[neighbour] = next_frontier.get(neighbour, 0) | new_sources
+
+            frontier = next_frontier
+
+    @classmethod
+    def from_fqns(
+        cls, graph: LineageGraph, fqns: Iterable[ColumnFqn], direction: Direction, *, max_depth: Optional[int] = None
+    ) -> "LineageQuery":
+        """
+        :raises KeyError: if a column is not in the graph
+        """
+        column_ids = []
+
+        for fqn in fqns:
+            column_id = graph.column_id(*fqn)
+
+            if column_id is None:
+                raise KeyError(f"Column not found in the lineage: {fqn.node_id}.{fqn.name}")
+
+            column_ids.append(column_id)
+
+        return cls(graph, column_ids, direction, max_depth=max_depth)
+
+    def column_ids(self) -> List[int]:
+        """
+        :return: the ids of the columns reached, excluding the queried ones, by depth
+        """
+        return [column_id for column_id, depth in self._depths.items() if depth > 0]
+
+    def depth(self, column_id: int) -> Optional[int]:
+        """
+        :return: the distance to the closest queried column, None if the column is not reached
+        """
+        return self._depths.get(column_id)
+
+    def path(self, column_id: int) -> List[int]:
+        """
+        :return: the shortest path from a queried column to the given one (both included)
+        """
+        if column_id not in self._depths:
+            raise KeyError(f"Column {column_id} is not reached by the query")
+
+        path = [column_id]
+
+        while path[-1] in self._parents:
+            path.append(self._parents[path[-1]])
+
+        return path[::-1]
+
+    def source_ids(self, column_id: int) -> List[int]:
+        """
+        :return: the queried columns the given column is reached from
+        """
+        mask = self._masks[column_id]
+        source_ids = []
+
+        # Only visits the bits that are set: a column is usually reached from a few of the queried columns
+        while mask:
+            lowest_bit = mask & -mask
+            source_ids.append(self.sources[lowest_bit.bit_length() - 1])
+            mask ^= lowest_bit
+
+        return source_ids
+
+    def matches(self) -> List[LineageMatch]:
+        """
+        :return: the columns reached, excluding the queried ones, by depth and name
+        """
+        fqns: Dict[int, ColumnFqn] = {}
+
+        def fqn(column_id: int) -> ColumnFqn:
+            # Paths and sources repeat the same columns over and over: their names are only read once
+            if column_id not in fqns:
+                fqns[column_id] = self.graph.fqn(column_id)
+
+            return fqns[column_id]
+
+        matches = [
+            LineageMatch(
+                fqn=fqn(column_id),
+                depth=self._depths[column_id],
+                sources=tuple(fqn(source) for source in self.source_ids(column_id)),
+                path=tuple(fqn(step) for step in self.path(column_id)),
+            )
+            for column_id in self.column_ids()
+        ]
+
+        return sorted(matches, key=lambda match: (match.depth, match.fqn))
+
+
+def parse_column(column: str) -> ColumnFqn:
+    """
+    Parses a column given as `<node id>.<column name>`, e.g. `model.my_project.stg_users.email`
+    """
+    node_id, separator, name = column.rpartition(".")
+
+    if not separator or not node_id or not name:
+        raise ValueError(f"Invalid column, expected <node id>.<column name>: {column}")
+
+    return ColumnFqn(node_id, name.lower())
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dbttoolkit.documentation.models.artifact_index import ArtifactIndex
+from dbttoolkit.utils.io import json_dumps, json_loads
+from dbttoolkit.utils.logger import get_logger
+
+logger = get_logger()
+
+# Bump whenever the matching logic or the file layout changes, so old caches are discarded
+CACHE_VERSION = 1
+
+NodeMatches = Dict[str, List[str]]  # { 'column name': ['upstream node id', ...] }
+
+
+class TraversalCache:
+    """
+    A persistent cache of the upstream matches found for the columns of every node, so consecutive runs of the
+    propagation only traverse the nodes that changed.
+
+    The matches of a node depend on the node itself (its SQL, its columns in the catalog, the `original_name` of its
+    columns and its dependencies) and on the columns of its direct upstream nodes. The cache key of a node is a hash
+    of the signatures of all of them: when a node changes, its own entry and the entries of its children are
+    invalidated. Nodes further downstream are not affected, because their matches only depend on their direct
+    parents.
+
+    Only the matches are cached. Descriptions are always read from the artifacts, since changing a description in
+    a YAML file does not change the checksum of a node.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: Dict[str, Dict] = self._load()
+        self._next_entries: Dict[str, Dict] = {}
+        self._signatures: Dict[str, str] = {}
+
+    def retrieve(self, node_id: str, index: ArtifactIndex) -> Optional[NodeMatches]:
+        """
+        :return: the cached matches of the node, or None if there are none or if they are outdated
+        """
+        key = self._key(node_id, index)
+        entry = self._entries.get(node_id)
+
+        if entry is None or entry["key"] != key:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._next_entries[node_id] = entry
+
+        return entry["matches"]
+
+    def store(self, node_id: str, index: ArtifactIndex, matches: NodeMatches) -> None:
+        self._next_entries[node_id] = {"key": self._key(node_id, index), "matches": matches}
+
+    def save(self) -> None:
+        """
+        Persists the entries used or stored in this run. Entries of nodes that no longer exist are dropped.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            file.write(json_dumps({"version": CACHE_VERSION, "nodes": self._next_entries}))
+
+        os.replace(temporary_path, self.path)
+        logger.info(f"Traversal cache saved: {self.hits} hits, {self.misses} misses")
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+
+        with open(self.path, "rb") as file:
+            content = json_loads(file.read())
+
+        if content.get("version") != CACHE_VERSION:
+            logger.info(f"Ignoring traversal cache with an outdated version: {self.path}")
+            return {}
+
+        return content["nodes"]
+
+    def _key(self, node_id: str, index: ArtifactIndex) -> str:
+        depends_on = index.manifest_node(node_id).get("depends_on", {}).get("nodes", [])
+        signatures = [self._signature(node_id, index)] + [self._signature(upstream, index) for upstream in depends_on]
+
+        return _hash(signatures)
+
+    def _signature(self, node_id: str, index: ArtifactIndex) -> str:
+        """
+        A hash of everything in a node that is relevant for matching columns
+        """
+        if node_id not in self._signatures:
+            node = index.manifest_node(node_id)
+
+            self._signatures[node_id] = _hash(
+                [
+                    node_id,
+                    node.get("checksum", {}).get("checksum"),
+                    node.get("depends_on", {}).get("nodes", []),
+                    list(index.catalog_columns.get(node_id, {})),
+                    {
+                        column_name: column.get("meta", {}).get("original_name")
+                        for column_name, column in index.manifest_columns.get(node_id, {}).items()
+                    },
+                ]
+            )
+
+        return self._signatures[node_id]
+
+
+def _hash(content) -> str:
+    return hashlib.sha256(json_dumps(content).encode("utf-8")).hexdigest()
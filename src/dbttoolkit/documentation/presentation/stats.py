@@ -1,18 +1,24 @@
+import heapq
 from collections import namedtuple
-from typing import List
+from typing import Any, Dict, List, Mapping, Tuple
 
-from dbttoolkit.documentation.models.column import ColumnRegistry
+from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+from dbttoolkit.documentation.models.lineage import ColumnLineage
 from dbttoolkit.utils.logger import get_logger
 
 logger = get_logger()
 
 PotentialPropagation = namedtuple("PotentialPropagation", ["parent", "children"])
 
+DEFAULT_TOP = 25
 
-def calculate_and_print(registry: ColumnRegistry) -> None:
+
+def calculate_and_print(registry: ColumnRegistry, *, top: int = DEFAULT_TOP, exact: bool = True) -> Dict[str, Any]:
     """
     Calculate some basic statistics (total number of parsed columns, how many are documented, etc) and
-    which columns would benefit the most from being documented.
+    which `top` columns would benefit the most from being documented (see `_find_best_columns_to_be_documented`).
+
+    :return: the same statistics, to be reported in a machine-readable format
     """
     logger.info(f"Total columns: {len(registry.data.keys())}")
 
@@ -28,47 +34,107 @@ def calculate_and_print(registry: ColumnRegistry) -> None:
     ]
     logger.info(f"✅ Columns with documentation propagated: {len(columns_can_receive_propagation)}")
 
-    best_columns_to_be_documented = _find_best_columns_to_be_documented(registry)
-    logger.info(f"🕵 Can propagate documentation if documented: {len(best_columns_to_be_documented)}")
+    candidates_count, best_columns_to_be_documented = _find_best_columns_to_be_documented(registry, top, exact=exact)
+    logger.info(f"🕵 Can propagate documentation if documented: {candidates_count}")
 
     if best_columns_to_be_documented:
-        logger.info("\n=> Top 25:")
+        logger.info(f"\n=> Top {top}{'' if exact else ' (approximate ranking)'}:")
 
         logger.info(
             "\n".join(
                 [
                     f"{potential.parent} ({len(potential.children)}) => {potential.children}"
-                    for potential in best_columns_to_be_documented[0:25]
+                    for potential in best_columns_to_be_documented
                 ]
             )
         )
 
-
-def _find_best_columns_to_be_documented(registry: ColumnRegistry) -> list:
+    return {
+        "columns": len(registry.data),
+        "documented_columns": len(columns_with_docs),
+        "undocumented_columns": len(columns_without_docs),
+        "columns_with_documentation_propagated": len(columns_can_receive_propagation),
+        "columns_that_can_propagate_if_documented": candidates_count,
+        "best_columns_to_be_documented": [
+            {
+                "node_id": potential.parent.node_id,
+                "name": potential.parent.name,
+                "undocumented_descendants": len(potential.children),
+            }
+            for potential in best_columns_to_be_documented
+        ],
+    }
+
+
+def _find_best_columns_to_be_documented(
+    registry: ColumnRegistry, top: int, *, exact: bool = True
+) -> Tuple[int, List[PotentialPropagation]]:
     """
     Retrieves which columns are not documented but would benefit the most if documented (i.e. propagating its
-    documentation would affect most downstream columns).
+    documentation would affect most undocumented downstream columns). Only columns without parents are considered,
+    because otherwise we would be repeating columns.
+
+    The downstream columns are not materialized for every candidate:
+
+    * If `exact`, the candidates are taken from a heap, by an upper bound of their undocumented descendants computed
+      in a single pass (see `ColumnLineage.undocumented_descendants_bounds`). Their descendants are only counted
+      until no remaining bound can beat the `top` counts found so far, which is usually after a few candidates
+    * Otherwise, the candidates are ranked by an estimate of their undocumented descendants, computed in a single
+      pass as well (see `ColumnLineage.estimate_undocumented_descendants`)
+
+    :return: how many columns would propagate documentation if documented, and the `top` ones, best first, with
+      their undocumented descendants
     """
-    best_columns_to_be_documented: List[PotentialPropagation] = []
+    lineage = registry.lineage
+    roots = [column for column in registry.data.values() if not column.upstream_matches and not column.description]
+
+    # A zero bound means that there is no undocumented column downstream: it would not be propagated anywhere
+    bounds = lineage.undocumented_descendants_bounds()
+    candidates = [column for column in roots if bounds[column] > 0]
+
+    if exact:
+        best_columns_to_be_documented = _top_by_exact_count(lineage, candidates, bounds, top)
+    else:
+        estimates = lineage.estimate_undocumented_descendants(candidates)
+        positions = {column: position for position, column in enumerate(candidates)}
+        best_columns_to_be_documented = [
+            PotentialPropagation(column, lineage.undocumented_descendants(column))
+            for column in heapq.nlargest(top, candidates, key=lambda column: (estimates[column], positions[column]))
+        ]
+        # The descendants of the selected columns are known exactly: they are shown in that order
+        best_columns_to_be_documented.sort(
+            key=lambda potential: (len(potential.children), positions[potential.parent]), reverse=True
+        )
+
+    return len(candidates), best_columns_to_be_documented
 
-    for column in registry.data.values():
-        if column.upstream_matches:
-            # We only want nodes without parents, because otherwise we would be repeating nodes
-            continue
 
-        if column.description:
-            # And not currently documented
-            continue
+def _top_by_exact_count(
+    lineage: ColumnLineage, candidates: List[Column], bounds: Mapping[Column, int], top: int
+) -> List[PotentialPropagation]:
+    """
+    The `top` candidates by amount of undocumented descendants. As when all candidates were sorted by it and then
+    reversed, ties are ranked by later position first.
+    """
+    # Candidates by decreasing (bound, position), and the best ones found so far in a min-heap, by (count, position):
+    # its first entry is the one the next candidates have to beat
+    by_bound = [(-bounds[column], -position, column) for position, column in enumerate(candidates)]
+    heapq.heapify(by_bound)
+    best: List[Tuple[int, int, PotentialPropagation]] = []
 
-        children = [column for column in column.downstream_matches_recursive if not column.description]
+    while by_bound and top > 0:
+        negative_bound, negative_position, column = heapq.heappop(by_bound)
 
-        if len(children) == 0:
-            # Wouldn't be propagated anywhere
-            continue
+        if len(best) == top and (-negative_bound, -negative_position) <= best[0][:2]:
+            # Not even its bound beats the worst of the best: neither do the remaining candidates
+            break
 
-        best_columns_to_be_documented.append(PotentialPropagation(column, children))
+        children = lineage.undocumented_descendants(column)
+        entry = (len(children), -negative_position, PotentialPropagation(column, children))
 
-    best_columns_to_be_documented.sort(key=lambda potential: len(potential.children))
-    best_columns_to_be_documented.reverse()
+        if len(best) < top:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
 
-    return best_columns_to_be_documented
+    return [potential for *_, potential in sorted(best, key=lambda entry: entry[:2], reverse=True)]
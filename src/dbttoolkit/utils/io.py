@@ -1,72 +1,116 @@
 import json
 from pathlib import Path
-from typing import Mapping
+from typing import Any, Mapping, Optional, Union
 
-from google.cloud import storage
+from dbttoolkit.utils.storage import GcsBackend, LocalBackend, StorageBackend
 
-from dbttoolkit.utils.logger import get_logger
+try:
+    # Optional faster JSON backend, installed with the `fast` extra
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-logger = get_logger()
 
-
-def persist(content: str, output_folder: Path, filename: str, *, bucket_name: str = None):
+def persist(
+    content: Union[str, bytes],
+    output_folder: Path,
+    filename: str,
+    *,
+    bucket_name: str = None,
+    backend: StorageBackend = None,
+):
     """
     Writes either to a local file or remotely to a bucket if "bucket_name" is provided
 
-    :param content: the string to be written
+    :param content: the string (or bytes) to be written
     :param output_folder: the path to the folder
     :param filename: the name of the file
     :param bucket_name: the name of the bucket
+    :param backend: where to write, instead of a GCS bucket or the local file system
     :return: None
     """
-    if bucket_name:
-        write_to_bucket(content, bucket_name, output_folder, filename)
-    else:
-        write_to_file(content, output_folder, filename)
+    _backend(bucket_name, backend).write(Path(output_folder, filename).as_posix(), content)
 
 
-def write_to_bucket(content: str, bucket_name: str, output_folder: Path, filename: str) -> None:
+def persist_file(
+    source_path: Path,
+    output_folder: Path,
+    filename: str,
+    *,
+    bucket_name: str = None,
+    backend: StorageBackend = None,
+):
     """
-    Uploads files to a GCS bucket
+    Moves a local file either to another local folder or remotely to a bucket if "bucket_name" is provided. The file
+    is never loaded in memory.
 
-    :param content: the string to be written
-    :param bucket_name: the name of the bucket
-    :param output_folder: the relative path in the bucket
+    :param source_path: the path to the file to be moved
+    :param output_folder: the path to the folder
     :param filename: the name of the file
-    :return:  None
+    :param bucket_name: the name of the bucket
+    :param backend: where to write, instead of a GCS bucket or the local file system
+    :return: None
     """
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
+    _backend(bucket_name, backend).write_file(Path(output_folder, filename).as_posix(), source_path)
 
-    file_path = Path(output_folder, filename)
-    blob = bucket.blob(str(file_path))
 
-    logger.info(f"Uploading to GCS: {bucket_name}, {file_path}")
+def write_to_bucket(content: Union[str, bytes], bucket_name: str, output_folder: Path, filename: str) -> None:
+    """
+    Uploads files to a GCS bucket, with the client of the process
 
-    blob.upload_from_string(content)
+    :param content: the string (or bytes) to be written
+    :param bucket_name: the name of the bucket
+    :param output_folder: the relative path in the bucket
+    :param filename: the name of the file
+    :return:  None
+    """
+    GcsBackend(bucket_name).write(Path(output_folder, filename).as_posix(), content)
 
 
-def write_to_file(content: str, output_folder: Path, filename: str) -> None:
+def write_to_file(content: Union[str, bytes], output_folder: Path, filename: str) -> None:
     """
-    Writes a string to a file.
+    Writes a string (or bytes) to a file.
     Takes care of creating the folder if necessary
 
-    :param content: the string to be written
+    :param content: the string (or bytes) to be written
     :param output_folder: the path to the folder
     :param filename: the name of the file
     :return: None
     """
-    Path.mkdir(output_folder, parents=True, exist_ok=True)
+    LocalBackend().write(Path(output_folder, filename).as_posix(), content)
+
+
+def _backend(bucket_name: Optional[str], backend: Optional[StorageBackend]) -> StorageBackend:
+    if backend is not None:
+        return backend
+
+    return GcsBackend(bucket_name) if bucket_name else LocalBackend()
+
+
+def json_loads(content: Union[str, bytes]) -> Any:
+    """
+    Parses JSON with `orjson` if it is installed, falling back to the standard library
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+
+    return json.loads(content)
 
-    logger.info(f"Writing to file: {output_folder / filename}")
 
-    with open(output_folder / filename, "w") as file:
-        file.write(content)
+def json_dumps(content: Any) -> str:
+    """
+    Serializes JSON (compact, without whitespace) with `orjson` if it is installed, falling back to the standard
+    library
+    """
+    if orjson is not None:
+        return orjson.dumps(content).decode("utf-8")
+
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False)
 
 
 def load_json_file(path) -> dict:
-    with open(path) as file:
-        manifest = json.load(file)
+    with open(path, "rb") as file:
+        manifest = json_loads(file.read())
 
     return manifest
 
@@ -0,0 +1,220 @@
+import json
+from typing import Any, Iterator, Optional, TextIO
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # In characters
+
+_WHITESPACE = " \t\n\r"
+_VALUE_TERMINATORS = '}]"'
+_SEPARATORS = _WHITESPACE + ",}]"
+
+
+class JsonStreamReader:
+    """
+    Reads a JSON document incrementally from a text file, without loading the whole document in memory.
+
+    The document is navigated from the outside in: `iter_members` walks through the keys of an object and
+    `iter_items` through the elements of an array. After every key (or element), the caller must consume the value,
+    either by materializing it (`read_value`), by descending into it (`iter_members`/`iter_items`) or by
+    skipping it (`skip_value`). Skipping a large value only materializes small pieces of it at a time.
+
+    Optionally, the consumed text can be echoed to an output file as it is read (see `echo_to`). This allows
+    rewriting a document by copying the original text and only replacing some values.
+    """
+
+    def __init__(self, file: TextIO, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+
+        self._buffer = ""
+        self._position = 0  # In the buffer
+        self._eof = False
+
+        self._echo: Optional[TextIO] = None
+        self._echoed_until = 0  # In the buffer
+
+    def iter_members(self) -> Iterator[str]:
+        """
+        Iterates over the keys of the object starting at the current position.
+        The value of each key must be consumed before moving to the next one.
+        """
+        self._expect("{")
+
+        if self.peek() == "}":
+            self._position += 1
+            return
+
+        while True:
+            key = self.read_value()
+            self._expect(":")
+
+            yield key
+
+            separator = self.peek()
+            self._position += 1
+
+            if separator == "}":
+                return
+            if separator != ",":
+                raise self._error(f"Expected ',' or '}}', found {separator!r}")
+
+    def iter_items(self) -> Iterator[int]:
+        """
+        Iterates over the elements of the array starting at the current position, yielding their indexes.
+        Each element must be consumed before moving to the next one.
+        """
+        self._expect("[")
+
+        if self.peek() == "]":
+            self._position += 1
+            return
+
+        index = 0
+
+        while True:
+            yield index
+
+            separator = self.peek()
+            self._position += 1
+
+            if separator == "]":
+                return
+            if separator != ",":
+                raise self._error(f"Expected ',' or ']', found {separator!r}")
+
+            index += 1
+
+    def read_value(self) -> Any:
+        """
+        Materializes the value starting at the current position
+        """
+        self.peek()
+
+        while True:
+            decoded = self._decode()
+
+            if decoded is not None:
+                value, self._position = decoded
+                return value
+
+            if not self._fill(len(self._buffer) - self._position):
+                raise self._error("Unexpected end of the document")
+
+    def skip_value(self) -> None:
+        """
+        Moves past the value starting at the current position. Values that fit in the current buffer are decoded
+        in one go, larger objects and arrays are walked through piece by piece.
+        """
+        first_character = self.peek()
+        decoded = self._decode()
+
+        if decoded is not None:
+            self._position = decoded[1]
+        elif first_character == "{":
+            for _ in self.iter_members():
+                self.skip_value()
+        elif first_character == "[":
+            for _ in self.iter_items():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def echo_to(self, output: Optional[TextIO]) -> None:
+        """
+        Starts (or, if `output` is None, stops) copying the text consumed from now on to `output`. The text consumed
+        so far is flushed to the previous output, if any.
+        """
+        self.flush_echo()
+        self._echo = output
+
+    def flush_echo(self) -> None:
+        """
+        Writes the text consumed so far to the echo output
+        """
+        start, end = self._echoed_until, self._position
+
+        if self._echo is not None and start < end:
+            self._echo.write(self._buffer[start:end])
+
+        self._echoed_until = self._position
+
+    def read_to_end(self) -> None:
+        """
+        Consumes the rest of the document (i.e. trailing whitespace), echoing it if enabled
+        """
+        while self._fill(self._chunk_size):
+            pass
+
+        self._position = len(self._buffer)
+        self.flush_echo()
+
+    def _decode(self):
+        """
+        Tries to decode the value at the current position with what is already in the buffer.
+
+        :return: a tuple with the value and the position after it, or None if the buffer does not contain the
+          entire value yet
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return None
+
+        # Numbers and literals have no terminator, so they might continue in the next chunk (eg: "12" + ".5").
+        # They are only complete if followed by something that can not be part of them
+        if self._buffer[end - 1] not in _VALUE_TERMINATORS and not self._eof:
+            if end == len(self._buffer) or self._buffer[end] not in _SEPARATORS:
+                return None
+
+        return value, end
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it. Returns an empty string at the end.
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def _expect(self, character: str) -> None:
+        found = self.peek()
+
+        if found != character:
+            raise self._error(f"Expected {character!r}, found {found!r}")
+
+        self._position += 1
+
+    def _fill(self, minimum_size: int) -> bool:
+        """
+        Reads more text into the buffer, discarding (and echoing) the text already consumed.
+
+        :return: False if the end of the file was already reached
+        """
+        if self._eof:
+            return False
+
+        self.flush_echo()
+        consumed = self._position
+        self._buffer = self._buffer[consumed:]
+        self._position = 0
+        self._echoed_until = 0
+
+        chunk = self._file.read(max(minimum_size, self._chunk_size))
+
+        if not chunk:
+            self._eof = True
+        else:
+            self._buffer += chunk
+
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._position)
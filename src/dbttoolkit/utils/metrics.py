@@ -0,0 +1,130 @@
+"""
+Machine-readable metrics of a command: the wall time of each of its phases, the peak memory of the process and any
+result the command records (counts, cache hit rates, etc), so runs can be compared over time (e.g. across nightly
+builds). Also an optional profiler around the whole command.
+"""
+import importlib.util
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+
+class RunMetrics:
+    """
+    The metrics of a single run of a command. Phases are measured with `phase`, results are added with `record`.
+
+    Memory is the peak resident set size of the process (as reported by the operating system) at the end of every
+    phase: unlike tracing allocations, it has no overhead, and since it only grows, the phase where it jumps is the one
+    that allocated the memory.
+    """
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Any] = {}
+
+        self._timestamp = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measures the block of code as the phase `name`. A phase measured several times accumulates its time.
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            phase = self.phases.setdefault(name, {"seconds": 0.0})
+            phase["seconds"] += time.perf_counter() - start
+            phase["peak_memory_bytes"] = peak_memory_bytes()
+
+    def record(self, **results: Any) -> None:
+        self.results.update(results)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "timestamp": self._timestamp.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "seconds": time.perf_counter() - self._start,
+            "peak_memory_bytes": peak_memory_bytes(),
+            "phases": self.phases,
+            "results": self.results,
+        }
+
+    def write(self, output_path: Path) -> None:
+        with open(output_path, "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+
+def peak_memory_bytes() -> Optional[int]:
+    """
+    :return: the peak resident set size of the process, or None where it is not available (Windows)
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in kilobytes, except on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profiler(str, Enum):
+    cprofile = "cprofile"  # Deterministic, from the standard library. The output is read with `pstats` or snakeviz
+    pyinstrument = "pyinstrument"  # Sampling, with a lower overhead. The output is an HTML report
+
+    def check_dependencies(self) -> None:
+        """
+        Fails early if the optional dependency needed by the profiler is not installed
+        """
+        if self == Profiler.pyinstrument and importlib.util.find_spec("pyinstrument") is None:
+            raise ImportError(
+                "The pyinstrument profiler requires the `pyinstrument` package: pip install dbt-toolkit[profiling]"
+            )
+
+
+@contextmanager
+def profile(output_path: Optional[Path], profiler: Profiler = Profiler.cprofile) -> Iterator[None]:
+    """
+    Profiles the block of code and writes the result to `output_path`. Does nothing if `output_path` is None.
+    """
+    if output_path is None:
+        yield
+        return
+
+    if profiler == Profiler.pyinstrument:
+        profiler.check_dependencies()
+        import pyinstrument
+
+        sampling_profiler = pyinstrument.Profiler()
+        sampling_profiler.start()
+
+        try:
+            yield
+        finally:
+            sampling_profiler.stop()
+            Path(output_path).write_text(sampling_profiler.output_html(), encoding="utf-8")
+
+        return
+
+    import cProfile
+
+    deterministic_profiler = cProfile.Profile()
+    deterministic_profiler.enable()
+
+    try:
+        yield
+    finally:
+        deterministic_profiler.disable()
+        deterministic_profiler.dump_stats(str(output_path))
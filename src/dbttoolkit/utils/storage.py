@@ -0,0 +1,394 @@
+"""
+Storage backends for the files read and written by the commands: the local file system, GCS, S3-compatible stores
+and, for tests, memory.
+
+Paths are relative to the root of the backend (the bucket, or the current folder for the local file system), with `/`
+separators. `backend_from_uri` picks the backend of a `gs://`, `s3://` or local path. Writes can be done in the
+background with a `WriteQueue`, so they overlap with the work producing the files.
+"""
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from dbttoolkit.utils.logger import get_logger
+
+if TYPE_CHECKING:  # The clients are slow to import, they are only imported when a backend is created
+    from google.cloud import storage
+
+logger = get_logger()
+
+DEFAULT_WRITE_WORKERS = 8
+
+# Files above this size are sent to GCS with a resumable upload, in chunks (a multiple of 256 KiB), so a failure only
+# resends the current chunk. Smaller files are sent in a single request. boto3 switches to multipart uploads on its own.
+RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+_client: Optional["storage.Client"] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> "storage.Client":
+    """
+    :return: the GCS client of the process. It is created on first use, so credentials are only looked up once and
+    connections are reused by all uploads.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            from google.cloud import storage
+
+            _client = storage.Client()
+
+        return _client
+
+
+class StorageBackend(ABC):
+    """
+    Where files are read from and written to. Implementations are safe to use from multiple threads.
+    """
+
+    @abstractmethod
+    def write(self, path: str, content: Union[str, bytes]) -> None:
+        """
+        Writes a string (or bytes) to a file, creating its folders if necessary
+        """
+
+    @abstractmethod
+    def write_file(self, path: str, source_path: Path) -> None:
+        """
+        Moves a local file to `path`, without loading it in memory. The local file is deleted even if writing fails.
+        """
+
+    @abstractmethod
+    def read(self, path: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def download(self, path: str, local_path: Path) -> None:
+        """
+        Copies a file to the local file system, without loading it in memory
+        """
+
+    @abstractmethod
+    def list_files(self, folder: str) -> List[str]:
+        """
+        :return: the paths of the files in a folder and its subfolders, relative to it
+        """
+
+
+class LocalBackend(StorageBackend):
+    def __init__(self, root: Path = Path()) -> None:
+        self.root = Path(root)
+
+    def write(self, path: str, content: Union[str, bytes]) -> None:
+        file_path = self.local_path(path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Writing to file: {file_path}")
+
+        with open(file_path, "wb" if isinstance(content, bytes) else "w") as file:
+            file.write(content)
+
+    def write_file(self, path: str, source_path: Path) -> None:
+        file_path = self.local_path(path)
+
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            logger.info(f"Writing to file: {file_path}")
+            shutil.move(str(source_path), str(file_path))
+        finally:
+            if os.path.exists(source_path):
+                os.remove(source_path)
+
+    def read(self, path: str) -> bytes:
+        return self.local_path(path).read_bytes()
+
+    def download(self, path: str, local_path: Path) -> None:
+        shutil.copyfile(self.local_path(path), local_path)
+
+    def list_files(self, folder: str) -> List[str]:
+        folder_path = self.local_path(folder)
+
+        if not folder_path.is_dir():
+            return []
+
+        return [path.relative_to(folder_path).as_posix() for path in folder_path.rglob("*") if path.is_file()]
+
+    def local_path(self, path: str) -> Path:
+        return self.root / path
+
+    def __str__(self) -> str:
+        return str(self.root.resolve())
+
+
+class GcsBackend(StorageBackend):
+    """
+    A Google Cloud Storage bucket. All backends share the client of the process (see `get_client`).
+    """
+
+    def __init__(
+        self, bucket_name: str, *, client: "storage.Client" = None, chunk_size: int = UPLOAD_CHUNK_SIZE
+    ) -> None:
+        self.bucket_name = bucket_name
+        self.chunk_size = chunk_size
+
+        self._client = client or get_client()
+        self._bucket = self._client.bucket(bucket_name)
+
+    def write(self, path: str, content: Union[str, bytes]) -> None:
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        logger.info(f"Uploading to GCS: {self.bucket_name}, {path}")
+
+        self._blob(path, len(data)).upload_from_string(data)
+
+    def write_file(self, path: str, source_path: Path) -> None:
+        logger.info(f"Uploading to GCS: {self.bucket_name}, {path}")
+
+        try:
+            self._blob(path, os.path.getsize(source_path)).upload_from_filename(str(source_path))
+        finally:
+            os.remove(source_path)
+
+    def read(self, path: str) -> bytes:
+        return self._bucket.blob(path).download_as_bytes()
+
+    def download(self, path: str, local_path: Path) -> None:
+        self._bucket.blob(path).download_to_filename(str(local_path))
+
+    def list_files(self, folder: str) -> List[str]:
+        prefix = f"{folder}/" if folder else ""
+        start = len(prefix)
+
+        return [blob.name[start:] for blob in self._client.list_blobs(self.bucket_name, prefix=prefix)]
+
+    def _blob(self, path: str, size: int) -> "storage.Blob":
+        return self._bucket.blob(path, chunk_size=self.chunk_size if size > RESUMABLE_UPLOAD_THRESHOLD else None)
+
+    def __str__(self) -> str:
+        return f"gs://{self.bucket_name}"
+
+
+class S3Backend(StorageBackend):
+    """
+    An Amazon S3 bucket, or a bucket of an S3-compatible store with an `endpoint_url` (e.g. MinIO, Cloudflare R2).
+    Requires the `s3` extra.
+    """
+
+    def __init__(self, bucket_name: str, *, client=None, endpoint_url: str = None) -> None:
+        self.bucket_name = bucket_name
+        self._client = client or self._create_client(endpoint_url)
+
+    def write(self, path: str, content: Union[str, bytes]) -> None:
+        logger.info(f"Uploading to S3: {self.bucket_name}, {path}")
+        data = content.encode("utf-8") if isinstance(content, str) else content
+
+        self._client.put_object(Bucket=self.bucket_name, Key=path, Body=data)
+
+    def write_file(self, path: str, source_path: Path) -> None:
+        logger.info(f"Uploading to S3: {self.bucket_name}, {path}")
+
+        try:
+            # Large files are sent with a multipart upload
+            self._client.upload_file(str(source_path), self.bucket_name, path)
+        finally:
+            os.remove(source_path)
+
+    def read(self, path: str) -> bytes:
+        return self._client.get_object(Bucket=self.bucket_name, Key=path)["Body"].read()
+
+    def download(self, path: str, local_path: Path) -> None:
+        self._client.download_file(self.bucket_name, path, str(local_path))
+
+    def list_files(self, folder: str) -> List[str]:
+        prefix = f"{folder}/" if folder else ""
+        start = len(prefix)
+        pages = self._client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket_name, Prefix=prefix)
+
+        return [item["Key"][start:] for page in pages for item in page.get("Contents", [])]
+
+    @staticmethod
+    def _create_client(endpoint_url: Optional[str]):
+        try:
+            # Optional, installed with the `s3` extra
+            import boto3
+        except ImportError:
+            raise ImportError("S3 storage requires the `boto3` package: pip install dbt-toolkit[s3]")
+
+        return boto3.client("s3", endpoint_url=endpoint_url)
+
+    def __str__(self) -> str:
+        return f"s3://{self.bucket_name}"
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Keeps the files in a dictionary, for tests
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def write(self, path: str, content: Union[str, bytes]) -> None:
+        with self._lock:
+            self.files[path] = content.encode("utf-8") if isinstance(content, str) else content
+
+    def write_file(self, path: str, source_path: Path) -> None:
+        try:
+            self.write(path, Path(source_path).read_bytes())
+        finally:
+            os.remove(source_path)
+
+    def read(self, path: str) -> bytes:
+        with self._lock:
+            return self.files[path]
+
+    def download(self, path: str, local_path: Path) -> None:
+        Path(local_path).write_bytes(self.read(path))
+
+    def list_files(self, folder: str) -> List[str]:
+        prefix = f"{folder}/" if folder else ""
+        start = len(prefix)
+
+        with self._lock:
+            return [path[start:] for path in self.files if path.startswith(prefix)]
+
+    def __str__(self) -> str:
+        return "memory://"
+
+
+def backend_from_uri(uri: Union[str, Path]) -> Tuple[StorageBackend, str]:
+    """
+    :param uri: `gs://<bucket>/<path>`, `s3://<bucket>/<path>` or a local path. The endpoint of S3-compatible stores
+        is read from the `AWS_ENDPOINT_URL` environment variable.
+    :return: the backend and the path in it
+    """
+    parts = urlsplit(str(uri))
+    path = parts.path.strip("/")
+
+    if parts.scheme == "gs":
+        return GcsBackend(parts.netloc), path
+    if parts.scheme == "s3":
+        return S3Backend(parts.netloc, endpoint_url=os.environ.get("AWS_ENDPOINT_URL")), path
+
+    return LocalBackend(), str(uri)
+
+
+def is_remote(uri: Union[str, Path]) -> bool:
+    return urlsplit(str(uri)).scheme in ("gs", "s3")
+
+
+@dataclass
+class TransferStats:
+    """
+    Counters of the files written by a queue, to report its throughput. Safe to update from multiple threads.
+    """
+
+    files: int = 0
+    bytes_sent: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def record(self, bytes_sent: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes_sent += bytes_sent
+
+    @property
+    def throughput(self) -> float:
+        """
+        In bytes per second, since the queue was created
+        """
+        elapsed_time = time.monotonic() - self.started_at
+        return self.bytes_sent / elapsed_time if elapsed_time else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files, {self.bytes_sent / 1024 / 1024:.1f} MiB written "
+            f"({self.throughput / 1024 / 1024:.2f} MiB/s)"
+        )
+
+
+class WriteQueue:
+    """
+    Writes files to a backend in the background, with up to `max_workers` writes at the same time.
+
+    Submitting a write returns a future. At most `max_pending` writes can be waiting or in progress: submitting more
+    blocks until one of them completes (backpressure), which bounds the memory used by the contents waiting to be
+    written.
+    """
+
+    def __init__(
+        self, backend: StorageBackend, *, max_workers: int = DEFAULT_WRITE_WORKERS, max_pending: int = None
+    ) -> None:
+        self.backend = backend
+        self.stats = TransferStats()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="write")
+        self._pending = threading.BoundedSemaphore(max_pending or 2 * max_workers)
+
+    def submit(self, path: str, content: Union[str, bytes]) -> Future:
+        """
+        Writes a string (or bytes) to `path`
+        """
+        size = len(content.encode("utf-8") if isinstance(content, str) else content)
+
+        return self._submit(size, lambda: self.backend.write(path, content))
+
+    def submit_file(self, path: str, source_path: Path) -> Future:
+        """
+        Moves a local file to `path`. See `StorageBackend.write_file`.
+        """
+        return self._submit(os.path.getsize(source_path), lambda: self.backend.write_file(path, source_path))
+
+    def close(self) -> None:
+        """
+        Waits for the pending writes
+        """
+        self._executor.shutdown(wait=True)
+        logger.info(f"Writes to {self.backend}: {self.stats}")
+
+    def __enter__(self) -> "WriteQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _submit(self, size: int, write: Callable[[], None]) -> Future:
+        self._pending.acquire()
+
+        try:
+            future = self._executor.submit(self._write, size, write)
+        except BaseException:
+            self._pending.release()
+            raise
+
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def _write(self, size: int, write: Callable[[], None]) -> None:
+        write()
+        self.stats.record(size)
+
+
+def temporary_folder_for(backend: StorageBackend, folder: str) -> Optional[Path]:
+    """
+    :return: where to create temporary files that will be moved to `folder` in the backend. Locally, it is the
+        destination folder itself (created if necessary), so moving them is only a rename. Otherwise, None: the
+        temporary folder of the system.
+    """
+    if not isinstance(backend, LocalBackend):
+        return None
+
+    path = backend.local_path(folder)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,119 @@
+"""
+A local HTTP server standing in for the dbt Cloud API, used by the tests of the client (against real sockets) and by
+the benchmarks (to measure the download throughput without depending on the network or on dbt Cloud).
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeDbtCloudApi:
+    """
+    A local HTTP server that replays canned responses.
+
+    Responses are registered per path (without the query string) and returned in order. The last one is repeated.
+    Paginated paths (see `add_pages`) return the page requested by the `offset` and `limit` parameters instead.
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, List[Tuple[int, Dict, bytes, float]]] = {}
+        self.pages: Dict[str, Tuple[Callable[[], List], float]] = {}
+        self.requests: List[str] = []  # Paths requested, including the query string
+        self.max_in_flight = 0  # The most requests handled at the same time
+        self.bytes_sent = 0  # The size of the bodies of all responses
+
+        api = self
+        lock = threading.Lock()
+        in_flight = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, as the real API
+
+            def do_GET(self):
+                nonlocal in_flight
+
+                with lock:
+                    in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, in_flight)
+                    api.requests.append(self.path)
+
+                try:
+                    self._respond()
+                finally:
+                    with lock:
+                        in_flight -= 1
+
+            def _respond(self):
+                url = urlsplit(self.path)
+
+                if url.path in api.pages:
+                    status, headers, body, delay = api.page(url.path, parse_qs(url.query))
+                else:
+                    responses = api.routes.get(url.path) or [(404, {}, b"{}", 0.0)]
+                    status, headers, body, delay = responses.pop(0) if len(responses) > 1 else responses[0]
+
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+                with lock:
+                    api.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def add(
+        self,
+        path: str,
+        *,
+        json: Any = None,
+        content: Optional[bytes] = None,
+        status: int = 200,
+        headers: Dict = None,
+        delay: float = 0.0,
+    ):
+        """
+        Registers a response with either a `json` body or a raw `content` (e.g. an artifact, serialized once)
+        """
+        body = content if content is not None else dumps(json if json is not None else {}).encode("utf-8")
+        self.routes.setdefault(path, []).append((status, headers or {}, body, delay))
+
+    def add_pages(self, path: str, items: Callable[[], List], *, delay: float = 0.0):
+        """
+        Paginates the list returned by `items` (called on every request) like the dbt Cloud API, with its total count
+        """
+        self.pages[path] = (items, delay)
+
+    def page(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Dict, bytes, float]:
+        items, delay = self.pages[path]
+        all_items = items()
+        offset = int(query.get("offset", ["0"])[0])
+        end = offset + int(query.get("limit", ["100"])[0])
+        body = {"data": all_items[offset:end], "extra": {"pagination": {"total_count": len(all_items)}}}
+
+        return 200, {}, dumps(body).encode("utf-8"), delay
+
+    def start(self) -> None:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeDbtCloudApi":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,75 @@
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+from pytest import fixture
+
+from dbttoolkit.utils import storage
+
+
+class FakeGcsClient:
+    """
+    Stands in for `google.cloud.storage.Client`, storing the blobs of each bucket in a local folder
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.uploads: List[
+            Tuple[str, str, Optional[int]]
+        ] = []  # Bucket, blob name and chunk size (None: single request)
+
+    def bucket(self, bucket_name: str) -> "FakeBucket":
+        return FakeBucket(self, bucket_name)
+
+    def list_blobs(self, bucket_name: str, prefix: str = "") -> List[SimpleNamespace]:
+        folder = self.root / bucket_name
+        names = sorted(path.relative_to(folder).as_posix() for path in folder.rglob("*") if path.is_file())
+
+        return [SimpleNamespace(name=name) for name in names if name.startswith(prefix)]
+
+
+class FakeBucket:
+    def __init__(self, client: FakeGcsClient, name: str) -> None:
+        self.client = client
+        self.name = name
+
+    def blob(self, blob_name: str, chunk_size: int = None) -> "FakeBlob":
+        return FakeBlob(self, blob_name, chunk_size)
+
+
+class FakeBlob:
+    def __init__(self, bucket: FakeBucket, name: str, chunk_size: int = None) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+        self.path = bucket.client.root / bucket.name / name
+
+    def upload_from_string(self, data) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(data.encode("utf-8") if isinstance(data, str) else data)
+        self._record()
+
+    def upload_from_filename(self, filename: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(filename, self.path)
+        self._record()
+
+    def download_as_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+    def download_to_filename(self, filename: str) -> None:
+        shutil.copyfile(self.path, filename)
+
+    def _record(self) -> None:
+        self.bucket.client.uploads.append((self.bucket.name, self.name, self.chunk_size))
+
+
+@fixture
+def fake_gcs(tmp_path, monkeypatch):
+    """
+    Replaces the GCS client of the process by a fake writing to a temporary folder
+    """
+    client = FakeGcsClient(tmp_path / "gcs")
+    monkeypatch.setattr(storage, "_client", client)
+    return client
@@ -0,0 +1,198 @@
+import json
+
+from pytest import fixture, raises
+
+from dbttoolkit.dbt_cloud.actions._checkpoint import RUN_METADATA, Checkpoint, CheckpointEntry
+from dbttoolkit.dbt_cloud.actions.retrieve_artifacts_time_interval import _process_runs, _read_command
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+from dbttoolkit.dbt_cloud.models.archive_format import ArchiveFormat
+from dbttoolkit.utils.storage import GcsBackend, MemoryBackend
+
+WRITTEN_FILES = [
+    "date=2022-06-01/hour=00/job_id=10/run_id=1/_run.json",
+    "date=2022-06-01/hour=00/job_id=10/run_id=1/step=4/manifest.json",
+    "date=2022-06-01/hour=00/job_id=10/run_id=1/step=4/run_run_results.json",
+    "date=2022-06-01/hour=00/job_id=10/run_id=1/step=5/manifest.json",
+    "date=2022-06-01/hour=00/job_id=10/run_id=1/step=5/run_run_results.json",
+    "date=2022-06-01/hour=01/job_id=20/run_id=2/_run.json",
+    "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/manifest.json",
+    "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/run_run_results.json",
+]
+
+
+def test_runs_are_processed_concurrently(client, runs, fake_dbt_cloud_api, tmp_path):
+    failed_runs = _process_runs(client, runs, tmp_path, concurrency=4)
+
+    assert failed_runs == []
+    assert _written_files(tmp_path) == WRITTEN_FILES
+
+
+def test_artifacts_are_streamed_as_served(client, runs, fake_dbt_cloud_api, tmp_path):
+    failed_runs = _process_runs(client, runs, tmp_path, concurrency=4, stream=True)
+
+    assert failed_runs == []
+    assert len(_written_files(tmp_path)) == 8
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    run_results = tmp_path / "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/run_run_results.json"
+    assert run_results.read_text() == '{"args": {"which": "run"}}'
+
+
+def test_artifacts_are_written_in_the_output_format(client, runs, fake_dbt_cloud_api, tmp_path):
+    _process_runs(client, runs, tmp_path, archive_format=ArchiveFormat.json_gz)
+
+    assert "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/run_run_results.json.gz" in _written_files(tmp_path)
+
+    fake_dbt_cloud_api.requests.clear()
+    _process_runs(client, runs, tmp_path, archive_format=ArchiveFormat.json_gz, skip_existing=True)
+
+    assert all("sources" in path for path in fake_dbt_cloud_api.requests)
+
+
+def test_artifacts_are_uploaded_to_the_bucket(client, runs, fake_dbt_cloud_api, fake_gcs, tmp_path):
+    checkpoint = Checkpoint(
+        tmp_path / "checkpoint.jsonl", destination="gs://bucket/archive", archive_format=ArchiveFormat.json
+    )
+
+    failed_runs = _process_runs(
+        client, runs, "archive", GcsBackend("bucket"), concurrency=4, checkpoint=checkpoint, stream=True
+    )
+
+    assert failed_runs == []
+    assert [blob.name for blob in fake_gcs.list_blobs("bucket")] == ["archive/" + path for path in WRITTEN_FILES]
+    assert len(checkpoint._completed) == 11  # Including the artifacts that do not exist
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_artifacts_are_written_to_any_backend(client, runs, fake_dbt_cloud_api):
+    backend = MemoryBackend()
+
+    assert _process_runs(client, runs, "", backend) == []
+    assert sorted(backend.files) == WRITTEN_FILES
+
+
+def test_command_is_read_without_parsing_the_results(tmp_path):
+    path = tmp_path / "run_results.json"
+    path.write_text(json.dumps({"results": [{"status": "pass"}] * 1000, "args": {"vars": {}, "which": "test"}}))
+
+    assert _read_command(path) == "test"
+
+
+def test_failed_runs_do_not_affect_the_others(client, runs, fake_dbt_cloud_api, tmp_path):
+    fake_dbt_cloud_api.routes["/accounts/123/runs/1/artifacts/manifest.json"] = [(500, {}, b"{}", 0.0)]
+
+    failed_runs = _process_runs(client, runs, tmp_path, concurrency=4)
+
+    assert [run["id"] for run in failed_runs] == [1]
+    assert "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/manifest.json" in _written_files(tmp_path)
+
+
+def test_rerun_resumes_from_the_checkpoint(client, runs, fake_dbt_cloud_api, tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    fake_dbt_cloud_api.routes["/accounts/123/runs/1/artifacts/manifest.json"].insert(0, (500, {}, b"{}", 0.0))
+    fake_dbt_cloud_api.routes["/accounts/123/runs/1/artifacts/manifest.json"].insert(0, (500, {}, b"{}", 0.0))
+
+    failed_runs = _process_runs(client, runs, tmp_path / "output", checkpoint=_checkpoint(checkpoint_path, tmp_path))
+    assert [run["id"] for run in failed_runs] == [1]
+
+    fake_dbt_cloud_api.requests.clear()
+    failed_runs = _process_runs(client, runs, tmp_path / "output", checkpoint=_checkpoint(checkpoint_path, tmp_path))
+
+    assert failed_runs == []
+    assert fake_dbt_cloud_api.requests == ["/accounts/123/runs/1/artifacts/manifest.json?step=4"]
+    assert len(_written_files(tmp_path / "output")) == 8
+
+
+def test_checkpoint_of_another_output_is_rejected(tmp_path):
+    """
+    The work recorded for another destination or format was not written where the rerun expects it
+    """
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    _checkpoint(checkpoint_path, tmp_path).add(CheckpointEntry(1, None, RUN_METADATA))
+
+    with raises(ValueError, match="another output"):
+        Checkpoint(checkpoint_path, destination=str(tmp_path), archive_format=ArchiveFormat.json_gz)
+
+    with raises(ValueError, match="another output"):
+        Checkpoint(checkpoint_path, destination="gs://bucket/archive", archive_format=ArchiveFormat.json)
+
+    assert CheckpointEntry(1, None, RUN_METADATA) in _checkpoint(checkpoint_path, tmp_path)
+
+
+def test_checkpoint_after_a_partial_line(tmp_path):
+    """
+    A crash while writing an entry leaves a partial line, which the entries recorded after it do not continue
+    """
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    _checkpoint(checkpoint_path, tmp_path).add(CheckpointEntry(1, None, RUN_METADATA))
+
+    with open(checkpoint_path, "a") as file:
+        file.write('{"run_id": 1, "st')
+
+    checkpoint = _checkpoint(checkpoint_path, tmp_path)
+    checkpoint.add(CheckpointEntry(1, 4, "manifest"))
+
+    assert _checkpoint(checkpoint_path, tmp_path)._completed == {
+        CheckpointEntry(1, None, RUN_METADATA),
+        CheckpointEntry(1, 4, "manifest"),
+    }
+
+
+def test_existing_files_are_skipped(client, runs, fake_dbt_cloud_api, tmp_path):
+    _process_runs(client, runs, tmp_path)
+    (tmp_path / "date=2022-06-01/hour=01/job_id=20/run_id=2/step=4/manifest.json").unlink()
+
+    fake_dbt_cloud_api.requests.clear()
+    _process_runs(client, runs, tmp_path, skip_existing=True)
+
+    # The sources artifact does not exist, so it is requested again
+    assert sorted(fake_dbt_cloud_api.requests) == [
+        "/accounts/123/runs/1/artifacts/sources.json?step=4",
+        "/accounts/123/runs/1/artifacts/sources.json?step=5",
+        "/accounts/123/runs/2/artifacts/manifest.json?step=4",
+        "/accounts/123/runs/2/artifacts/sources.json?step=4",
+    ]
+
+
+def _checkpoint(path, output_folder):
+    return Checkpoint(path, destination=str(output_folder), archive_format=ArchiveFormat.json)
+
+
+def _written_files(folder):
+    return sorted(str(path.relative_to(folder)) for path in folder.rglob("*.json*"))
+
+
+@fixture
+def runs():
+    return [
+        {
+            "id": 1,
+            "job_id": 10,
+            "finished_at": "2022-06-01 00:30:00+00:00",
+            "finished_at_humanized": "1 hour",
+            "job": {"execute_steps": ["dbt run", "dbt run"]},
+        },
+        {
+            "id": 2,
+            "job_id": 20,
+            "finished_at": "2022-06-01 01:30:00+00:00",
+            "finished_at_humanized": "1 minute",
+            "job": {"execute_steps": ["dbt run"]},
+        },
+    ]
+
+
+@fixture
+def client(dbt_cloud_ids, token, fake_dbt_cloud_api):
+    for run_id in (1, 2):
+        # The sources artifact is not generated by these runs
+        fake_dbt_cloud_api.add(f"/accounts/123/runs/{run_id}/artifacts/manifest.json", json={"manifest": "mock"})
+        fake_dbt_cloud_api.add(
+            f"/accounts/123/runs/{run_id}/artifacts/run_results.json", json={"args": {"which": "run"}}
+        )
+
+    client = DbtCloudClient(
+        **dbt_cloud_ids, token=token, base_url=fake_dbt_cloud_api.url, max_retries=1, backoff_factor=0.01
+    )
+    yield client
+    client.close()
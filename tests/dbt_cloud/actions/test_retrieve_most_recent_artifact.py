@@ -19,8 +19,9 @@ def test_cli_has_mandatory_fields():
 
 
 @responses.activate
-def test_cli_execution(dbt_cloud_ids_cli, rest_api_run_result, manifest_json, job_id, account_id):
+def test_cli_execution(dbt_cloud_ids_cli, rest_api_run_result, manifest_json, job_id, account_id, tmp_path):
     path = Path("/tmp/")
+    run_cache_path = tmp_path / "runs.sqlite"
 
     responses.add(
         responses.GET,
@@ -38,13 +39,67 @@ def test_cli_execution(dbt_cloud_ids_cli, rest_api_run_result, manifest_json, jo
     )
 
     with patch.object(retrieve_most_recent_artifact, "write_to_file", autospec=True) as mock:
-        result = runner.invoke(typer_app, ["manifest", "--output-folder", path, "--job-id", job_id, *dbt_cloud_ids_cli])
+        result = runner.invoke(
+            typer_app,
+            [
+                "manifest",
+                "--output-folder",
+                path,
+                "--job-id",
+                job_id,
+                "--run-cache-path",
+                str(run_cache_path),
+                *dbt_cloud_ids_cli,
+            ],
+        )
 
         assert result.exit_code == 0
 
         assert mock.call_count == 1
         assert mock.call_args[0] == (json.dumps(manifest_json, indent=2), path, "manifest.json")
 
+    # Without a preferred commit, the run cache is not used: it is not even created
+    assert not run_cache_path.exists()
+
+
+@responses.activate
+def test_unusable_run_cache_is_skipped(
+    dbt_cloud_ids_cli, rest_api_run_result, manifest_json, job_id, account_id, tmp_path
+):
+    """
+    A run cache that cannot be created (e.g. in a read-only home folder) does not fail the command
+    """
+    responses.add(
+        responses.GET, f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/runs", json=rest_api_run_result
+    )
+    responses.add(
+        responses.GET,
+        f"https://cloud.getdbt.com/api/v2/accounts/{account_id}/runs/1/artifacts/manifest.json",
+        json=manifest_json,
+    )
+    not_a_folder = tmp_path / "file"
+    not_a_folder.write_text("")
+
+    with patch.object(retrieve_most_recent_artifact, "write_to_file", autospec=True) as mock:
+        result = runner.invoke(
+            typer_app,
+            [
+                "manifest",
+                "--output-folder",
+                str(tmp_path),
+                "--job-id",
+                job_id,
+                "--preferred-commit",
+                "abc123",
+                "--run-cache-path",
+                str(not_a_folder / "runs.sqlite"),
+                *dbt_cloud_ids_cli,
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert mock.call_count == 1
+
 
 @fixture
 def job_id():
@@ -0,0 +1,70 @@
+import os
+
+from pytest import fixture
+
+from dbttoolkit.dbt_cloud.clients.artifact_cache import ArtifactCache, ArtifactKey
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+from dbttoolkit.dbt_cloud.models.dbt_artifact import DbtArtifact
+
+
+def test_artifacts_are_stored_once_per_content(artifact_cache):
+    artifact_cache.store(ArtifactKey(1, 10, 4, "manifest"), b'{"a": 1}')
+    artifact_cache.store(ArtifactKey(1, 11, 4, "manifest"), b'{"a": 1}')
+
+    assert artifact_cache.retrieve(ArtifactKey(1, 10, 4, "manifest")) == b'{"a": 1}'
+    assert artifact_cache.retrieve(ArtifactKey(1, 11, 4, "manifest")) == b'{"a": 1}'
+    assert artifact_cache.retrieve(ArtifactKey(1, 10, 5, "manifest")) is None
+    assert len(list(artifact_cache.path.glob("blobs/*"))) == 1
+    assert (artifact_cache.hits, artifact_cache.misses) == (2, 1)
+
+
+def test_least_recently_used_artifacts_are_evicted(artifact_cache):
+    artifact_cache.store(ArtifactKey(1, 10, None, "manifest"), b'{"a": 1}')
+    artifact_cache.store(ArtifactKey(1, 11, None, "manifest"), b'{"a": 2}')
+
+    blobs = sorted(artifact_cache.path.glob("blobs/*"), key=os.path.getmtime)
+    for index, path in enumerate(blobs):
+        os.utime(path, (index, index))
+
+    # Make the first artifact the most recently used one, and leave room for two of them only
+    artifact_cache.retrieve(ArtifactKey(1, 10, None, "manifest"))
+    artifact_cache.max_bytes = 2 * blobs[0].stat().st_size
+
+    artifact_cache.store(ArtifactKey(1, 12, None, "manifest"), b'{"a": 3}')
+
+    assert artifact_cache.retrieve(ArtifactKey(1, 10, None, "manifest")) == b'{"a": 1}'
+    assert artifact_cache.retrieve(ArtifactKey(1, 11, None, "manifest")) is None
+    assert artifact_cache.retrieve(ArtifactKey(1, 12, None, "manifest")) == b'{"a": 3}'
+
+
+def test_client_downloads_artifacts_once(dbt_cloud_ids, token, fake_dbt_cloud_api, artifact_cache):
+    fake_dbt_cloud_api.add("/accounts/123/runs/1/artifacts/manifest.json", json={"manifest": "mock"})
+    client = DbtCloudClient(
+        **dbt_cloud_ids, token=token, base_url=fake_dbt_cloud_api.url, artifact_cache=artifact_cache
+    )
+
+    for artifact_name in ("manifest", DbtArtifact.manifest):
+        assert client.retrieve_artifact_from_run(1, artifact_name, step=4) == {"manifest": "mock"}
+
+    assert fake_dbt_cloud_api.requests == ["/accounts/123/runs/1/artifacts/manifest.json?step=4"]
+
+
+def test_client_streams_artifacts_once(dbt_cloud_ids, token, fake_dbt_cloud_api, artifact_cache, tmp_path):
+    fake_dbt_cloud_api.add("/accounts/123/runs/1/artifacts/manifest.json", json={"manifest": "mock"})
+    client = DbtCloudClient(
+        **dbt_cloud_ids, token=token, base_url=fake_dbt_cloud_api.url, artifact_cache=artifact_cache
+    )
+
+    for _ in range(2):
+        with open(tmp_path / "manifest.json", "w+b") as file:
+            client.download_artifact_from_run(1, "manifest", file)
+
+        assert (tmp_path / "manifest.json").read_bytes() == b'{"manifest": "mock"}'
+
+    assert len(fake_dbt_cloud_api.requests) == 1
+    assert client.retrieve_artifact_from_run(1, "manifest") == {"manifest": "mock"}
+
+
+@fixture
+def artifact_cache(tmp_path):
+    return ArtifactCache(tmp_path)
@@ -0,0 +1,203 @@
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+from pytest import fixture
+
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+
+ARTIFACT_PATH = "/accounts/123/runs/1/artifacts/manifest.json"
+RUNS_PATH = "/accounts/123/runs"
+
+
+def test_requests_share_a_session(client, fake_dbt_cloud_api):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, json={"manifest": "mock"})
+
+    assert client.retrieve_artifact_from_run(1, "manifest") == {"manifest": "mock"}
+    assert client.retrieve_artifact_from_run(1, "manifest", step=4) == {"manifest": "mock"}
+
+    assert fake_dbt_cloud_api.requests == [ARTIFACT_PATH, ARTIFACT_PATH + "?step=4"]
+    assert client.metrics.requests == 2
+    assert client.metrics.retries == 0
+    assert client.metrics.bytes_received == 2 * len(b'{"manifest": "mock"}')
+
+
+def test_artifacts_are_downloaded_to_a_file(client, fake_dbt_cloud_api, tmp_path):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, status=503)
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, json={"manifest": "mock"})
+
+    with open(tmp_path / "manifest.json", "w+b") as file:
+        client.download_artifact_from_run(1, "manifest", file, step=4)
+
+    assert (tmp_path / "manifest.json").read_bytes() == b'{"manifest": "mock"}'
+    assert client.metrics.bytes_received == len(b'{"manifest": "mock"}')
+    assert client.metrics.retries == 1
+
+
+def test_transient_errors_are_retried(client, fake_dbt_cloud_api):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, status=429, headers={"Retry-After": "0"})
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, status=503)
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, json={"manifest": "mock"})
+
+    assert client.retrieve_artifact_from_run(1, "manifest") == {"manifest": "mock"}
+    assert client.metrics.requests == 3
+    assert client.metrics.retries == 2
+
+
+def test_retries_are_limited(client, fake_dbt_cloud_api):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, status=500)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.retrieve_artifact_from_run(1, "manifest")
+
+    assert client.metrics.requests == client.max_retries + 1
+
+
+def test_client_errors_are_not_retried(client, fake_dbt_cloud_api):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, status=404)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.retrieve_artifact_from_run(1, "manifest")
+
+    assert client.metrics.requests == 1
+
+
+def test_timeouts_are_retried(client, fake_dbt_cloud_api):
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, delay=1)
+    fake_dbt_cloud_api.add(ARTIFACT_PATH, json={"manifest": "mock"})
+
+    assert client.retrieve_artifact_from_run(1, "manifest") == {"manifest": "mock"}
+    assert client.metrics.retries == 1
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [(None, None), ("3", 3.0), ("-1", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0), ("soon", None)],
+)
+def test_retry_after_header(header, expected):
+    response = requests.Response()
+
+    if header:
+        response.headers["Retry-After"] = header
+
+    assert DbtCloudClient._retry_after(response) == expected
+
+
+def test_most_recent_run_costs_a_single_small_request(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=3)]})
+
+    assert client.retrieve_most_recent_run_for_job(999)["id"] == 3
+    assert len(fake_dbt_cloud_api.requests) == 1
+    assert _query(fake_dbt_cloud_api.requests[0]) == {
+        "order_by": ["-id"],
+        "limit": ["1"],
+        "offset": ["0"],
+        "project_id": ["456"],
+        "environment_id": ["789"],
+        "job_definition_id": ["999"],
+        "status": ["10"],
+    }
+
+
+def test_most_recent_run_from_preferred_commit(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=3), run(id=2, git_sha="def456"), run(id=1)]})
+
+    assert client.retrieve_most_recent_run_for_job(999, "def456")["id"] == 2
+    assert client.retrieve_most_recent_run_for_job(999, "unknown")["id"] == 3
+
+
+def test_runs_are_requested_lazily(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=3), run(id=2)]})
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=1)]})
+
+    runs = client.iter_runs(page_size=2)
+
+    assert next(runs)["id"] == 3
+    assert len(fake_dbt_cloud_api.requests) == 1
+
+    assert [run["id"] for run in runs] == [2, 1]
+    assert [_query(path)["offset"] for path in fake_dbt_cloud_api.requests] == [["0"], ["2"]]
+
+
+def test_completed_runs_include_related_objects(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=2, is_complete=False), run(id=1)]})
+
+    assert [run["id"] for run in client.retrieve_completed_runs()] == [1]
+    assert _query(fake_dbt_cloud_api.requests[0])["include_related"] == ['["job", "environment", "trigger"]']
+
+
+def test_run_pages_are_requested_concurrently(client, fake_dbt_cloud_api, run):
+    runs = [run(id=run_id) for run_id in range(10, 0, -1)]
+    fake_dbt_cloud_api.add_pages(RUNS_PATH, lambda: runs, delay=0.1)
+
+    pages = list(client.iter_run_pages(page_size=2, concurrency=3))
+
+    assert [[run["id"] for run in page] for page in pages] == [[10, 9], [8, 7], [6, 5], [4, 3], [2, 1]]
+    assert fake_dbt_cloud_api.max_in_flight == 3
+    # The total count tells there is no sixth page
+    assert sorted(int(_query(path)["offset"][0]) for path in fake_dbt_cloud_api.requests) == [0, 2, 4, 6, 8]
+
+
+def test_runs_shifted_between_pages_are_only_returned_once(client, fake_dbt_cloud_api, run):
+    runs = [run(id=run_id) for run_id in range(6, 0, -1)]
+
+    def listed_runs():
+        # A run is created after the first page: the following pages shift by one
+        if len(fake_dbt_cloud_api.requests) > 1 and runs[0]["id"] == 6:
+            runs.insert(0, run(id=7))
+        return runs
+
+    fake_dbt_cloud_api.add_pages(RUNS_PATH, listed_runs)
+
+    assert [run["id"] for run in client.iter_runs(page_size=2)] == [6, 5, 4, 3, 2, 1]
+
+
+def test_completed_runs_are_listed_concurrently(dbt_cloud_ids, token, fake_dbt_cloud_api, run):
+    runs = [run(id=run_id, created_at=f"2022-06-{run_id:02d} 11:30:00+00:00") for run_id in range(30, 0, -1)]
+    fake_dbt_cloud_api.add_pages(RUNS_PATH, lambda: runs)
+    client = DbtCloudClient(**dbt_cloud_ids, token=token, base_url=fake_dbt_cloud_api.url, page_concurrency=4)
+
+    completed_runs = client.retrieve_completed_runs(
+        page_size=5, created_after=datetime(2022, 6, 20, tzinfo=timezone.utc)
+    )
+    client.close()
+
+    # Pages are requested until one ends before the time given, plus the ones in flight at that time
+    assert [run["id"] for run in completed_runs] == list(range(30, 15, -1))
+    assert len(fake_dbt_cloud_api.requests) <= 6
+
+
+def _query(path):
+    return parse_qs(urlsplit(path).query)
+
+
+@fixture
+def run(dbt_cloud_ids):
+    def build(**attributes):
+        return {
+            **dbt_cloud_ids,
+            "job_id": 999,
+            "is_complete": True,
+            "is_success": True,
+            "is_cancelled": False,
+            "git_sha": "abc123",
+            "created_at": "2022-06-10 11:30:00.321339+00:00",
+            **attributes,
+        }
+
+    return build
+
+
+@fixture
+def client(dbt_cloud_ids, token, fake_dbt_cloud_api):
+    client = DbtCloudClient(
+        **dbt_cloud_ids,
+        token=token,
+        base_url=fake_dbt_cloud_api.url,
+        timeout=0.5,
+        max_retries=3,
+        backoff_factor=0.01,
+    )
+    yield client
+    client.close()
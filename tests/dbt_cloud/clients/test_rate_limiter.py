@@ -0,0 +1,22 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dbttoolkit.dbt_cloud.clients.rate_limiter import RateLimiter
+
+
+def test_rate_is_capped_across_threads():
+    rate_limiter = RateLimiter(50)
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: rate_limiter.acquire(), range(11)))
+
+    # The first token is available right away, the other 10 take 1/50 seconds each
+    assert time.monotonic() - start >= 0.2
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
+
+from pytest import fixture
+
+from dbttoolkit.dbt_cloud.clients.dbt_cloud_client import DbtCloudClient
+from dbttoolkit.dbt_cloud.clients.run_cache import RunCache, RunScope, Watermark
+
+RUNS_PATH = "/accounts/123/runs"
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def test_only_completed_runs_are_stored(run_cache, scope, run):
+    run_cache.store(scope, [run(id=3, is_complete=False), run(id=2), run(id=1, is_success=False)])
+
+    assert [run["id"] for run in run_cache.successful_runs(scope, job_id=999, limit=10)] == [2]
+    assert [run["id"] for run in run_cache.completed_runs(scope, since=NOW - timedelta(days=1))] == [2, 1]
+
+
+def test_scopes_are_separated(run_cache, scope, run):
+    run_cache.store(scope, [run(id=1)])
+    other_scope = scope._replace(environment_id=1)
+
+    assert run_cache.successful_runs(other_scope, job_id=999, limit=10) == []
+    assert run_cache.watermark(other_scope) is None
+
+
+def test_oldest_runs_are_evicted(tmp_path, scope, run):
+    run_cache = RunCache(tmp_path / "runs.sqlite", ttl=timedelta(days=10), max_runs=2)
+    run_cache.store(scope, [run(id=4), run(id=3), run(id=2), run(id=1, created_at=NOW - timedelta(days=11))])
+    run_cache.update_watermark(scope, Watermark(4, NOW - timedelta(days=11)))
+
+    run_cache.evict(scope)
+
+    assert [run["id"] for run in run_cache.successful_runs(scope, job_id=999, limit=10)] == [4, 3]
+    assert run_cache.watermark(scope) == Watermark(4, NOW - timedelta(hours=2))
+
+
+def test_most_recent_run_from_preferred_commit_is_retrieved_from_the_cache(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(
+        RUNS_PATH, json={"data": [run(id=3, is_complete=False), run(id=2), run(id=1, git_sha="def456")]}
+    )
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=4), run(id=3)]})
+
+    assert client.retrieve_most_recent_run_for_job(999, "def456")["id"] == 1
+    assert client.run_cache.watermark(client._run_scope()).high_run_id == 2
+
+    # Run 3 is listed again, since it was incomplete
+    assert client.retrieve_most_recent_run_for_job(999, "unknown")["id"] == 4
+    assert client.run_cache.watermark(client._run_scope()).high_run_id == 4
+
+    assert len(fake_dbt_cloud_api.requests) == 2
+    assert all("include_related" in _query(path) for path in fake_dbt_cloud_api.requests)
+
+
+def test_most_recent_run_does_not_sync_the_cache(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=3)]})
+
+    assert client.retrieve_most_recent_run_for_job(999)["id"] == 3
+    assert client.run_cache.watermark(client._run_scope()) is None
+
+    # A single lean request: only the most recent successful run of the job, without related objects
+    assert len(fake_dbt_cloud_api.requests) == 1
+    query = _query(fake_dbt_cloud_api.requests[0])
+    assert query["limit"] == ["1"]
+    assert query["job_definition_id"] == ["999"]
+    assert "include_related" not in query
+
+
+def test_uncached_jobs_fall_back_to_the_api(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=2), run(id=1)]})
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=1, job_id=111)]})
+
+    assert client.retrieve_most_recent_run_for_job(111, "abc123")["id"] == 1
+    assert _query(fake_dbt_cloud_api.requests[-1])["job_definition_id"] == ["111"]
+
+
+def test_completed_runs_are_retrieved_from_the_cache(client, fake_dbt_cloud_api, run):
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=2), run(id=1, created_at=NOW - timedelta(days=3))]})
+
+    runs = client.retrieve_completed_runs(created_after=NOW - timedelta(days=2))
+
+    assert [run["id"] for run in runs] == [2]
+    assert client.run_cache.watermark(client._run_scope()) == Watermark(2, NOW - timedelta(days=3))
+
+
+def test_the_cache_is_created_when_first_used(tmp_path, scope):
+    run_cache = RunCache(tmp_path / "cache" / "runs.sqlite")
+    assert not (tmp_path / "cache").exists()
+
+    assert run_cache.watermark(scope) is None
+    assert (tmp_path / "cache" / "runs.sqlite").exists()
+
+
+def test_unusable_cache_falls_back_to_the_api(dbt_cloud_ids, token, fake_dbt_cloud_api, run, tmp_path, caplog):
+    not_a_folder = tmp_path / "file"
+    not_a_folder.write_text("")
+    client = DbtCloudClient(
+        **dbt_cloud_ids,
+        token=token,
+        base_url=fake_dbt_cloud_api.url,
+        run_cache=RunCache(not_a_folder / "runs.sqlite"),
+    )
+    fake_dbt_cloud_api.add(RUNS_PATH, json={"data": [run(id=2), run(id=1, created_at=NOW - timedelta(days=3))]})
+
+    try:
+        runs = client.retrieve_completed_runs(created_after=NOW - timedelta(days=2))
+    finally:
+        client.close()
+
+    assert [run["id"] for run in runs] == [2, 1]
+    assert client.run_cache is None
+    assert "The run cache cannot be used" in caplog.text
+
+
+def _query(path):
+    return parse_qs(urlsplit(path).query)
+
+
+@fixture
+def run_cache(tmp_path):
+    return RunCache(tmp_path / "runs.sqlite")
+
+
+@fixture
+def scope(account_id, project_id, environment_id):
+    return RunScope(account_id, project_id, environment_id)
+
+
+@fixture
+def run(dbt_cloud_ids):
+    def build(*, id, created_at=None, **attributes):
+        return {
+            **dbt_cloud_ids,
+            "id": id,
+            "job_id": 999,
+            "is_complete": True,
+            "is_success": True,
+            "is_cancelled": False,
+            "git_sha": "abc123",
+            "created_at": (created_at or NOW - timedelta(hours=5 - id)).isoformat(),
+            "finished_at": None,
+            **attributes,
+        }
+
+    return build
+
+
+@fixture
+def client(dbt_cloud_ids, token, fake_dbt_cloud_api, run_cache):
+    client = DbtCloudClient(**dbt_cloud_ids, token=token, base_url=fake_dbt_cloud_api.url, run_cache=run_cache)
+    yield client
+    client.close()
@@ -1,5 +1,17 @@
 from pytest import fixture
 
+from tests._fake_dbt_cloud_api import FakeDbtCloudApi
+
+
+@fixture(autouse=True)
+def run_cache_path(tmp_path, monkeypatch):
+    """
+    Keeps the run cache used by the commands out of the user's cache folder
+    """
+    path = tmp_path / "runs.sqlite"
+    monkeypatch.setenv("DBT_CLOUD_RUN_CACHE_PATH", str(path))
+    return path
+
 
 @fixture
 def account_id():
@@ -38,3 +50,9 @@ def dbt_cloud_ids_cli(account_id, project_id, environment_id, token):
 @fixture
 def dbt_cloud_ids(account_id, project_id, environment_id):
     return dict(account_id=account_id, project_id=project_id, environment_id=environment_id)
+
+
+@fixture
+def fake_dbt_cloud_api():
+    with FakeDbtCloudApi() as api:
+        yield api
@@ -0,0 +1,119 @@
+import gzip
+import io
+import json
+
+import pytest
+from pytest import fixture
+
+from dbttoolkit.dbt_cloud.models.archive_format import ArchiveFormat, flatten_artifact, serialize_artifact
+from dbttoolkit.dbt_cloud.models.dbt_artifact import DbtArtifact
+
+
+def test_run_results_are_flattened_with_their_timings(run_results):
+    rows = flatten_artifact(run_results, DbtArtifact.run_results)
+
+    assert rows == [
+        {
+            "invocation_id": "abc",
+            "generated_at": "2022-06-01T00:30:00Z",
+            "dbt_version": "1.1.0",
+            "command": "run",
+            "elapsed_time": 12.5,
+            "unique_id": "model.project.orders",
+            "status": "success",
+            "thread_id": "Thread-1",
+            "execution_time": 10.0,
+            "failures": None,
+            "message": "OK",
+            "rows_affected": 42,
+            "compile_started_at": "2022-06-01T00:29:00Z",
+            "compile_completed_at": "2022-06-01T00:29:01Z",
+            "execute_started_at": "2022-06-01T00:29:01Z",
+            "execute_completed_at": "2022-06-01T00:29:11Z",
+        }
+    ]
+
+
+def test_sources_are_flattened_with_their_freshness(sources):
+    rows = flatten_artifact(sources, DbtArtifact.sources)
+
+    assert [(row["unique_id"], row["status"], row["warn_after_count"], row["error"]) for row in rows] == [
+        ("source.project.app.users", "pass", 12, None),
+        ("source.project.app.rides", "runtime error", None, "Database error"),
+    ]
+
+
+def test_compressed_json(run_results):
+    content = serialize_artifact(run_results, DbtArtifact.run_results, ArchiveFormat.json_gz)
+
+    assert json.loads(gzip.decompress(content)) == run_results
+    assert ArchiveFormat.json_gz.extension(DbtArtifact.run_results) == ".json.gz"
+
+
+def test_zstd_compressed_json(run_results):
+    zstandard = pytest.importorskip("zstandard")
+    content = serialize_artifact(run_results, DbtArtifact.run_results, ArchiveFormat.json_zst)
+
+    assert json.loads(zstandard.ZstdDecompressor().decompress(content)) == run_results
+
+
+def test_newline_delimited_json(run_results, sources):
+    run_results_lines = serialize_artifact(run_results, DbtArtifact.run_results, ArchiveFormat.ndjson).splitlines()
+    manifest_lines = serialize_artifact({"nodes": {}}, DbtArtifact.manifest, ArchiveFormat.ndjson).splitlines()
+
+    assert [json.loads(line)["unique_id"] for line in run_results_lines] == ["model.project.orders"]
+    assert [json.loads(line) for line in manifest_lines] == [{"nodes": {}}]
+
+
+def test_parquet(sources):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    content = serialize_artifact(sources, DbtArtifact.sources, ArchiveFormat.parquet)
+    table = parquet.read_table(io.BytesIO(content))
+
+    assert table.to_pylist() == flatten_artifact(sources, DbtArtifact.sources)
+    assert str(table.schema.field("warn_after_count").type) == "int64"
+    assert ArchiveFormat.parquet.extension(DbtArtifact.sources) == ".parquet"
+    assert ArchiveFormat.parquet.extension(DbtArtifact.manifest) == ".json.gz"
+
+
+@fixture
+def run_results():
+    return {
+        "metadata": {"invocation_id": "abc", "generated_at": "2022-06-01T00:30:00Z", "dbt_version": "1.1.0"},
+        "results": [
+            {
+                "unique_id": "model.project.orders",
+                "status": "success",
+                "thread_id": "Thread-1",
+                "execution_time": 10.0,
+                "failures": None,
+                "message": "OK",
+                "adapter_response": {"rows_affected": 42},
+                "timing": [
+                    {"name": "compile", "started_at": "2022-06-01T00:29:00Z", "completed_at": "2022-06-01T00:29:01Z"},
+                    {"name": "execute", "started_at": "2022-06-01T00:29:01Z", "completed_at": "2022-06-01T00:29:11Z"},
+                ],
+            }
+        ],
+        "elapsed_time": 12.5,
+        "args": {"which": "run"},
+    }
+
+
+@fixture
+def sources():
+    return {
+        "metadata": {"invocation_id": "def", "generated_at": "2022-06-01T00:30:00Z", "dbt_version": "1.1.0"},
+        "results": [
+            {
+                "unique_id": "source.project.app.users",
+                "status": "pass",
+                "max_loaded_at": "2022-06-01T00:00:00Z",
+                "snapshotted_at": "2022-06-01T00:30:00Z",
+                "max_loaded_at_time_ago_in_s": 1800.0,
+                "execution_time": 0.5,
+                "criteria": {"warn_after": {"count": 12, "period": "hour"}, "error_after": {"count": None}},
+            },
+            {"unique_id": "source.project.app.rides", "status": "runtime error", "error": "Database error"},
+        ],
+    }
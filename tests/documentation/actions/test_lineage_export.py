@@ -0,0 +1,23 @@
+import shutil
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from dbttoolkit.documentation.actions.lineage_export import DEFAULT_LINEAGE_FILENAME, typer_app
+from dbttoolkit.documentation.models.lineage_graph import LineageGraph
+
+runner = CliRunner()
+
+
+def test_lineage_is_exported_next_to_the_artifacts(dbt_sample_project_path: Path, tmp_path: Path):
+    target = dbt_sample_project_path / "target"
+    shutil.copy(target / "manifest_original.json", tmp_path / "manifest.json")
+    shutil.copy(target / "catalog.json", tmp_path / "catalog.json")
+
+    result = runner.invoke(typer_app, ["--artifacts-folder", str(tmp_path), "--streaming"])
+
+    assert result.exit_code == 0, result.output
+
+    with LineageGraph.open(tmp_path / DEFAULT_LINEAGE_FILENAME) as graph:
+        assert graph.column_count > 0
+        assert graph.edge_count > 0
@@ -0,0 +1,64 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from dbttoolkit.documentation.actions import lineage_export, lineage_query
+
+runner = CliRunner()
+
+
+@pytest.fixture(scope="module")
+def lineage_path(dbt_sample_project_path: Path, tmp_path_factory) -> Path:
+    folder = tmp_path_factory.mktemp("artifacts")
+    target = dbt_sample_project_path / "target"
+    shutil.copy(target / "manifest_original.json", folder / "manifest.json")
+    shutil.copy(target / "catalog.json", folder / "catalog.json")
+
+    result = runner.invoke(lineage_export.typer_app, ["--artifacts-folder", str(folder)])
+    assert result.exit_code == 0, result.output
+
+    return folder / lineage_export.DEFAULT_LINEAGE_FILENAME
+
+
+def test_query_a_batch_of_columns(lineage_path: Path, tmp_path: Path):
+    columns_file = tmp_path / "changed_columns.txt"
+    columns_file.write_text("source.dbt_sample_project.raw.city.name\n\n")
+
+    result = runner.invoke(
+        lineage_query.typer_app,
+        [
+            "--lineage-path",
+            str(lineage_path),
+            "--column",
+            "source.dbt_sample_project.raw.user.name",
+            "--columns-file",
+            str(columns_file),
+            "--output-format",
+            "json",
+            "--paths",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    matches = {f'{match["node_id"]}.{match["name"]}': match for match in json.loads(result.stdout)}
+
+    assert matches["model.dbt_sample_project.mart_user_and_city.name"]["sources"] == [
+        "source.dbt_sample_project.raw.user.name",
+        "source.dbt_sample_project.raw.city.name",
+    ]
+    assert matches["model.dbt_sample_project.stg_city.name"]["path"] == [
+        "source.dbt_sample_project.raw.city.name",
+        "model.dbt_sample_project.stg_city.name",
+    ]
+
+
+def test_unknown_column(lineage_path: Path):
+    result = runner.invoke(
+        lineage_query.typer_app, ["--lineage-path", str(lineage_path), "--column", "model.unknown.model.id"]
+    )
+
+    assert result.exit_code != 0
+    assert "Column not found in the lineage" in result.output
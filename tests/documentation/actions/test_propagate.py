@@ -1,19 +1,46 @@
 import json
+import logging
+import shutil
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
-from typing import Mapping
+from typing import Any, Mapping
 
 import pytest
+from typer.testing import CliRunner
 
 from dbttoolkit.documentation.actions import propagate
+from dbttoolkit.documentation.models.artifacts import ManifestOutputFormat
+from dbttoolkit.utils.storage import GcsBackend
 
 
-@pytest.fixture(scope="module")
-def transformed_artifact(dbt_sample_project_path: Path):
-    with tempfile.NamedTemporaryFile() as tmpfile:
-        propagate.run(dbt_sample_project_path / "target", "manifest_original.json", Path(tmpfile.name))
+@pytest.fixture(
+    scope="module",
+    params=[
+        (False, ManifestOutputFormat.full),
+        (False, ManifestOutputFormat.splice),
+        (True, ManifestOutputFormat.splice),
+        (True, ManifestOutputFormat.overlay),
+    ],
+    ids=["in-memory", "in-memory-splice", "streaming", "streaming-overlay"],
+)
+def transformed_artifact(request, dbt_sample_project_path: Path):
+    streaming, output_format = request.param
+    input_path = dbt_sample_project_path / "target" / "manifest_original.json"
+
+    with tempfile.TemporaryDirectory() as folder:
+        output_path = Path(folder, "manifest.json")
+        propagate.run_propagation(
+            input_path.parent, input_path.name, output_path, streaming=streaming, output_format=output_format
+        )
+        output = json.loads(output_path.read_text())
 
-        yield json.load(tmpfile)
+    if output_format == ManifestOutputFormat.overlay:
+        # The output is a merge patch: the propagated manifest is the patch applied to the original manifest
+        output = merge_patch(json.loads(input_path.read_text()), output)
+
+    yield output
 
 
 def test_propagation_1_level(transformed_artifact: Mapping):
@@ -87,11 +114,198 @@ def test_2_parents(transformed_artifact: Mapping):
     assert description == expected
 
 
+def test_run_from_python(dbt_sample_project_path: Path):
+    """
+    The command can still be called as a function, with positional arguments
+    """
+    with tempfile.NamedTemporaryFile() as tmpfile:
+        propagate.run(dbt_sample_project_path / "target", "manifest_original.json", Path(tmpfile.name))
+
+        output = json.load(tmpfile)
+
+    assert column_description(output, "stg_user", "name").startswith("Name column of the user table in the source.")
+
+
+def test_remote_artifacts(dbt_sample_project_path: Path, fake_gcs):
+    """
+    Artifacts can be read from a bucket, where the modified manifest is written back
+    """
+    backend = GcsBackend("bucket")
+
+    for filename in ("manifest_original.json", "catalog.json"):
+        backend.write(f"target/{filename}", (dbt_sample_project_path / "target" / filename).read_bytes())
+
+    propagate.run_propagation(
+        "gs://bucket/target", "manifest_original.json", output_format=ManifestOutputFormat.overlay
+    )
+    overlay = json.loads(backend.read("target/manifest_original.patch.json"))
+
+    assert column_description(overlay, "stg_user", "name").startswith("Name column of the user table in the source.")
+
+
+def test_cache_from_the_cli(dbt_sample_project_path: Path, tmp_path: Path, caplog):
+    """
+    The cache given to the command is created by the first run and used by the next one
+    """
+    caplog.set_level(logging.INFO, logger="dbt-toolkit")
+    cache_path = tmp_path / "cache.json"
+
+    invoke_propagate(dbt_sample_project_path, tmp_path, "--cache-path", str(cache_path))
+    assert cache_path.exists()
+    assert "0 hits" in caplog.text
+
+    caplog.clear()
+    invoke_propagate(dbt_sample_project_path, tmp_path, "--cache-path", str(cache_path))
+    assert "0 misses" in caplog.text
+
+
+def test_workers_from_the_cli(dbt_sample_project_path: Path, tmp_path: Path, monkeypatch):
+    """
+    The workers given to the command are used to look for matching columns
+    """
+    find_matches_in_parallel = propagate._find_matches_in_parallel
+    calls = []
+
+    def spy(node_keys, index, workers):
+        calls.append(workers)
+        return find_matches_in_parallel(node_keys, index, workers)
+
+    monkeypatch.setattr(propagate, "_find_matches_in_parallel", spy)
+    invoke_propagate(dbt_sample_project_path, tmp_path, "--workers", "2")
+
+    assert calls == [2]
+
+
+def test_direct_execution_logs_the_statistics(dbt_sample_project_path: Path, tmp_path: Path):
+    """
+    Running the module directly (`python -m`) sets up the logger, like the `dbt-toolkit` command does
+    """
+    target = dbt_sample_project_path / "target"
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "dbttoolkit.documentation.actions.propagate",
+            "--artifacts-folder",
+            str(target),
+            "--input-manifest-filename",
+            "manifest_original.json",
+            "--output-manifest-path",
+            str(tmp_path / "manifest.json"),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert "Total columns" in output
+
+
+def test_metrics(dbt_sample_project_path: Path, tmp_path: Path):
+    """
+    The metrics of the run are written as JSON, and the run can be profiled
+    """
+    input_path = dbt_sample_project_path / "target" / "manifest_original.json"
+    metrics_path, profile_path = tmp_path / "metrics.json", tmp_path / "propagate.pstats"
+
+    for _ in range(2):
+        # The second run takes all matches from the cache
+        propagate.run_propagation(
+            input_path.parent,
+            input_path.name,
+            tmp_path / "manifest.json",
+            cache_path=tmp_path / "cache.json",
+            metrics_path=metrics_path,
+            profile_path=profile_path,
+        )
+
+    metrics = json.loads(metrics_path.read_text())
+    results = metrics["results"]
+
+    assert list(metrics["phases"]) == [
+        "load_artifacts",
+        "traverse_artifacts",
+        "save_cache",
+        "propagate",
+        "write_manifest",
+        "statistics",
+    ]
+    assert all(phase["seconds"] > 0 for phase in metrics["phases"].values())
+    assert results["columns"] == results["statistics"]["columns"] > 0
+    assert results["edges"] > 0
+    assert results["cache_misses"] == 0 and results["cache_hit_rate"] == 1
+    # Ignored columns (such as `id`) can receive documentation, but it is not propagated
+    assert 0 < results["propagated_columns"] <= results["statistics"]["columns_with_documentation_propagated"]
+    assert results["output_format"] == "full"
+    assert profile_path.stat().st_size > 0
+
+
+def test_missing_profiler(dbt_sample_project_path: Path, tmp_path: Path, monkeypatch):
+    """
+    Profiling with pyinstrument without the `profiling` extra fails early, telling how to install it
+    """
+    monkeypatch.setitem(sys.modules, "pyinstrument", None)  # Not importable, even where it is installed
+
+    result = CliRunner().invoke(
+        propagate.typer_app,
+        [
+            "--artifacts-folder",
+            str(dbt_sample_project_path / "target"),
+            "--input-manifest-filename",
+            "manifest_original.json",
+            "--output-manifest-path",
+            str(tmp_path / "manifest.json"),
+            "--profile-path",
+            str(tmp_path / "propagate.html"),
+            "--profiler",
+            "pyinstrument",
+        ],
+    )
+
+    assert result.exit_code == 2
+    assert "pip install dbt-toolkit[profiling]" in result.output
+    assert not (tmp_path / "manifest.json").exists()
+
+
 """
 Helper functions
 """
 
 
+def invoke_propagate(dbt_sample_project_path: Path, folder: Path, *arguments: str) -> None:
+    """
+    Runs the `propagate` command over a copy of the sample project artifacts in `folder`
+    """
+    for filename in ("manifest_original.json", "catalog.json"):
+        shutil.copy(dbt_sample_project_path / "target" / filename, folder / filename)
+
+    result = CliRunner().invoke(
+        propagate.typer_app,
+        ["--artifacts-folder", str(folder), "--input-manifest-filename", "manifest_original.json", *arguments],
+    )
+
+    assert result.exit_code == 0, result.output
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """
+    JSON merge patch, as described in RFC 7386
+    """
+    if not isinstance(patch, dict):
+        return patch
+
+    if not isinstance(target, dict):
+        target = {}
+
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), value)
+
+    return target
+
+
 def column_description(artifact: Mapping, node_name: str, column_name: str, *, node_type: str = "model"):
     """
     Retrieves the description of a column on a node given an artifact.
@@ -0,0 +1,27 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import ColumnRegistry
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_traversal_is_identical_to_the_serial_one(dbt_sample_project_path: Path, workers: int):
+    target = dbt_sample_project_path / "target"
+    manifest = json.loads((target / "manifest_original.json").read_text())
+    catalog = json.loads((target / "catalog.json").read_text())
+
+    serial_registry, parallel_registry = ColumnRegistry(), ColumnRegistry()
+    traverse_artifacts(catalog, manifest, serial_registry)
+    traverse_artifacts(catalog, manifest, parallel_registry, workers=workers)
+
+    assert list(parallel_registry.data.keys()) == list(serial_registry.data.keys())
+
+    for fqn, column in serial_registry.data.items():
+        parallel_column = parallel_registry.data[fqn]
+
+        assert {upstream.fqn for upstream in parallel_column.upstream_matches} == {
+            upstream.fqn for upstream in column.upstream_matches
+        }
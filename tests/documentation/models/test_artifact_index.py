@@ -0,0 +1,37 @@
+import pytest
+
+from dbttoolkit.documentation.models.artifact_index import ArtifactIndex
+
+
+@pytest.fixture()
+def index() -> ArtifactIndex:
+    manifest = {
+        "nodes": {
+            "model.project.stg_user": {"unique_id": "model.project.stg_user", "columns": {"Name": {"name": "Name"}}}
+        },
+        "sources": {"source.project.raw.user": {"unique_id": "source.project.raw.user", "columns": {}}},
+    }
+    catalog = {
+        "nodes": {"model.project.stg_user": {"columns": {"NAME": {"name": "NAME"}}}},
+        "sources": {"source.project.raw.user": {"columns": {"name": {"name": "name"}}}},
+    }
+
+    return ArtifactIndex(manifest, catalog)
+
+
+def test_sources_and_models_are_unified(index: ArtifactIndex):
+    assert index.manifest_node("model.project.stg_user")["unique_id"] == "model.project.stg_user"
+    assert index.manifest_node("source.project.raw.user")["unique_id"] == "source.project.raw.user"
+    assert index.manifest_node("model.project.unknown") == {}
+
+
+@pytest.mark.parametrize("column_name", ["name", "NAME", "Name"])
+def test_column_lookups_are_case_insensitive(index: ArtifactIndex, column_name: str):
+    assert index.manifest_column("model.project.stg_user", column_name) == {"name": "Name"}
+    assert index.catalog_column("model.project.stg_user", column_name) == {"name": "NAME"}
+    assert index.catalog_column("source.project.raw.user", column_name) == {"name": "name"}
+
+
+def test_missing_nodes_and_columns(index: ArtifactIndex):
+    assert index.manifest_column("source.project.raw.user", "name") is None
+    assert index.catalog_column("model.project.ephemeral", "name") is None
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+from dbttoolkit.documentation.models.artifacts import load_lean_manifest, write_manifest_overlay, write_patched_manifest
+
+MANIFEST = """{
+    "metadata": {"dbt_version": "0.21.0"},
+    "nodes": {
+        "model.project.stg_user": {
+            "unique_id": "model.project.stg_user",
+            "raw_sql": "select * from {{ source('raw', 'user') }}",
+            "depends_on": {"macros": [], "nodes": ["source.project.raw.user"]},
+            "columns": {"name": {"name": "name", "description": "", "meta": {"original_name": "full_name"}}}
+        },
+        "model.project.untouched": {"unique_id": "model.project.untouched", "columns": {}}
+    },
+    "sources": {
+        "source.project.raw.user": {"unique_id": "source.project.raw.user", "columns": {}}
+    },
+    "macros": {"macro.project.big": {"macro_sql": "{% macro big() %}{% endmacro %}"}}
+}
+"""
+
+PATCH = {"model.project.stg_user": {"name": {"description": "propagated"}}}
+
+
+def test_load_lean_manifest(tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    path.write_text(MANIFEST)
+
+    assert load_lean_manifest(path) == {
+        "nodes": {
+            "model.project.stg_user": {
+                "unique_id": "model.project.stg_user",
+                "depends_on": {"nodes": ["source.project.raw.user"]},
+                "columns": {"name": {"name": "name", "description": "", "meta": {"original_name": "full_name"}}},
+            },
+            "model.project.untouched": {
+                "unique_id": "model.project.untouched",
+                "depends_on": {"nodes": []},
+                "columns": {},
+            },
+        },
+        "sources": {
+            "source.project.raw.user": {
+                "unique_id": "source.project.raw.user",
+                "depends_on": {"nodes": []},
+                "columns": {},
+            }
+        },
+    }
+
+
+def test_splice_only_replaces_the_patched_columns(tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    path.write_text(MANIFEST)
+
+    write_patched_manifest(path, path, PATCH)
+
+    expected_columns = {"name": {"name": "name", "description": "propagated", "meta": {"original_name": "full_name"}}}
+    original_columns = '{"name": {"name": "name", "description": "", "meta": {"original_name": "full_name"}}}'
+
+    assert path.read_text() == MANIFEST.replace(original_columns, json.dumps(expected_columns, separators=(",", ":")))
+
+
+def test_overlay(tmp_path: Path):
+    path = tmp_path / "manifest.patch.json"
+
+    write_manifest_overlay(PATCH, path)
+
+    assert json.loads(path.read_text()) == {
+        "nodes": {"model.project.stg_user": {"columns": {"name": {"description": "propagated"}}}},
+        "sources": {},
+    }
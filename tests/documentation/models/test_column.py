@@ -0,0 +1,61 @@
+import pytest
+
+from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+from dbttoolkit.documentation.models.column_model import ColumnModel
+
+
+@pytest.fixture()
+def registry() -> ColumnRegistry:
+    return ColumnRegistry()
+
+
+def test_add_or_retrieve_returns_the_existing_column(registry: ColumnRegistry):
+    node = {"unique_id": "model.project.stg_user"}
+    from_catalog = registry.add_or_retrieve(column_in_catalog={"name": "NAME"}, node=node)
+    from_manifest = registry.add_or_retrieve(column_in_manifest={"name": "name", "description": "doc"}, node=node)
+
+    assert from_manifest is from_catalog
+    assert list(registry.data.keys()) == [("model.project.stg_user", "name")]
+
+
+def test_add_or_retrieve_requires_a_column(registry: ColumnRegistry):
+    with pytest.raises(ValueError):
+        registry.add_or_retrieve(node={"unique_id": "model.project.stg_user"})
+
+
+def test_matches_are_bidirectional():
+    parent = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.parent"})
+    child = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.child"})
+    parent.add_downstream_match(child)
+
+    assert child.upstream_matches == {parent}
+    assert parent.downstream_matches == {child}
+
+
+def test_identity_fields_are_read_only():
+    column = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.parent"})
+
+    with pytest.raises(AttributeError):
+        column.name = "other"  # type: ignore
+
+
+def test_empty_descriptions_are_normalized():
+    column = Column.build_from_dbt_manifest_column({"name": "name", "description": ""}, {"unique_id": "model.p.m"})
+
+    assert column.description is None
+
+
+def test_column_model():
+    parent = Column.build_from_dbt_manifest_column(
+        {"name": "Name", "description": "doc"}, {"unique_id": "model.project.parent"}
+    )
+    child = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.child"})
+    child.add_upstream_match(parent)
+
+    assert ColumnModel.from_column(parent).dict() == {
+        "node_id": "model.project.parent",
+        "name": "name",
+        "description": "doc",
+        "upstream_matches": [],
+        "downstream_matches": [("model.project.child", "name")],
+    }
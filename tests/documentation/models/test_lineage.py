@@ -0,0 +1,98 @@
+import sys
+from typing import List
+
+from dbttoolkit.documentation.models.column import Column, ColumnRegistry
+
+
+def build_chain(registry: ColumnRegistry, length: int) -> List[Column]:
+    """
+    Builds a linear lineage of `length` columns: node_0.name -> node_1.name -> ... -> node_{length - 1}.name
+    """
+    columns = [
+        registry.add_or_retrieve(column_in_catalog={"name": "name"}, node={"unique_id": f"model.project.node_{index}"})
+        for index in range(length)
+    ]
+
+    for parent, child in zip(columns, columns[1:]):
+        child.add_upstream_match(parent)
+
+    return columns
+
+
+def test_deep_chains_do_not_recurse():
+    registry = ColumnRegistry()
+    columns = build_chain(registry, sys.getrecursionlimit() * 2)
+
+    assert len(columns[0].downstream_matches_recursive) == len(columns) - 1
+    assert columns[-1].downstream_matches_recursive == frozenset()
+
+
+def test_diamond():
+    """
+    source -> left  -> mart
+           -> right /
+    """
+    registry = ColumnRegistry()
+    source, left, mart = build_chain(registry, 3)
+    right = registry.add_or_retrieve(column_in_catalog={"name": "name"}, node={"unique_id": "model.project.right"})
+    right.add_upstream_match(source)
+    mart.add_upstream_match(right)
+
+    assert source.downstream_matches_recursive == {left, right, mart}
+    assert left.downstream_matches_recursive == {mart}
+    assert right.downstream_matches_recursive == {mart}
+
+
+def test_lineage_is_shared_and_invalidated():
+    registry = ColumnRegistry()
+    parent, child = build_chain(registry, 2)
+
+    assert parent.lineage is child.lineage
+    assert parent.downstream_matches_recursive == {child}
+
+    grandchild = registry.add_or_retrieve(
+        column_in_catalog={"name": "name"}, node={"unique_id": "model.project.grandchild"}
+    )
+    grandchild.add_upstream_match(child)
+
+    assert parent.downstream_matches_recursive == {child, grandchild}
+
+
+def test_columns_outside_of_a_registry():
+    parent = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.parent"})
+    child = Column.build_from_dbt_catalog_column({"name": "name"}, {"unique_id": "model.project.child"})
+    child.add_upstream_match(parent)
+
+    assert parent.downstream_matches_recursive == {child}
+
+
+def test_descriptions_stop_at_the_closest_documented_column():
+    registry = ColumnRegistry()
+    source, staging, mart = build_chain(registry, 3)
+    source.description = "from the source"
+
+    assert mart.descriptions_from_upstream == {"model.project.node_0": "from the source"}
+
+    staging.description = "from staging"
+
+    assert mart.descriptions_from_upstream == {"model.project.node_1": "from staging"}
+    assert staging.descriptions_from_upstream == {"model.project.node_0": "from the source"}
+
+
+def test_descriptions_from_multiple_parents():
+    """
+    source (documented) -> staging -> mart
+    other (documented) ------------/
+    """
+    registry = ColumnRegistry()
+    source, _, mart = build_chain(registry, 3)
+    other = registry.add_or_retrieve(
+        column_in_manifest={"name": "name", "description": "from other"}, node={"unique_id": "model.project.other"}
+    )
+    mart.add_upstream_match(other)
+    source.description = "from the source"
+
+    assert mart.descriptions_from_upstream == {
+        "model.project.node_0": "from the source",
+        "model.project.other": "from other",
+    }
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import ColumnFqn, ColumnRegistry
+from dbttoolkit.documentation.models.lineage_graph import LineageGraph, write_lineage_graph
+
+
+@pytest.fixture(scope="module")
+def registry(dbt_sample_project_path: Path) -> ColumnRegistry:
+    target = dbt_sample_project_path / "target"
+    registry = ColumnRegistry()
+    traverse_artifacts(
+        json.loads((target / "catalog.json").read_text()),
+        json.loads((target / "manifest_original.json").read_text()),
+        registry,
+    )
+    return registry
+
+
+@pytest.fixture
+def graph(registry, tmp_path):
+    path = tmp_path / "column_lineage.bin"
+    write_lineage_graph(registry.data.values(), path)
+
+    with LineageGraph.open(path) as graph:
+        yield graph
+
+
+def test_graph_round_trip(registry, graph):
+    assert graph.column_count == len(registry.data)
+    assert graph.node_count == len({fqn.node_id for fqn in registry.data})
+    assert graph.edge_count == sum(len(column.upstream_matches) for column in registry.data.values())
+
+    for fqn, column in registry.data.items():
+        column_id = graph.column_id(fqn.node_id, fqn.name)
+
+        assert column_id is not None
+        assert graph.fqn(column_id) == fqn
+        assert graph.description(column_id) == column.description
+        assert {graph.fqn(upstream) for upstream in graph.upstream(column_id)} == {
+            upstream.fqn for upstream in column.upstream_matches
+        }
+        assert {graph.fqn(downstream) for downstream in graph.downstream(column_id)} == {
+            downstream.fqn for downstream in column.downstream_matches
+        }
+
+
+def test_columns_are_grouped_by_node(registry, graph):
+    node_id = next(iter(registry.data)).node_id
+
+    assert [graph.fqn(column_id) for column_id in graph.node_column_ids(node_id)] == sorted(
+        fqn for fqn in registry.data if fqn.node_id == node_id
+    )
+
+
+@pytest.mark.parametrize(
+    "fqn",
+    [ColumnFqn("model.unknown.model", "id"), ColumnFqn("", ""), ColumnFqn("model.zzz", "id")],
+    ids=["unknown-node", "empty", "after-last-node"],
+)
+def test_unknown_columns_are_not_found(graph, fqn):
+    assert graph.column_id(*fqn) is None
+
+
+def test_unknown_column_of_a_known_node_is_not_found(registry, graph):
+    node_id = next(iter(registry.data)).node_id
+
+    assert graph.column_id(node_id, "not_a_column") is None
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"nodes": {}, "sources": {}, "metadata": {"padding": "x" * 200}}))
+
+    with pytest.raises(ValueError, match="Not a column lineage file"):
+        LineageGraph.open(path)
@@ -0,0 +1,132 @@
+import pytest
+
+from dbttoolkit.documentation.models.column import Column, ColumnFqn
+from dbttoolkit.documentation.models.lineage_graph import LineageGraph
+from dbttoolkit.documentation.models.lineage_query import Direction, LineageQuery, parse_column
+
+
+def column(node_id: str, name: str = "email") -> Column:
+    return Column(name=name, node={"unique_id": node_id}, artifact_column={})
+
+
+@pytest.fixture
+def graph():
+    """
+    raw_users ─> stg_users ─> int_users ─> mart_users
+                     └─────> int_emails ───────┘
+    raw_leads ─> stg_leads ─────┘
+    """
+    columns = {name: column(f"model.project.{name}") for name in ("raw_users", "stg_users", "int_users", "int_emails")}
+    columns.update({name: column(f"model.project.{name}") for name in ("mart_users", "raw_leads", "stg_leads")})
+
+    for upstream, downstream in [
+        ("raw_users", "stg_users"),
+        ("stg_users", "int_users"),
+        ("stg_users", "int_emails"),
+        ("int_users", "mart_users"),
+        ("int_emails", "mart_users"),
+        ("raw_leads", "stg_leads"),
+        ("stg_leads", "int_emails"),
+    ]:
+        columns[downstream].add_upstream_match(columns[upstream])
+
+    with LineageGraph.from_columns(columns.values()) as graph:
+        yield graph
+
+
+def fqn(name: str) -> ColumnFqn:
+    return ColumnFqn(f"model.project.{name}", "email")
+
+
+def test_downstream_closure_with_depths_and_paths(graph):
+    matches = LineageQuery.from_fqns(graph, [fqn("stg_users")], Direction.downstream).matches()
+
+    assert [(match.fqn, match.depth) for match in matches] == [
+        (fqn("int_emails"), 1),
+        (fqn("int_users"), 1),
+        (fqn("mart_users"), 2),
+    ]
+    assert matches[-1].path in [
+        (fqn("stg_users"), fqn("int_users"), fqn("mart_users")),
+        (fqn("stg_users"), fqn("int_emails"), fqn("mart_users")),
+    ]
+
+
+def test_upstream_closure(graph):
+    matches = LineageQuery.from_fqns(graph, [fqn("int_emails")], Direction.upstream).matches()
+
+    assert {(match.fqn, match.depth) for match in matches} == {
+        (fqn("stg_users"), 1),
+        (fqn("stg_leads"), 1),
+        (fqn("raw_users"), 2),
+        (fqn("raw_leads"), 2),
+    }
+
+
+def test_batch_queries_keep_track_of_the_queried_columns(graph):
+    query = LineageQuery.from_fqns(graph, [fqn("raw_users"), fqn("raw_leads")], Direction.downstream)
+    matches = {match.fqn: match for match in query.matches()}
+
+    assert set(matches[fqn("stg_users")].sources) == {fqn("raw_users")}
+    assert set(matches[fqn("int_emails")].sources) == {fqn("raw_users"), fqn("raw_leads")}
+    # Reached from `raw_leads` after it was reached from `raw_users`: the sources are passed on anyway
+    assert set(matches[fqn("mart_users")].sources) == {fqn("raw_users"), fqn("raw_leads")}
+    assert matches[fqn("int_emails")].depth == 2
+
+
+def test_queried_columns_are_not_matches(graph):
+    query = LineageQuery.from_fqns(graph, [fqn("stg_users"), fqn("int_users")], Direction.downstream)
+
+    assert [match.fqn for match in query.matches()] == [fqn("int_emails"), fqn("mart_users")]
+
+
+def test_max_depth(graph):
+    matches = LineageQuery.from_fqns(graph, [fqn("raw_users")], Direction.downstream, max_depth=2).matches()
+
+    assert [match.fqn for match in matches] == [fqn("stg_users"), fqn("int_emails"), fqn("int_users")]
+
+
+def test_max_depth_applies_to_every_queried_column():
+    """
+    a ─> x ─> y
+    b ─> q1 ─> q2 ─┘ (x)
+
+    y is 2 matches away from a, but 4 from b: with a max depth of 3, it is only reached from a
+    """
+    columns = {name: column(f"model.project.{name}") for name in ("a", "b", "x", "y", "q1", "q2")}
+
+    for upstream, downstream in [("a", "x"), ("x", "y"), ("b", "q1"), ("q1", "q2"), ("q2", "x")]:
+        columns[downstream].add_upstream_match(columns[upstream])
+
+    with LineageGraph.from_columns(columns.values()) as graph:
+        query = LineageQuery.from_fqns(graph, [fqn("a"), fqn("b")], Direction.downstream, max_depth=3)
+        sources = {match.fqn: match.sources for match in query.matches()}
+
+    assert sources == {
+        fqn("x"): (fqn("a"), fqn("b")),
+        fqn("y"): (fqn("a"),),
+        fqn("q1"): (fqn("b"),),
+        fqn("q2"): (fqn("b"),),
+    }
+
+
+def test_unknown_columns_are_rejected(graph):
+    with pytest.raises(KeyError, match="model.project.unknown.email"):
+        LineageQuery.from_fqns(graph, [fqn("unknown")], Direction.downstream)
+
+
+@pytest.mark.parametrize(
+    "column, expected",
+    [
+        ("model.project.stg_users.email", ColumnFqn("model.project.stg_users", "email")),
+        ("source.project.raw.users.Email", ColumnFqn("source.project.raw.users", "email")),
+    ],
+)
+def test_parse_column(column, expected):
+    assert parse_column(column) == expected
+
+
+@pytest.mark.parametrize("column", ["email", "model.project.stg_users.", ".email"])
+def test_parse_invalid_column(column):
+    with pytest.raises(ValueError):
+        parse_column(column)
@@ -0,0 +1,69 @@
+import copy
+import json
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from dbttoolkit.documentation.actions.propagate import traverse_artifacts
+from dbttoolkit.documentation.models.column import ColumnRegistry
+from dbttoolkit.documentation.models.traversal_cache import TraversalCache
+
+
+@pytest.fixture()
+def artifacts(dbt_sample_project_path: Path):
+    target = dbt_sample_project_path / "target"
+    manifest = json.loads((target / "manifest_original.json").read_text())
+    catalog = json.loads((target / "catalog.json").read_text())
+
+    return manifest, catalog
+
+
+def registry_edges(registry: ColumnRegistry) -> List[Tuple]:
+    """
+    The columns of the registry (in insertion order) and their upstream matches
+    """
+    return [
+        (column.fqn, sorted(upstream.fqn for upstream in column.upstream_matches)) for column in registry.data.values()
+    ]
+
+
+def traverse(manifest, catalog, cache=None) -> ColumnRegistry:
+    registry = ColumnRegistry()
+    traverse_artifacts(catalog, manifest, registry, cache=cache)
+
+    return registry
+
+
+def test_cached_traversal_is_identical(artifacts, tmp_path: Path):
+    manifest, catalog = artifacts
+    cache_path = tmp_path / "cache.json"
+    expected = registry_edges(traverse(manifest, catalog))
+
+    cold_cache = TraversalCache(cache_path)
+    assert registry_edges(traverse(manifest, catalog, cold_cache)) == expected
+    cold_cache.save()
+
+    warm_cache = TraversalCache(cache_path)
+    assert registry_edges(traverse(manifest, catalog, warm_cache)) == expected
+    assert (warm_cache.hits, warm_cache.misses) == (len(catalog["nodes"]), 0)
+
+
+def test_changes_invalidate_the_node_and_its_children(artifacts, tmp_path: Path):
+    manifest, catalog = artifacts
+    cache_path = tmp_path / "cache.json"
+
+    cache = TraversalCache(cache_path)
+    traverse(manifest, catalog, cache)
+    cache.save()
+
+    # A column is dropped from stg_user, so its children must not match it anymore
+    changed_catalog = copy.deepcopy(catalog)
+    del changed_catalog["nodes"]["model.dbt_sample_project.stg_user"]["columns"]["name"]
+    expected = registry_edges(traverse(manifest, changed_catalog))
+
+    cache = TraversalCache(cache_path)
+    assert registry_edges(traverse(manifest, changed_catalog, cache)) == expected
+
+    # stg_user and its two children (mart_user and mart_user_and_city) are traversed again, stg_city is not
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,146 @@
+import logging
+import random
+
+import pytest
+
+from dbttoolkit.documentation.models.column import ColumnRegistry
+from dbttoolkit.documentation.presentation.stats import _find_best_columns_to_be_documented, calculate_and_print
+
+
+def build_layered_registry(layers: int, width: int, *, seed: int = 1, documented_ratio: float = 0.2) -> ColumnRegistry:
+    """
+    Every column matches two random columns of the previous layer, so descendants are widely shared
+    """
+    rng = random.Random(seed)
+    registry = ColumnRegistry()
+    previous_layer: list = []
+
+    for layer in range(layers):
+        current_layer = []
+
+        for position in range(width):
+            column = registry.add_or_retrieve(
+                column_in_manifest={
+                    "name": "id",
+                    "description": "Documented" if layer and rng.random() < documented_ratio else "",
+                },
+                node={"unique_id": f"model.project.model_{layer}_{position}"},
+            )
+
+            for parent in rng.sample(previous_layer, min(2, len(previous_layer))):
+                column.add_upstream_match(parent)
+
+            current_layer.append(column)
+
+        previous_layer = current_layer
+
+    return registry
+
+
+def brute_force_ranking(registry: ColumnRegistry):
+    """
+    The columns to be documented and their amount of undocumented descendants, ranked as they used to be: by
+    materializing all descendants, sorting in ascending order and reversing (so ties are ranked by later position)
+    """
+    ranking = [
+        (column, len([child for child in column.downstream_matches_recursive if not child.description]))
+        for column in registry.data.values()
+        if not column.upstream_matches and not column.description
+    ]
+    ranking = [(column, count) for column, count in ranking if count]
+    ranking.sort(key=lambda entry: entry[1])
+    ranking.reverse()
+    return ranking
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("top", [1, 5, 100])
+def test_exact_ranking_matches_the_full_closures(seed: int, top: int):
+    registry = build_layered_registry(8, 12, seed=seed)
+    expected = brute_force_ranking(registry)
+
+    candidates_count, best = _find_best_columns_to_be_documented(registry, top)
+
+    assert candidates_count == len(expected)
+    assert [(potential.parent, len(potential.children)) for potential in best] == expected[:top]
+
+    for potential in best:
+        assert set(potential.children) == {
+            child for child in potential.parent.downstream_matches_recursive if not child.description
+        }
+
+
+def test_shared_descendants_are_counted_once():
+    """
+    source -> left  -> mart
+           -> right /
+    """
+    registry = ColumnRegistry()
+    source, left, right, mart = [
+        registry.add_or_retrieve(column_in_catalog={"name": "id"}, node={"unique_id": f"model.project.{name}"})
+        for name in ("source", "left", "right", "mart")
+    ]
+    left.add_upstream_match(source)
+    right.add_upstream_match(source)
+    mart.add_upstream_match(left)
+    mart.add_upstream_match(right)
+
+    for exact in (True, False):
+        _, best = _find_best_columns_to_be_documented(registry, 25, exact=exact)
+
+        assert [(potential.parent, len(potential.children)) for potential in best] == [(source, 3)]
+
+
+def test_approximate_ranking_is_close_to_the_exact_one():
+    registry = build_layered_registry(30, 30, documented_ratio=0.1)
+    estimates = registry.lineage.estimate_undocumented_descendants(registry.data.values())
+
+    for column, estimate in estimates.items():
+        count = len(registry.lineage.undocumented_descendants(column))
+        assert estimate == pytest.approx(count, rel=0.5, abs=1)
+
+    candidates_count, best = _find_best_columns_to_be_documented(registry, 10, exact=False)
+    expected = brute_force_ranking(registry)
+
+    assert candidates_count == len(expected)
+    assert len(best) == 10
+    assert min(len(potential.children) for potential in best) >= expected[9][1] * 0.8
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_ties_are_ranked_by_later_position_first(exact: bool):
+    """
+    Four sources with one undocumented child each, and one with two
+    """
+    registry = ColumnRegistry()
+    sources = []
+
+    for name in ("first", "second", "third", "fourth", "largest"):
+        source = registry.add_or_retrieve(column_in_catalog={"name": "id"}, node={"unique_id": f"model.project.{name}"})
+        children = 2 if name == "largest" else 1
+
+        for position in range(children):
+            child = registry.add_or_retrieve(
+                column_in_catalog={"name": "id"}, node={"unique_id": f"model.project.{name}_child_{position}"}
+            )
+            child.add_upstream_match(source)
+
+        sources.append(source)
+
+    first, second, third, fourth, largest = sources
+
+    _, best = _find_best_columns_to_be_documented(registry, 3, exact=exact)
+    assert [potential.parent for potential in best] == [largest, fourth, third]
+
+    _, best = _find_best_columns_to_be_documented(registry, 25, exact=exact)
+    assert [potential.parent for potential in best] == [largest, fourth, third, second, first]
+    assert [(potential.parent, len(potential.children)) for potential in best] == brute_force_ranking(registry)
+
+
+def test_statistics_are_logged(caplog):
+    caplog.set_level(logging.INFO, logger="dbt-toolkit")
+    registry = build_layered_registry(3, 3)
+
+    calculate_and_print(registry, top=2)
+
+    assert "Top 2" in caplog.text
@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from dbttoolkit import cli
+
+# Dependencies that only the commands using them should import
+HEAVY_MODULES = ("google.cloud.storage", "requests", "pydantic", "rich", "boto3", "pyarrow")
+
+# The modules of the commands, only imported when a command is run (or its help shown)
+COMMAND_PACKAGES = ("dbttoolkit.documentation", "dbttoolkit.dbt_cloud")
+
+
+@pytest.mark.parametrize(
+    "arguments, expected_modules",
+    [
+        ([], []),
+        (["--help"], []),
+        (["dbt-cloud", "--help"], []),
+        (["docs", "propagate", "--help"], []),
+        (["dbt-cloud", "retrieve-most-recent-artifact", "--help"], ["requests"]),
+    ],
+)
+def test_commands_only_import_their_dependencies(arguments, expected_modules):
+    script = (
+        "import json, sys\n"
+        "from dbttoolkit import cli\n"
+        f"sys.argv = ['dbt-toolkit', *{arguments!r}]\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(json.dumps([module for module in {HEAVY_MODULES!r} if module in sys.modules]))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+
+    assert json.loads(output.splitlines()[-1]) == expected_modules
+
+
+def test_importing_the_cli_does_not_import_the_commands():
+    # How long the import takes is measured by `benchmarks/bench_cli_import.py`
+    script = "import json, sys\nimport dbttoolkit.cli\nprint(json.dumps(sorted(sys.modules)))\n"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    modules = json.loads(output)
+
+    assert [module for module in modules if module.startswith(COMMAND_PACKAGES)] == []
+    assert [module for module in modules if module.startswith(HEAVY_MODULES)] == []
+
+
+def test_lazy_commands_are_listed_and_invoked():
+    runner = CliRunner()
+
+    result = runner.invoke(cli.app, ["dbt-cloud", "--help"])
+    assert result.exit_code == 0
+    assert "retrieve-artifacts-time-interval" in result.output
+    assert "Retrieves an artifact from the latest run" in result.output
+
+    result = runner.invoke(cli.app, ["docs", "propagate", "--help"])
+    assert result.exit_code == 0
+    assert "--artifacts-folder" in result.output
+
+    result = runner.invoke(cli.app, ["docs", "lineage", "export", "--help"])
+    assert result.exit_code == 0
+    assert "--output-path" in result.output
+
+    result = runner.invoke(cli.app, ["docs", "lineage", "--help"])
+    assert result.exit_code == 0
+    assert "query" in result.output
+
+
+def test_command_groups_are_built_once():
+    from dbttoolkit.dbt_cloud import actions as dbt_cloud_actions
+    from dbttoolkit.documentation import actions as documentation_actions
+
+    assert documentation_actions.documentation_typer_app is documentation_actions.documentation_typer_app
+    assert dbt_cloud_actions.dbt_cloud_typer_app is dbt_cloud_actions.dbt_cloud_typer_app
@@ -0,0 +1,80 @@
+import io
+import json
+from typing import Any
+
+import pytest
+
+from dbttoolkit.utils.json_stream import JsonStreamReader
+
+DOCUMENT = """{
+    "number": -12.5e3,
+    "literals": [true, false, null],
+    "text": "with \\"escapes\\" and unicode: åäö",
+    "nested": {"empty_object": {}, "empty_array": [], "list": [1, 22, 333, {"deep": ["value"]}]}
+}
+"""
+
+
+def read_everything(reader: JsonStreamReader) -> Any:
+    """
+    Reads a document by descending into every object and array, only materializing scalars
+    """
+    character = reader.peek()
+
+    if character == "{":
+        return {key: read_everything(reader) for key in reader.iter_members()}
+    if character == "[":
+        return [read_everything(reader) for _ in reader.iter_items()]
+
+    return reader.read_value()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_navigation_across_chunk_boundaries(chunk_size: int):
+    reader = JsonStreamReader(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+
+    assert read_everything(reader) == json.loads(DOCUMENT)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024])
+def test_read_and_skip_values(chunk_size: int):
+    reader = JsonStreamReader(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+    values = {}
+
+    for key in reader.iter_members():
+        if key in ("number", "nested"):
+            values[key] = reader.read_value()
+        else:
+            reader.skip_value()
+
+    assert values == {"number": -12500.0, "nested": json.loads(DOCUMENT)["nested"]}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1024])
+def test_echo_replacing_a_value(chunk_size: int):
+    reader = JsonStreamReader(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+    output = io.StringIO()
+    reader.echo_to(output)
+
+    for key in reader.iter_members():
+        if key == "text":
+            reader.peek()
+            reader.echo_to(None)
+            reader.read_value()
+            output.write('"replaced"')
+            reader.echo_to(output)
+        else:
+            reader.skip_value()
+
+    reader.read_to_end()
+
+    assert output.getvalue() == DOCUMENT.replace('"with \\"escapes\\" and unicode: åäö"', '"replaced"')
+
+
+@pytest.mark.parametrize("document", ['{"a": 1,}', '{"a" 1}', '{"a": [1 2]}', '{"a": '])
+def test_invalid_documents(document: str):
+    reader = JsonStreamReader(io.StringIO(document), chunk_size=2)
+
+    with pytest.raises(json.JSONDecodeError):
+        for _ in reader.iter_members():
+            reader.skip_value()
@@ -0,0 +1,66 @@
+import json
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+
+from dbttoolkit.utils.metrics import Profiler, RunMetrics, peak_memory_bytes, profile
+
+
+def test_phases_and_results_are_written(tmp_path: Path):
+    metrics = RunMetrics("command")
+
+    with metrics.phase("first"):
+        time.sleep(0.01)
+
+    # A phase measured twice accumulates its time
+    for _ in range(2):
+        with metrics.phase("second"):
+            time.sleep(0.01)
+
+    metrics.record(columns=3, cache_hit_rate=0.5)
+    metrics.write(tmp_path / "metrics.json")
+    output = json.loads((tmp_path / "metrics.json").read_text())
+
+    assert output["command"] == "command"
+    assert list(output["phases"]) == ["first", "second"]
+    assert output["phases"]["first"]["seconds"] >= 0.01
+    assert output["phases"]["second"]["seconds"] >= 0.02
+    assert output["phases"]["second"]["peak_memory_bytes"] == output["peak_memory_bytes"]
+    assert output["seconds"] >= output["phases"]["first"]["seconds"] + output["phases"]["second"]["seconds"]
+    assert output["results"] == {"columns": 3, "cache_hit_rate": 0.5}
+
+
+def test_phases_are_measured_when_they_fail():
+    metrics = RunMetrics("command")
+
+    with pytest.raises(ValueError):
+        with metrics.phase("failing"):
+            raise ValueError
+
+    assert "failing" in metrics.phases
+
+
+def test_peak_memory_includes_allocations():
+    allocation = bytearray(64 * 1024 * 1024)
+    allocation[::4096] = b"x" * len(allocation[::4096])  # Touch every page, so they are resident
+
+    # The peak may have been reached before (e.g. by other tests), but it cannot be lower than the allocation
+    assert peak_memory_bytes() >= len(allocation)
+
+
+def test_cprofile(tmp_path: Path):
+    with profile(tmp_path / "profile.pstats", Profiler.cprofile):
+        sorted(range(1000), key=lambda number: -number)
+
+    statistics = pstats.Stats(str(tmp_path / "profile.pstats"))
+
+    assert any(function_name == "<lambda>" for _, _, function_name in statistics.stats)  # type: ignore
+
+
+def test_no_profile_without_output_path(tmp_path: Path):
+    with profile(None, Profiler.pyinstrument):
+        pass
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,149 @@
+import io
+import threading
+from pathlib import Path
+
+import pytest
+
+from dbttoolkit.utils import storage
+from dbttoolkit.utils.io import persist
+from dbttoolkit.utils.storage import (
+    GcsBackend,
+    LocalBackend,
+    MemoryBackend,
+    S3Backend,
+    WriteQueue,
+    backend_from_uri,
+    get_client,
+)
+
+
+@pytest.fixture(params=["local", "gcs", "s3", "memory"])
+def backend(request, tmp_path, fake_gcs):
+    if request.param == "local":
+        return LocalBackend(tmp_path / "local")
+    if request.param == "gcs":
+        return GcsBackend("bucket")
+    if request.param == "s3":
+        return S3Backend("bucket", client=FakeS3Client())
+
+    return MemoryBackend()
+
+
+def test_backends_read_and_write_files(backend, tmp_path):
+    source_path = tmp_path / "manifest.json"
+    source_path.write_text('{"nodes": {}}')
+
+    backend.write("run_id=1/run_results.json", '{"results": []}')
+    backend.write_file("run_id=1/step=4/manifest.json", source_path)
+    backend.download("run_id=1/run_results.json", tmp_path / "downloaded.json")
+
+    assert backend.read("run_id=1/step=4/manifest.json") == b'{"nodes": {}}'
+    assert (tmp_path / "downloaded.json").read_text() == '{"results": []}'
+    assert sorted(backend.list_files("run_id=1")) == ["run_results.json", "step=4/manifest.json"]
+    assert backend.list_files("run_id=2") == []
+    assert not source_path.exists()
+
+
+def test_large_files_are_uploaded_to_gcs_in_chunks(fake_gcs, monkeypatch):
+    monkeypatch.setattr(storage, "RESUMABLE_UPLOAD_THRESHOLD", 10)
+    backend = GcsBackend("bucket", chunk_size=256 * 1024)
+
+    backend.write("small.json", b"small")
+    backend.write("large.json", b"x" * 100)
+
+    assert fake_gcs.uploads == [("bucket", "small.json", None), ("bucket", "large.json", 256 * 1024)]
+
+
+def test_the_gcs_client_is_shared_by_the_process(fake_gcs):
+    persist("{}", Path("a"), "1.json", bucket_name="bucket")
+    persist("{}", Path("b"), "2.json", bucket_name="bucket")
+
+    assert get_client() is fake_gcs
+    assert len(fake_gcs.uploads) == 2
+
+
+def test_backends_from_uris(fake_gcs):
+    backend, path = backend_from_uri("gs://bucket/archive/dbt")
+    assert isinstance(backend, GcsBackend) and backend.bucket_name == "bucket" and path == "archive/dbt"
+
+    backend, path = backend_from_uri("/tmp/archive")
+    assert isinstance(backend, LocalBackend) and path == "/tmp/archive"
+
+
+def test_writes_are_queued(tmp_path):
+    backend = MemoryBackend()
+    source_path = tmp_path / "manifest.json"
+    source_path.write_text("{}")
+
+    with WriteQueue(backend, max_workers=2) as queue:
+        futures = [queue.submit("a.json", "{}"), queue.submit_file("b.json", source_path)]
+
+    assert [future.exception() for future in futures] == [None, None]
+    assert backend.files == {"a.json": b"{}", "b.json": b"{}"}
+    assert queue.stats.files == 2
+    assert queue.stats.bytes_sent == 4
+    assert "2 files" in str(queue.stats)
+
+
+def test_write_errors_are_set_on_their_future():
+    class FailingBackend(MemoryBackend):
+        def write(self, path, content):
+            raise OSError("No space left on device")
+
+    with WriteQueue(FailingBackend()) as queue:
+        future = queue.submit("a.json", "{}")
+
+    assert isinstance(future.exception(), OSError)
+    assert queue.stats.files == 0
+
+
+def test_pending_writes_are_bounded():
+    release = threading.Event()
+
+    class SlowBackend(MemoryBackend):
+        def write(self, path, content):
+            release.wait(5)
+            super().write(path, content)
+
+    with WriteQueue(SlowBackend(), max_workers=1, max_pending=2) as queue:
+        queue.submit("1.json", b"1")
+        queue.submit("2.json", b"2")
+
+        third = threading.Thread(target=queue.submit, args=("3.json", b"3"))
+        third.start()
+        third.join(0.2)
+        assert third.is_alive()
+
+        release.set()
+        third.join(5)
+
+    assert queue.stats.files == 3
+
+
+class FakeS3Client:
+    """
+    Stands in for a boto3 S3 client, keeping the objects in memory
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+    def upload_file(self, Filename, Bucket, Key):
+        self.objects[(Bucket, Key)] = Path(Filename).read_bytes()
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def download_file(self, Bucket, Key, Filename):
+        Path(Filename).write_bytes(self.objects[(Bucket, Key)])
+
+    def get_paginator(self, operation_name):
+        assert operation_name == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        return [{"Contents": [{"Key": key} for key in keys]}] if keys else [{}]